@@ -0,0 +1,77 @@
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rapidfuzz import process, fuzz
+
+from src.answer_matcher import AnswerMatcher
+
+
+# per submit latency of checking an answer, the way ReviewTab.process_answer used to (splitting and normalizing
+# the card's answers on every submit) and through the card's AnswerMatcher (prepared once, when the card was added)
+# usage: python benchmarks/answers.py [N_MEANINGS ...]
+# "build" is what the matcher costs once per card, in add_to_review
+
+THRESHOLD = 80
+REPEATS = 2000
+
+# (answer, what kind of answer it is), for a card with the meanings from make_meanings
+ANSWERS = [
+    ("meaning 0", "exact"),
+    ("meening 1", "typo"),
+    ("something else entirely", "wrong"),
+]
+
+def make_meanings(n: int) -> str:
+    return ",".join(f"meaning {i} (sense {i})" if i % 2 else f" Meaning {i}" for i in range(n))
+
+# process_answer's meaning check before AnswerMatcher
+def match_inline(answer: str, meanings: str) -> float:
+    answer_lower = answer.strip().lower()
+    lookup_readings = dict()
+
+    for reading in meanings.split(","):
+        reading_lower = reading.strip().lower()
+        remove_all_in_parentheses = re.sub(r"\s*\([^)]*\)\s*", "", reading_lower)
+        strip_parentheses = re.sub(r"[()]", "", reading_lower)
+
+        lookup_readings[strip_parentheses] = reading
+        lookup_readings[remove_all_in_parentheses] = reading
+
+    _, score, _ = process.extractOne(answer_lower, list(lookup_readings.keys()), scorer = fuzz.QRatio)
+
+    return score
+
+def time_us(f) -> float:
+    start = time.perf_counter()
+
+    for _ in range(REPEATS):
+        f()
+
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [3, 10, 40]
+
+    print(f"{'meanings':>8} {'answer':>8} | {'inline':>9} | {'matcher':>9} | {'build':>9}")
+
+    for n in sizes:
+        meanings = make_meanings(n)
+        matcher = AnswerMatcher("meaning", meanings)
+        build = time_us(lambda: AnswerMatcher("meaning", meanings))
+
+        for answer, kind in ANSWERS:
+            assert (match_inline(answer, meanings) > THRESHOLD) == (matcher.match(answer, score_cutoff = THRESHOLD) > THRESHOLD)
+
+            inline = time_us(lambda: match_inline(answer, meanings))
+            matched = time_us(lambda: matcher.match(answer, score_cutoff = THRESHOLD))
+
+            print(f"{n:>8} {kind:>8} | {inline:6.1f} us | {matched:6.1f} us | {build:6.1f} us")
+
+    return None
+
+if __name__ == "__main__":
+    main()
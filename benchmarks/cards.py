@@ -0,0 +1,116 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_srs_db
+from src.answer_matcher import AnswerMatcher
+from src.cards import REVIEW_COLUMNS, ReviewItem
+from src.review_session import ReviewSession
+from src.rows import fetch_dicts
+
+
+# memory and per-answer cost of a rotating review set, with cards as copies of the whole row (a dict per card,
+# and a reshuffle per item added) and as slotted Cards that share one ReviewItem (inserted at random, swap-removed)
+# usage: python benchmarks/cards.py [N_ITEMS] [N_ANSWERS]
+# every answer takes a card off the set, and every second answer brings a new item (two cards) in, so the set stays the same size
+
+def old_add(cards: list, row: dict) -> None:
+    review_type = "kanji" if row["AssociatedKanji"] else "vocab"
+    prompt = row["AssociatedKanji"] or row["AssociatedVocab"]
+
+    for card_type, col in (("reading", "Readings"), ("meaning", "Meanings")):
+        card = row.copy()
+        card["review_type"] = review_type
+        card["card_type"] = card_type
+        card["prompt"] = prompt
+        card["expected_answer"] = card[col]
+        card["matcher"] = AnswerMatcher(card_type, card[col])
+        cards.append(card)
+
+    random.shuffle(cards)
+
+    return None
+
+def old_remove(cards: list, index: int) -> None:
+    cards.pop(index)
+
+    return None
+
+def new_add(session: ReviewSession, row: tuple) -> None:
+    session.add_to_review([ReviewItem.from_row(row)])
+
+    return None
+
+def new_remove(session: ReviewSession, index: int) -> None:
+    session.review_queue.cursor = index
+    session.review_queue.remove_current()
+
+    return None
+
+# traced bytes held by the set, then mean seconds per answer and the traced peak above the set while it rotates
+def measure(add, remove, table, rows: list, n_items: int, n_answers: int) -> tuple[float, float, float]:
+    rng = random.Random(0)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for row in rows[:n_items]:
+        add(table, row)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = 2 * n_items
+    incoming = rows[n_items:]
+    indices = [rng.randrange(size - i % 2) for i in range(n_answers)]
+
+    def rotate():
+        for i, index in enumerate(indices):
+            remove(table, index)
+
+            if i % 2:
+                add(table, incoming[(i // 2) % len(incoming)])
+
+    start = time.perf_counter()
+    rotate()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    rotate()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return held - before, elapsed / n_answers, peak - base
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_answers = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_to_srs_db = os.path.join(tmp, "srs.db")
+        make_srs_db(path_to_srs_db, 2 * n)
+
+        conn = sqlite3.connect(path_to_srs_db)
+        dict_rows = fetch_dicts(conn, "SELECT * FROM SrsEntrySet ORDER BY ID;")
+        tuple_rows = conn.execute(f"SELECT {', '.join(REVIEW_COLUMNS)} FROM SrsEntrySet ORDER BY ID;").fetchall()
+        conn.close()
+
+    print(f"{n} items ({2 * n} cards) on the table, {n_answers} answers")
+
+    for name, add, remove, table, rows in (
+        ("dicts", old_add, old_remove, [], dict_rows),
+        ("cards", new_add, new_remove, ReviewSession(None, None, "benchmark"), tuple_rows),
+    ):
+        held, per_answer, peak = measure(add, remove, table, rows, n, n_answers)
+        print(f"{name:>6}: set {held / 1024:8.1f} KiB | {per_answer * 1e6:7.1f} us per answer | peak +{peak / 1024:6.1f} KiB while rotating")
+
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_houhou_db
+from src.houhou import DATE_COLUMNS, convert_houhou_dates, iso_expr
+
+
+# throughput of converting a houhou srs db, against the old conversion
+# usage: python benchmarks/houhou.py [N_ITEMS ...]
+# "old" adds one ISO column at a time and rewrites the whole table for each, in one transaction per column
+# "batched" converts all four columns in one pass, in ID-range batches that can be resumed
+
+def convert_old(conn: sqlite3.Connection) -> None:
+    for col in DATE_COLUMNS:
+        conn.execute(f"ALTER TABLE SrsEntrySet ADD COLUMN {col}ISO TEXT;")
+        conn.execute(f"UPDATE SrsEntrySet SET {col}ISO = {iso_expr(col)};")
+        conn.commit()
+
+    return None
+
+def time_conversion(path: str, f) -> float:
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    f(conn)
+    elapsed = time.perf_counter() - start
+    conn.close()
+
+    return elapsed
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+
+    print(f"{'items':>8} | {'old':>16} | {'batched':>16} | {'batched + epoch':>16}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            results = []
+
+            for name, f in [
+                ("old", convert_old),
+                ("batched", lambda conn: convert_houhou_dates(conn)),
+                ("epoch", lambda conn: convert_houhou_dates(conn, with_epoch = True)),
+            ]:
+                path = os.path.join(tmp, f"{name}_{n}.db")
+                make_houhou_db(path, n)
+                elapsed = time_conversion(path, f)
+                results.append(f"{n / elapsed:8.0f} rows/s")
+
+            print(f"{n:>8} | {results[0]:>16} | {results[1]:>16} | {results[2]:>16}")
+
+    return None
+
+if __name__ == "__main__":
+    main()
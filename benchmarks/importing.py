@@ -0,0 +1,87 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_srs_db, make_full_db
+from src.dataclasses import SrsConfig
+from src.srs_app import SrsApp
+
+
+# throughput and memory of SrsApp.import_file for growing word lists
+# usage: python benchmarks/importing.py [N_ROWS ...]
+# every row is a bare word, so readings and meanings all come from the dictionary
+# "batch peak" is the memory a batch holds on to while it's read, filled in and written (the median over all batches)
+# it should stay flat however long the file is
+# "deck" is what stays behind: the due queue and stats totals, which grow with the deck however it was filled
+
+def make_word_list(path: str, n: int) -> None:
+    with open(path, "w", encoding = "utf-8") as f:
+        for i in range(1, n + 1):
+            f.write(f"v{i}\n")
+
+    return None
+
+def make_srs_app(tmp: str) -> SrsApp:
+    path_to_srs_db = os.path.join(tmp, "srs.db")
+
+    for name in os.listdir(tmp):
+        if name.startswith("srs.db"):
+            os.remove(os.path.join(tmp, name))
+
+    make_srs_db(path_to_srs_db, 1000)
+
+    srs_app = SrsApp(SrsConfig(
+        srs_interval = {"0": {"value": 4, "unit": "hours"}},
+        path_to_srs_db = path_to_srs_db,
+        path_to_full_db = os.path.join(tmp, "full.db"),
+    ))
+    srs_app.init_db()
+
+    return srs_app
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 50000, 100000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_full_db(os.path.join(tmp, "full.db"), n_vocab = max(sizes), n_kanji = 13000)
+
+        print(f"{'rows':>7} | {'time':>7} | {'rows/s':>7} | {'batch peak':>10} | {'deck':>8}")
+
+        for n in sizes:
+            path = os.path.join(tmp, f"words_{n}.txt")
+            make_word_list(path, n)
+
+            srs_app = make_srs_app(tmp)
+            start = time.perf_counter()
+            report = srs_app.import_file(path)
+            elapsed = time.perf_counter() - start
+            srs_app.close_db()
+
+            # again, traced, with the peak reset after every batch
+            srs_app = make_srs_app(tmp)
+            batch_peaks = []
+
+            def on_progress(report) -> None:
+                current, peak = tracemalloc.get_traced_memory()
+                batch_peaks.append(peak - current)
+                tracemalloc.reset_peak()
+
+                return None
+
+            tracemalloc.start()
+            srs_app.import_file(path, on_progress = on_progress)
+            deck, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            srs_app.close_db()
+
+            print(f"{n:>7} | {elapsed:5.1f} s | {report.lines / elapsed:7.0f} | {statistics.median(batch_peaks) / 1e6:7.2f} MB | {deck / 1e6:5.1f} MB")
+
+    return None
+
+if __name__ == "__main__":
+    main()
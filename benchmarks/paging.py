@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_srs_db, make_full_db
+from src.dataclasses import SrsConfig
+from src.keyset import row_cursor
+from src.predicates import all_of, in_list
+from src.srs_app import SrsApp
+
+
+# latency of one page of the add table, for every jlpt filter and sort column
+# usage: python benchmarks/paging.py [N_VOCAB]
+# "first" is the first page; "page 50" starts from the cursor of page 49, like clicking through the table does
+# "offset 50" is the same page through LIMIT/OFFSET, which has to step over every row before it
+# filters with fewer pages than that are timed on their last page, whose number is shown next to them
+
+CONDITIONS = [in_list("v.JlptLevel", [1, 2, 3, 4, 5]), in_list("v.JlptLevel", [1]), in_list("v.JlptLevel", [5]), all_of()]
+ROWS_PER_PAGE = 100
+DEEP_PAGE = 50
+
+def time_ms(f) -> tuple:
+    start = time.perf_counter()
+    result = f()
+
+    return (time.perf_counter() - start) * 1000, result
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 180000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_to_srs_db = os.path.join(tmp, "srs.db")
+        path_to_full_db = os.path.join(tmp, "full.db")
+
+        make_srs_db(path_to_srs_db, 5000)
+        make_full_db(path_to_full_db, n_vocab = n, n_kanji = 13000)
+
+        srs_app = SrsApp(SrsConfig(srs_interval = {"0": {"value": 4, "unit": "hours"}}, path_to_srs_db = path_to_srs_db, path_to_full_db = path_to_full_db))
+
+        elapsed, _ = time_ms(srs_app.init_db)
+        print(f"init_db (indexes the dictionary on the first run): {elapsed:.0f} ms")
+
+        print(f"{'jlpt':>30} {'sort':>9} | {'first':>8} | {f'page {DEEP_PAGE}':>8} | {f'offset {DEEP_PAGE}':>9}")
+
+        for condition in CONDITIONS:
+            for sort, sort_col in srs_app.vocab_sort_cols.items():
+                first, rows = time_ms(lambda: srs_app.discover_new_vocab(condition, sort = sort, limit = ROWS_PER_PAGE))
+
+                # the cursor that starts the deep page
+                # a short page is the last one, so there's nothing after it to walk to
+                after = None
+                page = 1
+
+                while page < DEEP_PAGE and len(rows) == ROWS_PER_PAGE:
+                    after = row_cursor(rows[-1])
+                    rows = srs_app.discover_new_vocab(condition, sort = sort, after = after, limit = ROWS_PER_PAGE)
+                    page += 1
+
+                deep, _ = time_ms(lambda: srs_app.discover_new_vocab(condition, sort = sort, after = after, limit = ROWS_PER_PAGE))
+
+                q = f"""
+                    SELECT v.ID FROM VocabSet AS v
+                    WHERE {condition.sql}
+                    AND NOT EXISTS (SELECT 1 FROM {srs_app.name_srs_table} AS srs WHERE srs.AssociatedVocab = v.KanjiWriting)
+                    ORDER BY {sort_col} IS NULL, {sort_col}, v.ID
+                    LIMIT {ROWS_PER_PAGE} OFFSET {(page - 1) * ROWS_PER_PAGE};
+                    """
+
+                with srs_app.pool.reader() as conn:
+                    offset, _ = time_ms(lambda: conn.execute(q, condition.params).fetchall())
+
+                print(f"{(condition.params or ('any',))[0]:>30} {sort:>9} | {first:5.1f} ms | {deep:5.1f} ms | {offset:6.1f} ms{f' (page {page})' if page < DEEP_PAGE else ''}")
+
+        srs_app.close_db()
+
+    return None
+
+if __name__ == "__main__":
+    main()
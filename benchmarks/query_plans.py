@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_srs_db, make_full_db
+from src.migrations import migrate
+
+
+# shows the query plans for the hot srs queries before and after the schema migrations
+# usage: python benchmarks/query_plans.py [N_ITEMS]
+# the plans should switch from SCAN SrsEntrySet to SEARCH/covering index lookups
+
+SRS_TABLE = "srs_db.SrsEntrySet"
+
+QUERIES = {
+    "due reviews": f"SELECT * FROM {SRS_TABLE} WHERE NextAnswerDateISO < current_timestamp;",
+    "due today": f"SELECT COUNT(*) FROM {SRS_TABLE} WHERE NextAnswerDateISO < datetime('now', 'localtime', 'start of day', '+1 day', '-1 second', 'utc');",
+    "grade count": f"SELECT CurrentGrade, COUNT(*) FROM {SRS_TABLE} WHERE CurrentGrade = 3;",
+    "success ratio": f"SELECT SUM(FailureCount), SUM(SuccessCount) FROM {SRS_TABLE};",
+    "item by id": f"SELECT * FROM {SRS_TABLE} WHERE ID = 42;",
+    "new vocab": f"""
+        SELECT COUNT(*) FROM VocabSet AS v
+        WHERE v.JlptLevel IN (1, 2, 3, 4, 5)
+        AND NOT EXISTS (SELECT 1 FROM {SRS_TABLE} AS srs WHERE srs.AssociatedVocab = v.KanjiWriting);
+        """,
+    "new kanji": f"""
+        SELECT COUNT(*) FROM KanjiSet AS k
+        WHERE k.JlptLevel IN (1, 2, 3, 4, 5)
+        AND NOT EXISTS (SELECT 1 FROM {SRS_TABLE} AS srs WHERE srs.AssociatedKanji = k.Character);
+        """,
+}
+
+def show_plans(conn: sqlite3.Connection, label: str) -> None:
+    print(f"== {label} ==")
+
+    for name, q in QUERIES.items():
+        plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + q)]
+
+        start = time.perf_counter()
+        for _ in range(10):
+            conn.execute(q).fetchall()
+        elapsed = (time.perf_counter() - start) / 10
+
+        print(f"{name:>14}: {elapsed * 1000:8.2f} ms | {' / '.join(plan)}")
+
+    return None
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_to_srs_db = os.path.join(tmp, "srs.db")
+        path_to_full_db = os.path.join(tmp, "full.db")
+
+        make_srs_db(path_to_srs_db, n)
+        make_full_db(path_to_full_db, n_vocab = n, n_kanji = n // 4)
+
+        conn = sqlite3.connect(path_to_full_db)
+        conn.execute(f"ATTACH DATABASE '{path_to_srs_db}' AS srs_db;")
+
+        show_plans(conn, f"before migrations ({n} items)")
+
+        version = migrate(conn, "srs_db")
+
+        show_plans(conn, f"after migrations (schema version {version})")
+
+        conn.close()
+
+    return None
+
+if __name__ == "__main__":
+    main()
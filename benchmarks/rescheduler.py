@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tomllib
+
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import DATE_FORMAT, make_srs_db
+from src.dataclasses import ReschedulePolicy
+from src.rescheduler import reschedule
+
+
+# time to reschedule the overdue backlog of a deck, one item at a time the way update_review_item writes them
+# (a date worked out per item and an UPDATE each), and through rescheduler.py's arrays and single transaction
+# usage: python benchmarks/rescheduler.py [N_ITEMS ...]
+# about a third of a synthetic deck is overdue
+
+PATH_TO_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.toml")
+
+# postpones every overdue item by half of its grade's interval, item by item
+def postpone_per_item(conn: sqlite3.Connection, srs_interval: dict) -> int:
+    now = datetime.now(timezone.utc)
+    rows = conn.execute("SELECT ID, CurrentGrade, NextAnswerDateISO FROM SrsEntrySet WHERE NextAnswerDateISO < ?;", (now.strftime(DATE_FORMAT),)).fetchall()
+
+    for item_id, grade, _ in rows:
+        interval = srs_interval[str(grade)]
+
+        if interval["value"] == -1:
+            continue
+
+        delay = timedelta(hours = interval["value"]) if interval["unit"] == "hours" else timedelta(days = interval["value"])
+        conn.execute("UPDATE SrsEntrySet SET NextAnswerDateISO = ? WHERE ID = ?;", ((now + delay / 2).strftime(DATE_FORMAT), item_id))
+        conn.commit()
+
+    return len(rows)
+
+# a fresh copy of the deck on disk for every run, so they all start from the same backlog
+def copy_db(conn: sqlite3.Connection, path: str) -> sqlite3.Connection:
+    if os.path.exists(path):
+        os.remove(path)
+
+    snapshot = sqlite3.connect(path)
+    conn.backup(snapshot)
+
+    return snapshot
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [5000, 50000]
+
+    with open(PATH_TO_CONFIG, "rb") as f:
+        srs_interval = tomllib.load(f)["srs_interval"]
+
+    policies = {
+        "postpone": ReschedulePolicy(policy = "postpone", postpone_fraction = 0.5),
+        "spread": ReschedulePolicy(policy = "spread", days = 7, daily_cap = 2000),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"srs_{n}.db")
+            make_srs_db(path, n)
+
+            conn = sqlite3.connect(path)
+
+            # per item writes get slow quickly, so the biggest decks skip them
+            if n <= 10000:
+                snapshot = copy_db(conn, os.path.join(tmp, "snapshot.db"))
+
+                start = time.perf_counter()
+                overdue = postpone_per_item(snapshot, srs_interval)
+                print(f"{n:>7} items, {overdue} overdue | per item postpone: {time.perf_counter() - start:7.3f}s")
+                snapshot.close()
+
+            for name, policy in policies.items():
+                for dry_run in (True, False):
+                    snapshot = copy_db(conn, os.path.join(tmp, "snapshot.db"))
+
+                    report = reschedule(snapshot, policy, srs_interval, dry_run = dry_run)
+                    mode = "dry run" if dry_run else "applied"
+                    print(f"{n:>7} items, {report.backlog} overdue | {name:>8} {mode}: {report.seconds:7.3f}s, {len(report.moves)} moved")
+                    snapshot.close()
+
+            conn.close()
+
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cards import Card, ReviewItem
+from src.review_queue import ReviewQueue
+
+
+# per-answer cost of the rotating review set for growing max_reviews_at_once, as a plain list (pop(index) on a right answer,
+# a reshuffle of the whole list per item added) and as a ReviewQueue, and how often an item's two cards were shown back to back
+# usage: python benchmarks/review_queue.py [MAX_REVIEWS_AT_ONCE ...]
+# answers are right 80% of the time; an item is replaced by a new one once both of its cards are right
+
+N_ANSWERS = 50000
+
+def make_cards(n: int) -> list:
+    cards = []
+
+    for i in range(n):
+        item = ReviewItem(i, "vocab", f"v{i}", f"よみ{i}", f"meaning {i}")
+        cards.append((Card(item, "reading"), Card(item, "meaning")))
+
+    return cards
+
+class ListSet:
+    def __init__(self):
+        self.cards = []
+        self.index = 0
+
+    def add(self, pair) -> None:
+        self.cards.extend(pair)
+        random.shuffle(self.cards)
+
+        return None
+
+    def current(self):
+        if self.index >= len(self.cards):
+            self.index = 0
+
+        return self.cards[self.index]
+
+    def remove_current(self) -> None:
+        self.cards.pop(self.index)
+
+        return None
+
+    def advance(self) -> None:
+        self.index += 1
+
+        return None
+
+class QueueSet:
+    def __init__(self):
+        self.queue = ReviewQueue()
+
+    def add(self, pair) -> None:
+        for card in pair:
+            self.queue.add(card)
+
+        return None
+
+    def current(self):
+        return self.queue.current()
+
+    def remove_current(self) -> None:
+        self.queue.remove_current()
+
+        return None
+
+    def advance(self) -> None:
+        self.queue.advance()
+
+        return None
+
+# mean seconds per answer, and the share of answers whose card followed one of its own item
+def run(table, pairs: list, size: int) -> tuple[float, float]:
+    random.seed(0)
+    rng = random.Random(1)
+    right = [rng.random() < 0.8 for _ in range(N_ANSWERS)]
+
+    for pair in pairs[:size]:
+        table.add(pair)
+
+    incoming = size
+    left = {pair[0].item.item_id: 2 for pair in pairs[:size]}
+    previous = None
+    back_to_back = 0
+
+    start = time.perf_counter()
+
+    for correct in right:
+        card = table.current()
+        item_id = card.item.item_id
+
+        if previous == item_id:
+            back_to_back += 1
+
+        previous = item_id
+
+        if correct:
+            table.remove_current()
+            left[item_id] -= 1
+
+            if left[item_id] == 0:
+                del left[item_id]
+                pair = pairs[incoming]
+                incoming += 1
+                left[pair[0].item.item_id] = 2
+                table.add(pair)
+
+        table.advance()
+
+    elapsed = time.perf_counter() - start
+
+    return elapsed / N_ANSWERS, back_to_back / N_ANSWERS
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 500, 2000]
+
+    print(f"{'at once':>7} | {'list':>10} {'back to back':>12} | {'queue':>10} {'back to back':>12}")
+
+    for size in sizes:
+        # at most one new item per two answers, so every item that comes in is a new one
+        pairs = make_cards(size + N_ANSWERS // 2 + 1)
+
+        old, old_repeats = run(ListSet(), pairs, size)
+        new, new_repeats = run(QueueSet(), pairs, size)
+
+        print(f"{size:>7} | {old * 1e6:7.2f} us {old_repeats:12.2%} | {new * 1e6:7.2f} us {new_repeats:12.2%}")
+
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyokaka import okaka
+
+from src.romaji import RomajiConverter, to_kana
+
+
+# per keystroke latency of reading input, the way ReviewTab.handle_key used to convert it (pyokaka over the whole buffer,
+# twice a key, and a convert per letter trimmed on backspace) and through a RomajiConverter
+# usage: python benchmarks/romaji.py [N_SYLLABLES ...]
+# pyokaka isn't used by the app anymore, so it's only in benchmarks/requirements.txt
+# typing and deleting the whole answer, one key at a time; the converter should cost the same per key however long it is
+
+SYLLABLES = ["kyo", "u", "shi", "tsu", "ji", "do", "u", "sha", "ga", "kko", "u", "no", "ma", "e"]
+
+def make_reading(n: int) -> str:
+    return "".join(SYLLABLES[i % len(SYLLABLES)] for i in range(n))
+
+def type_okaka(romaji: str) -> None:
+    text_buffer = ""
+
+    for ch in romaji:
+        text_buffer += ch
+        okaka.convert(text_buffer)
+        okaka.convert(text_buffer)
+
+    while text_buffer:
+        current_length = len(okaka.convert(text_buffer))
+
+        while len(okaka.convert(text_buffer)) == current_length and current_length > 0:
+            text_buffer = text_buffer[:-1]
+
+        okaka.convert(text_buffer)
+
+    return None
+
+def type_converter(romaji: str) -> None:
+    converter = RomajiConverter()
+
+    for ch in romaji:
+        converter.push(ch)
+        converter.text
+
+    while converter.pieces or converter.pending:
+        converter.pop()
+        converter.text
+
+    return None
+
+def time_us_per_key(f, romaji: str, repeats: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(repeats):
+        f(romaji)
+
+    return (time.perf_counter() - start) / repeats / (2 * len(romaji)) * 1e6
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [4, 16, 64, 256]
+
+    print(f"{'syllables':>9} {'letters':>7} | {'pyokaka':>10} | {'converter':>10}")
+
+    for n in sizes:
+        romaji = make_reading(n)
+        assert to_kana(romaji) == okaka.convert(romaji)
+
+        repeats = max(1, 2000 // n)
+        old = time_us_per_key(type_okaka, romaji, max(1, repeats // 10))
+        new = time_us_per_key(type_converter, romaji, repeats)
+
+        print(f"{n:>9} {len(romaji):>7} | {old:7.1f} us | {new:7.1f} us")
+
+    return None
+
+if __name__ == "__main__":
+    main()
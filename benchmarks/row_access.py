@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.synthetic import make_srs_db
+from src.rows import ReviewCounts, fetch_dicts, fetch_one
+
+
+# compares the per-answer db work of the old pandas path with the plain cursor path
+# usage: python benchmarks/row_access.py [N_ITEMS] [N_ANSWERS]
+
+Q_COUNTS_INLINE = "SELECT CurrentGrade, FailureCount, SuccessCount FROM SrsEntrySet WHERE ID = {item_id};"
+Q_COUNTS = "SELECT CurrentGrade, FailureCount, SuccessCount FROM SrsEntrySet WHERE ID = ?;"
+Q_ROW_INLINE = "SELECT * FROM SrsEntrySet WHERE ID = {item_id};"
+Q_ROW = "SELECT * FROM SrsEntrySet WHERE ID = ?;"
+
+def old_answer(conn, item_id):
+    counts = pd.read_sql_query(Q_COUNTS_INLINE.format(item_id = item_id), conn).to_dict("records")[0]
+    row = pd.read_sql_query(Q_ROW_INLINE.format(item_id = item_id), conn).to_dict("records")
+
+    return counts, row
+
+def new_answer(conn, item_id):
+    counts = ReviewCounts(*fetch_one(conn, Q_COUNTS, (item_id,)))
+    row = fetch_dicts(conn, Q_ROW, (item_id,))
+
+    return counts, row
+
+# mean seconds per call, and the peak traced memory over all calls
+def measure(f, conn, item_ids) -> tuple[float, float]:
+    start = time.perf_counter()
+    for item_id in item_ids:
+        f(conn, item_id)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    for item_id in item_ids:
+        f(conn, item_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / len(item_ids), peak
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    n_answers = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_to_srs_db = os.path.join(tmp, "srs.db")
+        make_srs_db(path_to_srs_db, n)
+
+        conn = sqlite3.connect(path_to_srs_db)
+        item_ids = list(range(1, n + 1, max(1, n // n_answers)))[:n_answers]
+
+        # warm up the page cache so both paths start equal
+        new_answer(conn, 1)
+        old_answer(conn, 1)
+
+        for name, f in (("pandas", old_answer), ("cursor", new_answer)):
+            per_call, peak = measure(f, conn, item_ids)
+            print(f"{name:>7}: {per_call * 1e6:9.1f} us per answer | peak {peak / 1024:8.1f} KiB traced over {len(item_ids)} answers")
+
+        conn.close()
+
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_srs_db, make_full_db
+from src.dataclasses import SrsConfig
+from src.predicates import Predicate, in_list
+from src.search_index import build_search_index
+from src.srs_app import SrsApp
+
+
+# first page latency of add tab searches, through the search index and through LIKE scans of the dictionary
+# and of edit tab searches, through the srs db's full-text index and through the old comma-list LIKE filters
+# usage: python benchmarks/search.py [N_VOCAB ...]
+# with the indexes, the numbers should stay about the same as the dictionary or the deck grows
+
+SEARCHES = [
+    ({"kana": "よみ4321"}, "exact"),
+    ({"kana": "ヨミ43"}, "prefix"),
+    ({"kana": "み432"}, "substring"),
+    ({"meaning": "meaning 4321-1"}, "exact"),
+]
+
+# (search for filter_study_items, the LIKE condition the editor used to build for it)
+STUDY_SEARCHES = [
+    ({"meaning": "meaning 4321"}, Predicate("',' || Meanings || ',' LIKE '%,' || ? || ',%'", ("meaning 4321",))),
+    ({"reading": "よみ4321"}, Predicate("',' || Readings || ',' LIKE '%,' || ? || ',%'", ("よみ4321",))),
+]
+
+def time_ms(f) -> float:
+    start = time.perf_counter()
+    f()
+
+    return (time.perf_counter() - start) * 1000
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20000, 80000, 180000]
+
+    print(f"{'vocab':>7} {'search':>36} | {'index':>8} | {'scan':>9}")
+
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path_to_srs_db = os.path.join(tmp, "srs.db")
+            path_to_full_db = os.path.join(tmp, "full.db")
+            path_to_search_db = os.path.join(tmp, "search.db")
+
+            make_srs_db(path_to_srs_db, 1000)
+            make_full_db(path_to_full_db, n_vocab = n, n_kanji = 13000)
+            build_search_index(path_to_full_db, path_to_search_db)
+
+            srs_app = SrsApp(SrsConfig(
+                srs_interval = {"0": {"value": 4, "unit": "hours"}},
+                path_to_srs_db = path_to_srs_db,
+                path_to_full_db = path_to_full_db,
+                path_to_search_db = path_to_search_db,
+            ))
+            srs_app.init_db()
+            id_search_db = srs_app.id_search_db
+
+            for search, mode in SEARCHES:
+                f = lambda: srs_app.discover_new_vocab(in_list("v.JlptLevel", [1, 2, 3, 4, 5]), search, mode)
+
+                srs_app.id_search_db = id_search_db
+                indexed = time_ms(f)
+
+                srs_app.id_search_db = None
+                scanned = time_ms(f)
+
+                print(f"{n:>7} {f'{mode} {search}':>36} | {indexed:5.1f} ms | {scanned:6.1f} ms")
+
+            srs_app.close_db()
+
+    print(f"{'items':>7} {'editor search':>36} | {'index':>8} | {'scan':>9}")
+
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path_to_srs_db = os.path.join(tmp, "srs.db")
+            path_to_full_db = os.path.join(tmp, "full.db")
+
+            make_srs_db(path_to_srs_db, n)
+            make_full_db(path_to_full_db, n_vocab = 100, n_kanji = 100)
+
+            srs_app = SrsApp(SrsConfig(
+                srs_interval = {"0": {"value": 4, "unit": "hours"}},
+                path_to_srs_db = path_to_srs_db,
+                path_to_full_db = path_to_full_db,
+            ))
+            srs_app.init_db()
+
+            for search, condition in STUDY_SEARCHES:
+                indexed = time_ms(lambda: srs_app.filter_study_items("vocab", search = search, sort = "rank"))
+                scanned = time_ms(lambda: srs_app.filter_study_items("vocab", condition = condition))
+
+                print(f"{n:>7} {str(search):>36} | {indexed:5.1f} ms | {scanned:6.1f} ms")
+
+            srs_app.close_db()
+
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_srs_db, make_full_db
+
+
+# cold-start budget for main.py
+# 1. import time of main.py itself, from python -X importtime
+# 2. time until the server answers its first request, and the first page load after that
+# 3. resident memory of the server processes once they are idle
+# usage: python benchmarks/startup.py [N_SLOWEST_IMPORTS]
+
+PATH_TO_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# packages that should not be imported until a tab actually needs them
+# (PIL is not on the list; nicegui imports it itself)
+LAZY_PACKAGES = ["pandas", "numpy", "rapidfuzz", "pyokaka", "cairosvg", "google.cloud.vision", "grpc", "tomlkit"]
+
+def measure_imports(n_slowest: int) -> None:
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd = PATH_TO_REPO, capture_output = True, text = True)
+
+    # lines look like: "import time:  self [us] | cumulative | imported package"
+    imports = []
+    for line in res.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)", line)
+
+        if match:
+            imports.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+
+    total = sum(cumulative for cumulative, depth, _ in imports if depth == 1)
+    names = {name for _, _, name in imports}
+
+    print(f"import main: {total / 1000:.1f} ms total")
+
+    for cumulative, _, name in sorted(imports, reverse = True)[:n_slowest]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    for package in LAZY_PACKAGES:
+        print(f"  {package:>20}: {'imported at startup!' if package in names else 'lazy'}")
+
+    return None
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+
+        return s.getsockname()[1]
+
+# resident memory of a process and all of its children, in MiB
+def get_tree_rss(pid: int) -> float:
+    pids = [pid]
+    rss = 0
+
+    while pids:
+        current = pids.pop()
+
+        try:
+            with open(f"/proc/{current}/status") as f:
+                rss += next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+
+        except (FileNotFoundError, StopIteration):
+            continue
+
+    return rss / 1024
+
+def measure_server() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        make_srs_db(os.path.join(tmp, "srs.db"), 5000)
+        make_full_db(os.path.join(tmp, "full.db"), 5000, 1000)
+
+        # same config as the repo, pointed at throwaway dbs
+        with open(os.path.join(PATH_TO_REPO, "config.toml"), "r") as f:
+            config = f.read()
+
+        config = re.sub(r'path_to_srs_db = ".*"', f'path_to_srs_db = "{tmp}/srs.db"', config)
+        config = re.sub(r'path_to_full_db = ".*"', f'path_to_full_db = "{tmp}/full.db"', config)
+
+        with open(os.path.join(tmp, "config.toml"), "w") as f:
+            f.write(config)
+
+        port = get_free_port()
+        url = f"http://localhost:{port}/"
+
+        start = time.perf_counter()
+        server = subprocess.Popen([sys.executable, os.path.join(PATH_TO_REPO, "main.py"), str(port)], cwd = tmp, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+
+        try:
+            while True:
+                try:
+                    with urllib.request.urlopen(url, timeout = 30) as res:
+                        res.read()
+
+                    break
+
+                except OSError:
+                    if time.perf_counter() - start > 60:
+                        raise TimeoutError("server did not start")
+
+                    time.sleep(0.05)
+
+            first_request = time.perf_counter() - start
+
+            page_start = time.perf_counter()
+            with urllib.request.urlopen(url, timeout = 30) as res:
+                res.read()
+            page_load = time.perf_counter() - page_start
+
+            time.sleep(3)
+
+            print(f"time to first request: {first_request * 1000:.0f} ms")
+            print(f"second page load: {page_load * 1000:.0f} ms")
+            print(f"idle rss: {get_tree_rss(server.pid):.1f} MiB")
+
+        finally:
+            server.terminate()
+            server.wait()
+
+    return None
+
+def main() -> None:
+    n_slowest = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    measure_imports(n_slowest)
+    measure_server()
+
+    return None
+
+if __name__ == "__main__":
+    main()
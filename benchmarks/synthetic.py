@@ -0,0 +1,136 @@
+import os
+import random
+import sqlite3
+
+from datetime import datetime, timedelta, timezone
+
+
+# helpers to build throwaway databases for the benchmarks
+# the srs table schema is copied from the shipped db, so the benchmarks always match the real thing
+PATH_TO_TEMPLATE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db", "srs.db")
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# creates an srs db with n items spread over all grades
+# about a third of the items are due, the rest are spread over the next month
+def make_srs_db(path: str, n: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+
+    with sqlite3.connect(PATH_TO_TEMPLATE_DB) as template:
+        (schema,) = template.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'SrsEntrySet';").fetchone()
+
+    conn = sqlite3.connect(path)
+    conn.execute(schema)
+
+    now = datetime.now(timezone.utc)
+    rows = []
+
+    for i in range(1, n + 1):
+        grade = rng.randint(0, 8)
+        next_answer = None
+
+        if grade < 8:
+            next_answer = (now + timedelta(hours = rng.uniform(-24 * 15, 24 * 30))).strftime(DATE_FORMAT)
+
+        is_kanji = i % 4 == 0
+        writing = f"k{i}" if is_kanji else f"v{i}"
+
+        rows.append((
+            i, f"meaning {i},other {i}", f"よみ{i}", grade, rng.randint(0, 5), rng.randint(0, 20),
+            None if is_kanji else writing, writing if is_kanji else None,
+            None, None, None, 0, now.strftime(DATE_FORMAT), now.strftime(DATE_FORMAT), next_answer,
+        ))
+
+    conn.executemany("INSERT INTO SrsEntrySet VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);", rows)
+    conn.commit()
+    conn.close()
+
+    return None
+
+# creates an srs db the way houhou leaves it, with n items: dates are .NET ticks, and there are no ISO columns
+def make_houhou_db(path: str, n: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE SrsEntrySet (
+            ID INTEGER PRIMARY KEY, CreationDate INTEGER, NextAnswerDate INTEGER, Meanings TEXT, Readings TEXT,
+            CurrentGrade INTEGER, FailureCount INTEGER, SuccessCount INTEGER, AssociatedVocab TEXT, AssociatedKanji TEXT,
+            MeaningNote TEXT, ReadingNote TEXT, SuspensionDate INTEGER, Tags TEXT, LastUpdateDate INTEGER, IsDeleted INTEGER, ServerId INTEGER
+        );
+        """)
+
+    # ticks of a utc datetime
+    ticks = lambda date: (int(date.timestamp()) + 62135596800) * 10000000
+
+    now = datetime.now(timezone.utc)
+    rows = []
+
+    for i in range(1, n + 1):
+        grade = rng.randint(0, 8)
+        next_answer = ticks(now + timedelta(hours = rng.uniform(-24 * 15, 24 * 30))) if grade < 8 else None
+        suspension = ticks(now) if rng.random() < 0.05 else None
+        is_kanji = i % 4 == 0
+        writing = f"k{i}" if is_kanji else f"v{i}"
+
+        rows.append((
+            i, ticks(now - timedelta(days = rng.uniform(0, 900))), next_answer, f"meaning {i},other {i}", f"よみ{i}",
+            grade, rng.randint(0, 5), rng.randint(0, 20), None if is_kanji else writing, writing if is_kanji else None,
+            None, None, suspension, None, ticks(now), 0, None,
+        ))
+
+    conn.executemany("INSERT INTO SrsEntrySet VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);", rows)
+    conn.commit()
+    conn.close()
+
+    return None
+
+# creates a tiny houhou-like dictionary db with the tables and columns srs.ly reads
+def make_full_db(path: str, n_vocab: int, n_kanji: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE VocabSet (ID INTEGER PRIMARY KEY, KanjiWriting TEXT, KanaWriting TEXT, IsCommon INTEGER, FrequencyRank INTEGER, JlptLevel INTEGER, WkLevel INTEGER, WikiRank INTEGER);
+        CREATE TABLE VocabMeaningSet (ID INTEGER PRIMARY KEY, Meaning TEXT);
+        CREATE TABLE VocabEntityVocabMeaning (VocabEntity_ID INTEGER, Meanings_ID INTEGER);
+        CREATE TABLE VocabCategorySet (ID INTEGER PRIMARY KEY, Label TEXT, ShortName TEXT);
+        CREATE TABLE VocabMeaningVocabCategory (VocabMeaningVocabCategory_VocabCategory_ID INTEGER, Categories_ID INTEGER);
+        CREATE TABLE KanjiSet (ID INTEGER PRIMARY KEY, Character TEXT, OnYomi TEXT, KunYomi TEXT, Nanori TEXT, JlptLevel INTEGER, WkLevel INTEGER, MostUsedRank INTEGER, NewspaperRank INTEGER);
+        CREATE TABLE KanjiMeaningSet (ID INTEGER PRIMARY KEY, Kanji_ID INTEGER, Language TEXT, Meaning TEXT);
+    """)
+
+    conn.executemany("INSERT INTO VocabCategorySet VALUES (?, ?, ?);", [(1, "noun", "n"), (2, "verb", "v"), (3, "adjective", "adj")])
+
+    jlpt = lambda: rng.choice([1, 2, 3, 4, 5, None])
+    rank = lambda: rng.choice([rng.randint(1, 50000), None])
+
+    conn.executemany(
+        "INSERT INTO VocabSet VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+        [(i, f"v{i}", f"よみ{i},ヨミ{i}", rng.randint(0, 1), rank(), jlpt(), rng.randint(1, 60), rank()) for i in range(1, n_vocab + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO VocabMeaningSet VALUES (?, ?);",
+        [(i * 2 + j, f"meaning {i}-{j}") for i in range(1, n_vocab + 1) for j in range(2)]
+    )
+    conn.executemany(
+        "INSERT INTO VocabEntityVocabMeaning VALUES (?, ?);",
+        [(i, i * 2 + j) for i in range(1, n_vocab + 1) for j in range(2)]
+    )
+    conn.executemany(
+        "INSERT INTO VocabMeaningVocabCategory VALUES (?, ?);",
+        [(i * 2 + j, rng.randint(1, 3)) for i in range(1, n_vocab + 1) for j in range(2)]
+    )
+    conn.executemany(
+        "INSERT INTO KanjiSet VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);",
+        [(i, f"k{i}", f"オン{i}", f"くん{i}", "", jlpt(), rng.randint(1, 60), rank(), rank()) for i in range(1, n_kanji + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO KanjiMeaningSet VALUES (?, ?, ?, ?);",
+        [(i * 2 + j, i, "en", f"kanji meaning {i}-{j}") for i in range(1, n_kanji + 1) for j in range(2)]
+    )
+
+    conn.commit()
+    conn.close()
+
+    return None
@@ -1,15 +1,11 @@
+import importlib
 import tomllib
 
 from nicegui import ui, app
 
 from src.srs_app import SrsApp
-from src.dataclasses import AppConfig, SrsConfig
-from src.nicegui.main_tab import MainTab
-from src.nicegui.review_tab import ReviewTab
-from src.nicegui.add_tab import AddTab
-from src.nicegui.edit_tab import EditTab
-from src.nicegui.search_tab import SearchTab
-from src.nicegui.options_tab import OptionsTab
+from src.async_srs_app import AsyncSrsApp
+from src.dataclasses import AppConfig, ReschedulePolicy, SrsConfig
 
 
 def check_device(config: AppConfig) -> None:
@@ -74,6 +70,18 @@ def setup_dark_mode() -> None:
 
     return None
 
+# tabs in the order they are shown: (label, module, class)
+# each tab is built the first time it is opened and kept alive after that,
+# so a page load only pays for the tab that is visible (and imports its module on first use)
+TABS = [
+    ("Main", "src.nicegui.main_tab", "MainTab"), # stats, refreshed automatically
+    ("Review", "src.nicegui.review_tab", "ReviewTab"), # srs review cards one by one
+    ("Add Items", "src.nicegui.add_tab", "AddTab"),
+    ("Edit Items", "src.nicegui.edit_tab", "EditTab"),
+    ("Search", "src.nicegui.search_tab", "SearchTab"), # draw and search
+    ("Options", "src.nicegui.options_tab", "OptionsTab"),
+]
+
 def create_page(config: AppConfig) -> None:
 
     # setup
@@ -89,40 +97,33 @@ def create_page(config: AppConfig) -> None:
 
     # define our tabs we will use
     with tabs:
-        main_tab = ui.tab("Main")
-        review_tab = ui.tab("Review")
-        add_tab = ui.tab("Add Items")
-        edit_tab = ui.tab("Edit Items")
-        search_tab = ui.tab("Search")
-        options_tab = ui.tab("Options")
+        for label, _, _ in TABS:
+            ui.tab(label)
 
-    # main tab should be the default
-    with ui.tab_panels(tabs, value = main_tab).classes("w-full"):
+    panels = dict()
+
+    def build_tab(label: str) -> None:
+        if label not in panels or panels[label]["built"]:
+            return None
 
-        # definitions for the main tab
-        # we should show stats and refresh it automatically!
-        with ui.tab_panel(main_tab):
-            MainTab(config)
+        _, module_name, class_name = next(tab for tab in TABS if tab[0] == label)
+        tab_class = getattr(importlib.import_module(module_name), class_name)
 
-        # srs review tab to show review cards one by one
-        with ui.tab_panel(review_tab):
-            ReviewTab(config)
+        with panels[label]["panel"]:
+            tab_class(config)
 
-        # add items tab
-        with ui.tab_panel(add_tab):
-            AddTab(config)
+        panels[label]["built"] = True
 
-        # edit items
-        with ui.tab_panel(edit_tab):
-            EditTab(config)
+        return None
+
+    # main tab should be the default
+    main_label = TABS[0][0]
 
-        # draw and search
-        with ui.tab_panel(search_tab):
-            SearchTab(config)
+    with ui.tab_panels(tabs, value = main_label, on_change = lambda e: build_tab(e.value)).classes("w-full"):
+        for label, _, _ in TABS:
+            panels[label] = {"panel": ui.tab_panel(label), "built": False}
 
-        # options tab
-        with ui.tab_panel(options_tab):
-            OptionsTab(config)
+    build_tab(main_label)
 
     return None
 
@@ -134,9 +135,16 @@ def main():
         srs_interval = config["srs_interval"],
         path_to_srs_db = config["path_to_srs_db"],
         path_to_full_db = config["path_to_full_db"],
+        path_to_search_db = config["path_to_search_db"],
         max_reviews_at_once = config["max_reviews_at_once"],
         entries_before_commit = config["entries_before_commit"],
-        match_score_threshold = config["match_score_threshold"]
+        review_prefetch_size = config["review_prefetch_size"],
+        review_session_timeout = config["review_session_timeout"],
+        journal_flush_interval = config["journal_flush_interval"],
+        db_readers = config["db_readers"],
+        db_cached_statements = config["db_cached_statements"],
+        match_score_threshold = config["match_score_threshold"],
+        reschedule_policy = ReschedulePolicy(**config["reschedule"])
     )
 
     srs_app = SrsApp(config_srs)
@@ -144,7 +152,9 @@ def main():
 
     config_app = AppConfig(
         srs_app = srs_app,
+        async_srs_app = AsyncSrsApp(srs_app, max_workers = config["db_workers"], default_timeout = config["db_query_timeout"]),
         debug_mode = config["debug_mode"],
+        review_input = config["review_input"],
         keybinds = config["keybinds"]
     )
 
@@ -0,0 +1,61 @@
+import re
+
+
+# answer checking for review cards
+# a card's accepted answers are split and normalized once, when its Card is made (see src/cards.py),
+# so a submit only has to normalize what was typed and score it against the prepared choices
+# readings have to match exactly, since a mistyped kana usually is a different word
+# meanings are fuzzy matched (rapidfuzz's QRatio), with and without whatever is in parentheses
+
+PARENTHESES = re.compile(r"\s*\([^)]*\)\s*")
+PARENTHESIS_CHARS = re.compile(r"[()]")
+
+class AnswerMatcher:
+    def __init__(self, card_type: str, answers: str):
+        self.card_type = card_type
+        self.answers = answers
+
+        # as they're shown after a wrong answer
+        self.valid_answers = answers.split(",")
+
+        match card_type:
+            case "reading":
+                self.choices = frozenset(answer.strip() for answer in self.valid_answers)
+
+            case "meaning":
+                choices = dict()
+
+                for answer in self.valid_answers:
+                    answer_lower = answer.strip().lower()
+                    choices[PARENTHESIS_CHARS.sub("", answer_lower)] = answer
+                    choices[PARENTHESES.sub("", answer_lower)] = answer
+
+                # already normalized, so rapidfuzz is told not to process them again
+                self.choices = list(choices)
+                self.choice_set = frozenset(self.choices)
+
+    # how well an answer matches, from 0 to 100
+    # meanings that can't reach score_cutoff are skipped without being fully scored, and score 0
+    def match(self, answer: str, score_cutoff: float = 0) -> float:
+        answer_stripped = answer.strip()
+
+        match self.card_type:
+            case "reading":
+                return 100 if answer_stripped in self.choices else 0
+
+            case "meaning":
+                answer_lower = answer_stripped.lower()
+
+                if answer_lower and answer_lower in self.choice_set:
+                    return 100
+
+                from rapidfuzz import process, fuzz
+
+                best = process.extractOne(answer_lower, self.choices, scorer = fuzz.QRatio, processor = None, score_cutoff = score_cutoff)
+
+                if best is None:
+                    return 0
+
+                return best[1]
+
+        return 0
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from src.db_pool import cancel_scope
+
+
+# awaitable facade over SrsApp for the nicegui tabs
+# every call runs on a small thread pool, so a slow search never blocks the event loop (and every other tab with it)
+# usage: await async_srs_app.discover_new_vocab(condition = ..., timeout = 5)
+class AsyncSrsApp:
+    def __init__(self, srs_app, max_workers: int = 4, default_timeout: float | None = 30.0):
+        self.srs_app = srs_app
+        self.default_timeout = default_timeout
+        self.executor = ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "srs-app")
+
+    # any SrsApp method can be awaited through the facade
+    def __getattr__(self, name: str):
+        f = getattr(self.srs_app, name)
+
+        if not callable(f):
+            raise AttributeError(name)
+
+        return partial(self.run, f)
+
+    # runs f on the thread pool
+    # on timeout or cancellation, a running read is interrupted and the error is raised to the caller
+    async def run(self, f, *args, timeout: float | None = ..., **kwargs):
+        if timeout is ...:
+            timeout = self.default_timeout
+
+        cancel = threading.Event()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, partial(self.call, cancel, f, *args, **kwargs))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            cancel.set()
+
+            raise
+
+    def call(self, cancel: threading.Event, f, *args, **kwargs):
+        with cancel_scope(cancel):
+            return f(*args, **kwargs)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait = False, cancel_futures = True)
+
+        return None
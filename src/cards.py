@@ -0,0 +1,51 @@
+from typing import NamedTuple
+
+from src.answer_matcher import AnswerMatcher
+
+
+# what a review session holds for every item it shows
+# an item is read once, into a ReviewItem that its reading card and its meaning card both point to,
+# so the set on the table costs two small cards and one tuple per item, instead of two copies of the whole row
+
+# the columns a review needs, in the order ReviewItem.from_row reads them
+REVIEW_COLUMNS = ["ID", "AssociatedKanji", "AssociatedVocab", "Readings", "Meanings", "CurrentGrade", "FailureCount", "SuccessCount"]
+
+# an item under review, as it was loaded; never changed afterwards
+class ReviewItem(NamedTuple):
+    item_id: int
+    review_type: str | None # "kanji" or "vocab"
+    prompt: str | None
+    readings: str
+    meanings: str
+
+    # a row of REVIEW_COLUMNS
+    @classmethod
+    def from_row(cls, row: tuple) -> "ReviewItem":
+        item_id, kanji, vocab, readings, meanings = row[:5]
+
+        if kanji:
+            return cls(item_id, "kanji", kanji, readings, meanings)
+
+        if vocab:
+            return cls(item_id, "vocab", vocab, readings, meanings)
+
+        return cls(item_id, None, None, readings, meanings)
+
+# one of an item's two cards
+# the matcher is the card's own, since adding a valid response changes one card's answers and not the item
+class Card:
+    __slots__ = ("item", "card_type", "matcher")
+
+    def __init__(self, item: ReviewItem, card_type: str):
+        self.item = item
+        self.card_type = card_type
+
+        match card_type:
+            case "reading":
+                self.matcher = AnswerMatcher(card_type, item.readings)
+
+            case "meaning":
+                self.matcher = AnswerMatcher(card_type, item.meanings)
+
+    def __repr__(self) -> str:
+        return f"Card({self.item.item_id}, {self.card_type!r})"
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional, Dict, Literal
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Literal, Tuple
 
 
 # init config
@@ -11,23 +11,77 @@ class AppConfig:
     is_mobile: bool = False
 
     srs_app: Optional[object] = None
+    async_srs_app: Optional[object] = None
     ui_port: int = 8080
     ui_web_title: str = "srs.ly"
     ui_storage_secret: str = "test"
     debug_mode: bool = False
 
+    # where review answers are typed: "client" (in the browser) or "server" (every key goes to the server)
+    review_input: Literal["client", "server"] = "client"
+
 # definition for an interval in config.toml
 @dataclass
 class Interval:
     value: int
     unit: Literal["hours", "days", "none"]
 
+# how an overdue backlog is rescheduled (see rescheduler.py)
+@dataclass
+class ReschedulePolicy:
+
+    # "spread": the backlog is spread over the next `days` days, with no day getting more than daily_cap reviews (0 = no cap)
+    # "postpone": every overdue item is put off by postpone_fraction of its grade's interval
+    policy: Literal["spread", "postpone"] = "spread"
+    days: int = 7
+    daily_cap: int = 200
+    postpone_fraction: float = 0.5
+
 # srs_app conf
 @dataclass
 class SrsConfig:
     srs_interval: Dict[int, Interval]
     path_to_srs_db: str
     path_to_full_db: str
+    path_to_search_db: Optional[str] = None
     max_reviews_at_once: int = 10
     entries_before_commit: int = 10
+    review_prefetch_size: int = 50
+    review_session_timeout: float = 1800.0
+    journal_flush_interval: float = 5.0
+    db_readers: int = 4
+    db_cached_statements: int = 128
     match_score_threshold: int = 85
+    reschedule_policy: ReschedulePolicy = field(default_factory = ReschedulePolicy)
+
+# outcome of one item of a bulk add or edit, in the same order the items were given
+@dataclass
+class ItemResult:
+    ok: bool
+    item_id: Optional[int] = None
+    error: Optional[str] = None
+
+# running totals of an import, updated after every batch
+@dataclass
+class ImportReport:
+    lines: int = 0
+    added: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory = list) # why rows were skipped, up to a limit
+
+# running totals of a houhou db conversion, updated after every batch
+@dataclass
+class ConversionReport:
+    rows: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+# what a reschedule moved, or would move for a dry run
+@dataclass
+class RescheduleReport:
+    dry_run: bool = True
+    backlog: int = 0 # items that were overdue
+    moves: List[Tuple[int, str, str]] = field(default_factory = list) # (id, old next answer date, new next answer date)
+    due_before: Dict[str, int] = field(default_factory = dict) # utc day -> reviews due that day, from today on
+    due_after: Dict[str, int] = field(default_factory = dict)
+    seconds: float = 0.0
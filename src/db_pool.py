@@ -0,0 +1,168 @@
+import os
+import queue
+import sqlite3
+import threading
+
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# per-thread cancel flag
+# reader connections check it while a query runs, so a caller that gave up can stop a long search
+cancel_state = threading.local()
+
+@contextmanager
+def cancel_scope(event: threading.Event):
+    cancel_state.event = event
+
+    try:
+        yield event
+
+    finally:
+        cancel_state.event = None
+
+# returning True from a progress handler makes sqlite abort the query with "interrupted"
+def is_cancelled() -> bool:
+    event = getattr(cancel_state, "event", None)
+
+    return event is not None and event.is_set()
+
+# hands out sqlite connections for SrsApp
+# every mutation goes through one writer connection, guarded by a lock
+# stats and search queries get pooled read-only connections, so with WAL they never wait on the writer
+# every connection has the dictionary db as main and the srs db attached under the same name
+# the dictionary's search index (see search_index.py) is attached too, if it has been built
+class ConnectionPool:
+    def __init__(self, path_to_full_db: str, path_to_srs_db: str, id_srs_db: str, path_to_search_db: str | None = None, id_search_db: str = "search_db", max_readers: int = 4, cached_statements: int = 128, mmap_size: int = 256 * 1024 * 1024, busy_timeout: int = 5000):
+        self.path_to_full_db = path_to_full_db
+        self.path_to_srs_db = path_to_srs_db
+        self.id_srs_db = id_srs_db
+        self.id_search_db = id_search_db
+        self.path_to_search_db = path_to_search_db if path_to_search_db and os.path.exists(path_to_search_db) else None
+        self.max_readers = max_readers
+        self.cached_statements = cached_statements # prepared statements each connection keeps, by sql text
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout # ms
+
+        self.writer_conn = None
+        self.writer_lock = threading.RLock()
+        self.readers = queue.LifoQueue()
+        self.readers_lock = threading.Lock()
+        self.n_readers = 0
+        self.closed = True
+
+    # settings every connection shares
+    def setup_conn(self, conn: sqlite3.Connection) -> None:
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout};")
+
+        for schema in ("main", self.id_srs_db):
+            conn.execute(f"PRAGMA {schema}.mmap_size = {self.mmap_size};")
+
+        return None
+
+    # opens the writer connection and switches the srs db to WAL
+    # returns the writer connection
+    def open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path_to_full_db, check_same_thread = False, cached_statements = self.cached_statements)
+        conn.execute(f"ATTACH DATABASE ? AS {self.id_srs_db};", (self.path_to_srs_db,))
+
+        if self.path_to_search_db is not None:
+            conn.execute(f"ATTACH DATABASE ? AS {self.id_search_db};", (self.path_to_search_db,))
+
+        # the dictionary db is read-only, so only the srs db needs the journal settings
+        conn.execute(f"PRAGMA {self.id_srs_db}.journal_mode = WAL;")
+        conn.execute(f"PRAGMA {self.id_srs_db}.synchronous = NORMAL;")
+        self.setup_conn(conn)
+
+        self.writer_conn = conn
+        self.closed = False
+
+        return conn
+
+    def open_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(Path(self.path_to_full_db).resolve().as_uri() + "?mode=ro", uri = True, check_same_thread = False, cached_statements = self.cached_statements)
+
+        try:
+            conn.execute(f"ATTACH DATABASE ? AS {self.id_srs_db};", (Path(self.path_to_srs_db).resolve().as_uri() + "?mode=ro",))
+
+            if self.path_to_search_db is not None:
+                conn.execute(f"ATTACH DATABASE ? AS {self.id_search_db};", (Path(self.path_to_search_db).resolve().as_uri() + "?mode=ro",))
+
+            self.setup_conn(conn)
+
+        except Exception:
+            conn.close()
+
+            raise
+
+        # only reads can be cancelled; interrupting the writer could leave half a change behind
+        conn.set_progress_handler(is_cancelled, 10000)
+
+        return conn
+
+    # borrow a read-only connection
+    # they are opened on demand, up to max_readers; after that callers wait for one to come back
+    @contextmanager
+    def reader(self):
+        try:
+            conn = self.readers.get_nowait()
+
+        except queue.Empty:
+            with self.readers_lock:
+                can_open = self.n_readers < self.max_readers
+
+                if can_open:
+                    self.n_readers += 1
+
+            if not can_open:
+                conn = self.readers.get()
+
+            # a reader that couldn't be opened gives its slot back, or after max_readers failures every caller would wait forever
+            else:
+                try:
+                    conn = self.open_reader()
+
+                except Exception:
+                    with self.readers_lock:
+                        self.n_readers -= 1
+
+                    raise
+
+        try:
+            yield conn
+
+        finally:
+
+            # don't leave a read transaction open; it would pin an old snapshot of the WAL
+            conn.rollback()
+
+            if self.closed:
+                conn.close()
+
+            else:
+                self.readers.put(conn)
+
+    # exclusive use of the writer connection
+    # re-entrant, so methods that write can call each other
+    @contextmanager
+    def writer(self):
+        with self.writer_lock:
+            yield self.writer_conn
+
+    def close(self) -> None:
+        self.closed = True
+
+        with self.writer_lock:
+            self.writer_conn.close()
+            self.writer_conn = None
+
+        while True:
+            try:
+                self.readers.get_nowait().close()
+
+            except queue.Empty:
+                break
+
+        self.n_readers = 0
+
+        return None
@@ -0,0 +1,99 @@
+import bisect
+import threading
+
+
+# sorted index of (next answer date, id) for every item that is still being reviewed
+# dates are the utc "%Y-%m-%d %H:%M:%S" strings stored in the db, so plain string comparison orders them
+# lookups are binary searches, so due counts and the next review date never have to touch the db
+# grading, the tabs' worker threads and the journal replay all write to it, so every method holds the lock
+class DueQueue:
+    def __init__(self):
+        self.keys = [] # sorted (date, id)
+        self.dates = dict() # id -> date, to find an item's key when it changes
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.keys)
+
+    # replaces the whole index with (id, date) rows from the db
+    def build(self, rows) -> None:
+        dates = {int(item_id): date for item_id, date in rows if date is not None}
+        keys = sorted((date, item_id) for item_id, date in dates.items())
+
+        with self.lock:
+            self.dates = dates
+            self.keys = keys
+
+        return None
+
+    # removes an item, if it is in the index
+    def remove(self, item_id: int) -> None:
+        item_id = int(item_id)
+
+        with self.lock:
+            date = self.dates.pop(item_id, None)
+
+            if date is None:
+                return None
+
+            i = bisect.bisect_left(self.keys, (date, item_id))
+            del self.keys[i]
+
+        return None
+
+    # moves an item to its new date
+    # items without a date (finished with their reviews) are dropped from the index
+    def update(self, item_id: int, date: str | None) -> None:
+        item_id = int(item_id)
+
+        with self.lock:
+            self.remove(item_id)
+
+            if date is not None:
+                self.dates[item_id] = date
+                bisect.insort(self.keys, (date, item_id))
+
+        return None
+
+    # moves many items at once, from (id, date) rows; re-sorting once beats inserting them one by one
+    def update_many(self, rows) -> None:
+        with self.lock:
+            for item_id, date in rows:
+                if date is None:
+                    self.dates.pop(int(item_id), None)
+
+                else:
+                    self.dates[int(item_id)] = date
+
+            self.keys = sorted((date, item_id) for item_id, date in self.dates.items())
+
+        return None
+
+    # number of items due strictly before the given timestamp
+    def count_due(self, before: str) -> int:
+        with self.lock:
+            return bisect.bisect_left(self.keys, (before,))
+
+    # an item's date, or default if it isn't in the index
+    def get_date(self, item_id: int, default = None) -> str | None:
+        with self.lock:
+            return self.dates.get(int(item_id), default)
+
+    # ids due strictly before the given timestamp, earliest first
+    def due_ids(self, before: str, limit: int | None = None) -> list:
+        with self.lock:
+            end = self.count_due(before)
+
+            if limit is not None:
+                end = min(end, limit)
+
+            return [item_id for _, item_id in self.keys[:end]]
+
+    # the earliest next answer date, or None if nothing is scheduled
+    def next_due(self) -> str | None:
+        with self.lock:
+            if not self.keys:
+                return None
+
+            return self.keys[0][0]
@@ -0,0 +1,161 @@
+import sqlite3
+import sys
+import time
+import tomllib
+
+from src.dataclasses import ConversionReport
+
+
+# conversion of a houhou srs db into the columns srs.ly reads
+# houhou stores its dates as .NET ticks (100 ns steps since 0001-01-01); each date column gets an ISO text copy ({col}ISO),
+# and optionally one in unix seconds ({col}Epoch), all four columns in one pass over the table
+# rows are converted in ID order, batch_size at a time, and every batch is committed together with how far it got
+# (in ConversionProgress), so an interrupted conversion picks up where it stopped and a finished one never runs again
+#     python -m src.houhou [path_to_srs_db] [--epoch]
+
+DATE_COLUMNS = ["LastUpdateDate", "CreationDate", "NextAnswerDate", "SuspensionDate"]
+
+# progress row name -> whether it also writes the epoch columns
+CONVERSIONS = {"houhou": False, "houhou_epoch": True}
+
+TICKS_PER_SECOND = 10000000
+TICKS_EPOCH_OFFSET = 62135596800 # seconds from 0001-01-01 to 1970-01-01
+
+# a date column as ISO text; dates that already are text are kept as they are
+def iso_expr(col: str) -> str:
+    return f"""
+        CASE
+            WHEN typeof({col}) = 'text' AND {col} GLOB '20[0-9][0-9]-*' THEN {col}
+            WHEN typeof({col}) = 'integer' THEN datetime(({col} / {TICKS_PER_SECOND}) - {TICKS_EPOCH_OFFSET}, 'unixepoch')
+            ELSE NULL
+        END"""
+
+# a date column as unix seconds
+def epoch_expr(col: str) -> str:
+    return f"""
+        CASE
+            WHEN typeof({col}) = 'text' AND {col} GLOB '20[0-9][0-9]-*' THEN CAST(strftime('%s', {col}) AS INTEGER)
+            WHEN typeof({col}) = 'integer' THEN ({col} / {TICKS_PER_SECOND}) - {TICKS_EPOCH_OFFSET}
+            ELSE NULL
+        END"""
+
+def get_columns(conn: sqlite3.Connection, schema: str, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table});")}
+
+# the conversion a table still needs (a key of CONVERSIONS), or None
+# a houhou table without the ISO columns needs one; so does one whose conversion was interrupted
+def pending_conversion(conn: sqlite3.Connection, schema: str = "main", table: str = "SrsEntrySet") -> str | None:
+    columns = get_columns(conn, schema, table)
+
+    if not set(DATE_COLUMNS) <= columns:
+        return None
+
+    if "ConversionProgress" in {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table';")}:
+        for (name,) in conn.execute(f"SELECT Name FROM {schema}.ConversionProgress WHERE Finished = 0;"):
+            if name in CONVERSIONS:
+                return name
+
+    if not {col + "ISO" for col in DATE_COLUMNS} <= columns:
+        return "houhou"
+
+    return None
+
+# converts the date columns of a houhou table, resuming an interrupted run
+# on_progress is called with the running ConversionReport after every batch
+# conn must not be in a transaction; every batch commits
+def convert_houhou_dates(conn: sqlite3.Connection, schema: str = "main", table: str = "SrsEntrySet", batch_size: int = 10000, with_epoch: bool = False, on_progress = None) -> ConversionReport:
+    name = "houhou_epoch" if with_epoch else "houhou"
+    report = ConversionReport()
+
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.ConversionProgress (
+            Name TEXT PRIMARY KEY,
+            LastID INTEGER NOT NULL,
+            Finished INTEGER NOT NULL DEFAULT 0
+        );
+        """)
+
+    progress = conn.execute(f"SELECT LastID, Finished FROM {schema}.ConversionProgress WHERE Name = ?;", (name,)).fetchone()
+    last_id, finished = progress or (0, 0)
+
+    if finished:
+        return report
+
+    # new columns go in first, on their own; adding a column is instant however big the table is
+    columns = get_columns(conn, schema, table)
+    new_columns = {col + "ISO": "TEXT" for col in DATE_COLUMNS}
+
+    if with_epoch:
+        new_columns.update({col + "Epoch": "INTEGER" for col in DATE_COLUMNS})
+
+    for col, col_type in new_columns.items():
+        if col not in columns:
+            conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {col} {col_type};")
+
+    sets = [f"{col}ISO = {iso_expr(col)}" for col in DATE_COLUMNS]
+
+    if with_epoch:
+        sets += [f"{col}Epoch = {epoch_expr(col)}" for col in DATE_COLUMNS]
+
+    q_next_batch = f"SELECT MAX(ID) FROM (SELECT ID FROM {schema}.{table} WHERE ID > ? ORDER BY ID LIMIT ?);"
+    q_update = f"""
+        UPDATE {schema}.{table}
+        SET {", ".join(sets)}
+        WHERE ID > ? AND ID <= ?;
+        """
+    q_progress = f"""
+        INSERT INTO {schema}.ConversionProgress (Name, LastID, Finished) VALUES (?, ?, ?)
+        ON CONFLICT (Name) DO UPDATE SET LastID = excluded.LastID, Finished = excluded.Finished;
+        """
+
+    start = time.perf_counter()
+
+    while True:
+        (batch_last_id,) = conn.execute(q_next_batch, (last_id, batch_size)).fetchone()
+
+        with conn:
+            if batch_last_id is None:
+                conn.execute(q_progress, (name, last_id, 1))
+
+                break
+
+            cursor = conn.execute(q_update, (last_id, batch_last_id))
+            conn.execute(q_progress, (name, batch_last_id, 0))
+
+        last_id = batch_last_id
+        report.rows += cursor.rowcount
+        report.seconds = time.perf_counter() - start
+        report.rows_per_second = report.rows / report.seconds if report.seconds > 0 else 0.0
+
+        if on_progress is not None:
+            on_progress(report)
+
+    return report
+
+def print_progress(report: ConversionReport) -> None:
+    print(f"Converted {report.rows} rows ({report.rows_per_second:.0f} rows/s)", flush = True)
+
+    return None
+
+# converts the srs db in config.toml, or the given one
+# usage: python -m src.houhou [path_to_srs_db] [--epoch]
+def main() -> None:
+    args = [arg for arg in sys.argv[1:] if arg != "--epoch"]
+
+    if args:
+        path_to_srs_db = args[0]
+
+    else:
+        with open("config.toml", "rb") as f:
+            path_to_srs_db = tomllib.load(f)["path_to_srs_db"]
+
+    conn = sqlite3.connect(path_to_srs_db)
+    report = convert_houhou_dates(conn, with_epoch = "--epoch" in sys.argv, on_progress = print_progress)
+    conn.close()
+
+    print(f"Done, {report.rows} rows in {report.seconds:.1f}s")
+
+    return None
+
+if __name__ == "__main__":
+    main()
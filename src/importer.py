@@ -0,0 +1,273 @@
+import csv
+import html
+import re
+import sqlite3
+import sys
+import tomllib
+
+from itertools import chain
+
+from src.predicates import in_list
+from src.rows import fetch_dicts
+
+
+# streaming import of word lists into the srs db
+#     python -m src.importer PATH [vocab|kanji]
+# reads csv/tsv files, anki "notes in plain text" exports, and SrsEntrySet tables (like houhou's) dumped to csv
+# the file is read and written a batch at a time (see SrsApp.import_file), so memory stays flat however long it is
+# each row is a word and, optionally, its readings, meanings and notes; whatever is missing comes from the dictionary
+# words that are already being studied, or show up twice, are skipped
+
+# header names (lowercase) -> the field their column fills
+# "vocab" and "kanji" columns also say what type the row is; a "word" is the type the import was started with
+HEADER_FIELDS = {
+    "word": "word",
+    "kanji": "word",
+    "expression": "word",
+    "japanese": "word",
+    "front": "word",
+    "vocab": "vocab",
+    "associatedvocab": "vocab",
+    "associatedkanji": "kanji",
+    "character": "kanji",
+    "readings": "readings",
+    "reading": "readings",
+    "kana": "readings",
+    "meanings": "meanings",
+    "meaning": "meanings",
+    "english": "meanings",
+    "back": "meanings",
+    "meaningnote": "meaning_notes",
+    "meaning notes": "meaning_notes",
+    "notes": "meaning_notes",
+    "readingnote": "reading_notes",
+    "reading notes": "reading_notes",
+}
+
+# without a header, the columns are in this order
+DEFAULT_FIELDS = ["word", "readings", "meanings", "meaning_notes", "reading_notes"]
+
+# anki's names for "#separator:"
+SEPARATORS = {"tab": "\t", "comma": ",", "semicolon": ";", "pipe": "|", "space": " ", "colon": ":"}
+
+# how many skipped rows the report explains
+MAX_ERRORS = 100
+
+HTML_TAG = re.compile(r"<[^>]+>")
+
+# readings and meanings of dictionary entries, by the column a word is matched against ({match})
+# a word with several entries gets its most common one, so those come first
+LOOKUPS = {
+    "vocab": [
+        ("v.KanjiWriting", """
+            SELECT
+                v.KanjiWriting AS Word,
+                v.KanaWriting AS Readings,
+                (
+                    SELECT group_concat(DISTINCT TRIM(v_meaning.Meaning)) FROM VocabEntityVocabMeaning AS v_link
+                    JOIN VocabMeaningSet AS v_meaning ON v_link.Meanings_ID = v_meaning.ID
+                    WHERE v_link.VocabEntity_ID = v.ID
+                ) AS Meanings
+            FROM VocabSet AS v
+            WHERE {match}
+            ORDER BY v.IsCommon DESC, v.WikiRank IS NULL, v.WikiRank, v.ID;
+            """),
+
+        # words written in kana only
+        ("v.KanaWriting", """
+            SELECT
+                v.KanaWriting AS Word,
+                v.KanaWriting AS Readings,
+                (
+                    SELECT group_concat(DISTINCT TRIM(v_meaning.Meaning)) FROM VocabEntityVocabMeaning AS v_link
+                    JOIN VocabMeaningSet AS v_meaning ON v_link.Meanings_ID = v_meaning.ID
+                    WHERE v_link.VocabEntity_ID = v.ID
+                ) AS Meanings
+            FROM VocabSet AS v
+            WHERE {match}
+            ORDER BY v.IsCommon DESC, v.WikiRank IS NULL, v.WikiRank, v.ID;
+            """),
+    ],
+    "kanji": [
+        ("k.Character", """
+            SELECT
+                k.Character AS Word,
+                CASE
+                    WHEN TRIM(k.OnYomi) != '' THEN k.OnYomi
+                    WHEN TRIM(k.KunYomi) != '' THEN k.KunYomi
+                    WHEN TRIM(k.Nanori) != '' THEN k.Nanori
+                END AS Readings,
+                (SELECT group_concat(DISTINCT TRIM(k_meaning.Meaning)) FROM KanjiMeaningSet AS k_meaning WHERE k_meaning.Kanji_ID = k.ID) AS Meanings
+            FROM KanjiSet AS k
+            WHERE {match}
+            ORDER BY k.ID;
+            """),
+    ],
+}
+
+# a cell as plain text
+def clean_cell(text: str, is_html: bool) -> str:
+    if is_html:
+        text = html.unescape(HTML_TAG.sub("", text))
+
+    return text.strip()
+
+# the field each column of a header row holds, or None if the row isn't a header
+def read_header(row: list) -> list | None:
+    fields = [HEADER_FIELDS.get(cell.strip().lower()) for cell in row]
+
+    if not any(field in ("word", "vocab", "kanji") for field in fields):
+        return None
+
+    return fields
+
+# yields the rows of a file as entries for SrsApp.add_review_entries, one at a time
+# every entry also has the row it came from, for error messages
+# readings and meanings the file doesn't have are None
+def read_entries(path: str, item_type: str = "vocab"):
+    with open(path, encoding = "utf-8-sig", newline = "") as f:
+        delimiter = "," if path.lower().endswith(".csv") else "\t"
+        is_html = False
+        fields = None
+        skip_columns = set()
+
+        # anki exports start with "#key:value" lines
+        n_row = 1
+        line = f.readline()
+
+        while line.startswith("#"):
+            key, _, value = line[1:].rstrip("\r\n").partition(":")
+
+            match key:
+                case "separator":
+                    delimiter = SEPARATORS.get(value.lower(), value)
+
+                case "html":
+                    is_html = value == "true"
+
+                case "columns":
+                    fields = [HEADER_FIELDS.get(name.strip().lower()) for name in value.split(delimiter)]
+
+                # guid, notetype, deck and tags columns
+                case _ if key.endswith(" column"):
+                    skip_columns.add(int(value) - 1)
+
+            n_row += 1
+            line = f.readline()
+
+        for row in csv.reader(chain([line], f), delimiter = delimiter):
+            if fields is None:
+                fields = read_header(row)
+
+                if fields is not None:
+                    n_row += 1
+
+                    continue
+
+                default_fields = iter(DEFAULT_FIELDS)
+                fields = [None if i in skip_columns else next(default_fields, None) for i in range(len(row))]
+
+            entry = {"row": n_row, "type": item_type, "kanji": None, "readings": None, "meanings": None, "meaning_notes": None, "reading_notes": None}
+            n_row += 1
+
+            for field, cell in zip(fields, row):
+                cell = clean_cell(cell, is_html)
+
+                if field is None or cell == "":
+                    continue
+
+                match field:
+                    case "word":
+                        entry["kanji"] = entry["kanji"] or cell
+
+                    case "vocab" | "kanji":
+                        entry["kanji"] = cell
+                        entry["type"] = field
+
+                    case _:
+                        entry[field] = cell
+
+            if entry["kanji"] is not None:
+                yield entry
+
+    return None
+
+# readings and meanings from the dictionary for words of a type
+# returns word -> (readings, meanings), for the words that were found
+def lookup_words(conn: sqlite3.Connection, item_type: str, words: list) -> dict:
+    found = dict()
+
+    for column, q in LOOKUPS[item_type]:
+        missing = [word for word in words if word not in found]
+
+        if not missing:
+            break
+
+        match = in_list(column, missing)
+
+        for row in fetch_dicts(conn, q.format(match = match.sql), match.params):
+            found.setdefault(row["Word"], (row["Readings"], row["Meanings"]))
+
+    return found
+
+# fills in the readings and meanings entries are missing from the dictionary
+def fill_from_dictionary(conn: sqlite3.Connection, entries: list) -> None:
+    for item_type in LOOKUPS:
+        words = [entry["kanji"] for entry in entries if entry["type"] == item_type and (entry["readings"] is None or entry["meanings"] is None)]
+
+        if not words:
+            continue
+
+        found = lookup_words(conn, item_type, words)
+
+        for entry in entries:
+            if entry["type"] == item_type and entry["kanji"] in found:
+                readings, meanings = found[entry["kanji"]]
+                entry["readings"] = entry["readings"] or readings
+                entry["meanings"] = entry["meanings"] or meanings
+
+    return None
+
+# imports a file into the srs db in config.toml
+# usage: python -m src.importer PATH [vocab|kanji]
+def main() -> None:
+    from src.dataclasses import SrsConfig
+    from src.srs_app import SrsApp
+
+    if len(sys.argv) not in (2, 3):
+        print("usage: python -m src.importer PATH [vocab|kanji]")
+
+        return None
+
+    path = sys.argv[1]
+    item_type = sys.argv[2] if len(sys.argv) == 3 else "vocab"
+
+    with open("config.toml", "rb") as f:
+        config = tomllib.load(f)
+
+    srs_app = SrsApp(SrsConfig(
+        srs_interval = config["srs_interval"],
+        path_to_srs_db = config["path_to_srs_db"],
+        path_to_full_db = config["path_to_full_db"],
+        path_to_search_db = config["path_to_search_db"],
+    ))
+    srs_app.init_db()
+
+    def show_progress(report) -> None:
+        print(f"{report.lines} rows read, {report.added} added, {report.skipped} skipped", flush = True)
+
+        return None
+
+    report = srs_app.import_file(path, item_type, on_progress = show_progress)
+    srs_app.close_db()
+
+    for error in report.errors:
+        print(error)
+
+    if report.skipped > len(report.errors):
+        print(f"...and {report.skipped - len(report.errors)} more")
+
+    return None
+
+if __name__ == "__main__":
+    main()
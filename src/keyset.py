@@ -0,0 +1,70 @@
+import heapq
+
+from itertools import islice
+
+
+# keyset pagination over (sort key, id)
+# a page starts right after the (sort key, id) of the last row on the page before it,
+# so sqlite can seek straight to it through an index instead of stepping over every earlier row like OFFSET does
+# rows whose sort key is null always come last, whichever way the column is sorted
+# queries select the sort key as SortKey and the id as ID, so a row is its own cursor
+
+# ORDER BY terms for one page
+def keyset_order(sort_expr: str, id_expr: str, descending: bool) -> str:
+    direction = "DESC" if descending else "ASC"
+
+    return f"{sort_expr} {direction}, {id_expr} {direction}"
+
+# the cursor that continues after a row
+def row_cursor(row: dict) -> tuple:
+    return (row["SortKey"], row["ID"])
+
+# fetches up to limit rows after the cursor; after = None starts at the first page
+# run(keyset, params, limit) runs the page query with keyset added to its WHERE clause and returns the rows
+# rows with and without a sort key are fetched separately, so each side is a plain range on the sort index
+def fetch_page(run, sort_expr: str, id_expr: str, descending: bool, after: tuple | None, limit: int) -> list:
+    op = "<" if descending else ">"
+    rows = []
+
+    # rows with a sort key, unless the cursor is already past them
+    if after is None or after[0] is not None:
+        keyset = f"{sort_expr} IS NOT NULL"
+        params = ()
+
+        if after is not None:
+            keyset += f" AND ({sort_expr}, {id_expr}) {op} (?, ?)"
+            params = tuple(after)
+
+        rows = run(keyset, params, limit)
+
+    # then the rows without one
+    if len(rows) < limit:
+        keyset = f"{sort_expr} IS NULL"
+        params = ()
+
+        if after is not None and after[0] is None:
+            keyset += f" AND {id_expr} {op} ?"
+            params = (after[1],)
+
+        rows += run(keyset, params, limit - len(rows))
+
+    return rows
+
+# merges pages from several sources that were sorted the same way, and keeps the first limit rows
+# pages is source -> rows; returns the merged rows and source -> the last row taken from it
+def merge_pages(pages: dict, descending: bool, limit: int) -> tuple:
+    if descending:
+        key = lambda item: (item[1]["SortKey"] is not None, item[1]["SortKey"], item[1]["ID"])
+
+    else:
+        key = lambda item: (item[1]["SortKey"] is None, item[1]["SortKey"], item[1]["ID"])
+
+    sources = [[(source, row) for row in rows] for source, rows in pages.items()]
+    merged = list(islice(heapq.merge(*sources, key = key, reverse = descending), limit))
+
+    last_rows = dict()
+
+    for source, row in merged:
+        last_rows[source] = row
+
+    return [row for _, row in merged], last_rows
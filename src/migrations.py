@@ -0,0 +1,114 @@
+import sqlite3
+
+
+# schema migrations for the user's srs database
+# each step is a list of statements that are run once, in order, inside a single transaction
+# the current version is stored in the db itself using sqlite's user_version pragma
+# {schema} is replaced by the name the srs db is attached as
+# never edit a step that has already shipped; append a new one instead
+MIGRATIONS = [
+
+    # 1: indexes for the due queue, the stats page, and the discover_new_* anti-joins
+    # NextAnswerDateISO also carries the rowid (ID), so due checks never have to touch the table
+    # the grade index also covers the success/failure sums for the ratio
+    [
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_srs_next_answer ON SrsEntrySet (NextAnswerDateISO);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_srs_grade ON SrsEntrySet (CurrentGrade, SuccessCount, FailureCount);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_srs_vocab ON SrsEntrySet (AssociatedVocab);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_srs_kanji ON SrsEntrySet (AssociatedKanji);",
+    ],
+
+    # 2: full-text index of the text columns, for the editor's searches
+    # external content, so the text is stored once, in SrsEntrySet; the triggers keep the index in step with it
+    # grading only touches the counters and dates, so it never fires the update trigger
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.srs_search USING fts5(
+            Meanings, Readings, MeaningNote, ReadingNote, AssociatedVocab, AssociatedKanji,
+            content = 'SrsEntrySet', content_rowid = 'ID', tokenize = 'unicode61 remove_diacritics 2'
+        );
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS {schema}.srs_search_insert AFTER INSERT ON SrsEntrySet BEGIN
+            INSERT INTO srs_search (rowid, Meanings, Readings, MeaningNote, ReadingNote, AssociatedVocab, AssociatedKanji)
+            VALUES (new.ID, new.Meanings, new.Readings, new.MeaningNote, new.ReadingNote, new.AssociatedVocab, new.AssociatedKanji);
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS {schema}.srs_search_delete AFTER DELETE ON SrsEntrySet BEGIN
+            INSERT INTO srs_search (srs_search, rowid, Meanings, Readings, MeaningNote, ReadingNote, AssociatedVocab, AssociatedKanji)
+            VALUES ('delete', old.ID, old.Meanings, old.Readings, old.MeaningNote, old.ReadingNote, old.AssociatedVocab, old.AssociatedKanji);
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS {schema}.srs_search_update
+        AFTER UPDATE OF ID, Meanings, Readings, MeaningNote, ReadingNote, AssociatedVocab, AssociatedKanji ON SrsEntrySet BEGIN
+            INSERT INTO srs_search (srs_search, rowid, Meanings, Readings, MeaningNote, ReadingNote, AssociatedVocab, AssociatedKanji)
+            VALUES ('delete', old.ID, old.Meanings, old.Readings, old.MeaningNote, old.ReadingNote, old.AssociatedVocab, old.AssociatedKanji);
+            INSERT INTO srs_search (rowid, Meanings, Readings, MeaningNote, ReadingNote, AssociatedVocab, AssociatedKanji)
+            VALUES (new.ID, new.Meanings, new.Readings, new.MeaningNote, new.ReadingNote, new.AssociatedVocab, new.AssociatedKanji);
+        END;
+        """,
+
+        # index the items that are already there
+        "INSERT INTO {schema}.srs_search (srs_search) VALUES ('rebuild');",
+    ],
+]
+
+# the same, for the dictionary db (attached as main)
+# it is never written to otherwise, so these are only ever indexes
+DICTIONARY_MIGRATIONS = [
+
+    # 1: the sort keys the add table pages through, so a page is a range scan instead of a sort of the whole table
+    # KanjiSet is small enough to sort in full
+    # plus the links from an entry to its meanings, so collapsing one page's meanings never scans the link tables
+    # ANALYZE lets the planner see that walking a sort index beats sorting every row a jlpt filter matches
+    [
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_wiki_rank ON VocabSet (WikiRank);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_frequency_rank ON VocabSet (FrequencyRank);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_jlpt ON VocabSet (JlptLevel);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_wk ON VocabSet (WkLevel);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_meaning_link ON VocabEntityVocabMeaning (VocabEntity_ID, Meanings_ID);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_category_link ON VocabMeaningVocabCategory (VocabMeaningVocabCategory_VocabCategory_ID, Categories_ID);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_kanji_meaning ON KanjiMeaningSet (Kanji_ID);",
+        "ANALYZE {schema};",
+    ],
+
+    # 2: the writings the importer looks entries up by, so a chunk of words is a handful of index seeks
+    [
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_kanji_writing ON VocabSet (KanjiWriting);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_vocab_kana_writing ON VocabSet (KanaWriting);",
+        "CREATE INDEX IF NOT EXISTS {schema}.idx_kanji_character ON KanjiSet (Character);",
+        "ANALYZE {schema};",
+    ],
+]
+
+# returns the schema version the db is currently at
+def get_schema_version(conn: sqlite3.Connection, schema: str = "main") -> int:
+    return conn.execute(f"PRAGMA {schema}.user_version;").fetchone()[0]
+
+# brings the db up to the latest version
+# returns the version the db ended up at
+def migrate(conn: sqlite3.Connection, schema: str = "main", migrations: list = MIGRATIONS) -> int:
+    version = get_schema_version(conn, schema)
+
+    for i, statements in enumerate(migrations[version:], start = version + 1):
+
+        # make sure a half finished step is never recorded as done
+        conn.execute("BEGIN;")
+
+        try:
+            for statement in statements:
+                conn.execute(statement.format(schema = schema))
+
+            conn.execute(f"PRAGMA {schema}.user_version = {i};")
+            conn.execute("COMMIT;")
+
+        except sqlite3.Error:
+            conn.execute("ROLLBACK;")
+
+            raise
+
+        version = i
+
+    return version
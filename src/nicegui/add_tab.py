@@ -1,28 +1,20 @@
-import pandas as pd
+import asyncio
 
+from functools import partial
 from nicegui import ui
 
 from src.dataclasses import AppConfig
+from src.nicegui.paged_table import PagedTable
+from src.predicates import in_list
+from src.srs_app import JLPT_LEVELS
 
 
-# helper function to bfill, but for some reason there are funny "" or " " in the df?
-# so this works better than bfill :(
-def first_valid(row: pd.core.series.Series) -> str | int | float | None:
-    for val in row:
-        if isinstance(val, str):
-            if val.strip():
-                return val
-
-        elif pd.notna(val):
-            return val
-
-    return None
-
 class AddTab(ui.element):
     def __init__(self, config):
         super().__init__()
 
         self.srs_app = config.srs_app
+        self.async_srs_app = config.async_srs_app
 
         # dictionary to store selected item information
         # this is important for sending information back to the app
@@ -49,10 +41,17 @@ class AddTab(ui.element):
 
                 self.kanji_search = ui.input("Kanji").classes("w-64").props("clearable")
                 self.kana_search = ui.input("Kana").classes("w-64").props("clearable")
+                self.meaning_search = ui.input("Meaning").classes("w-64").props("clearable")
+
+                self.search_mode = ui.select(
+                    options = {"exact": "Exact", "prefix": "Starts with", "substring": "Contains"},
+                    value = "exact",
+                    label = "Match"
+                ).classes("w-64")
 
                 search_button = ui.button("Search",
                                           color = "primary",
-                                          on_click = lambda: self.update_search_results())
+                                          on_click = self.update_search_results)
 
             # define containers to display items
             self.table_container = ui.element("div").classes("japanese-text w-full")
@@ -61,7 +60,7 @@ class AddTab(ui.element):
 
             self.add_button = ui.button("Add Selected Items",
                                         color = "green",
-                                        on_click = lambda: self.add_selected_items())
+                                        on_click = self.add_selected_items)
 
             self.add_spinner = ui.spinner(size = "lg")
 
@@ -70,172 +69,103 @@ class AddTab(ui.element):
 
     # updates the selection page every call
     # also resets the containers
-    def update_search_results(self) -> None:
+    async def update_search_results(self) -> None:
+        try:
+            await self.show_search_results()
+
+        except asyncio.TimeoutError:
+            ui.notify("Search timed out. Try narrowing it down!")
+
+        return None
+
+    async def show_search_results(self) -> None:
         self.table_container.clear()
         self.input_container.clear()
         self.selected_items.clear()
         self.add_button.visible = False
 
-        # sql query conditions to filter results
-        jlpt_condition = ",".join([str(val) for val in self.jlpt_levels.value])
-        kanji_condition = self.kanji_search.value
-        kana_condition = self.kana_search.value
+        # filter results by jlpt level, or any level if none are picked
+        jlpt_levels = self.jlpt_levels.value or JLPT_LEVELS
+
+        # text searches go through the dictionary's search index
+        search = {
+            "kanji": self.kanji_search.value,
+            "kana": self.kana_search.value,
+            "meaning": self.meaning_search.value,
+        }
+        search_mode = self.search_mode.value
 
-        # empty list to store dfs from kanji and vocab
-        list_dfs = []
+        # pages of kanji and vocab are fetched as the table asks for them
+        sources = dict()
+        counts = []
 
         # handle kanji
         if "kanji" in self.item_type.value:
-            conditions = []
-
-            if len(jlpt_condition) == 0:
-                conditions.append("k.JlptLevel IN (1, 2, 3, 4, 5)")
-
-            else:
-                conditions.append(f"k.JlptLevel IN ({jlpt_condition})")
-
-            if kanji_condition not in ["", None]:
-                conditions.append(f"k.Character = '{kanji_condition}'")
-
-            if kana_condition not in ["", None]:
-                conditions.append(f"',' || k.OnYomi || ',' LIKE '%,{kana_condition},%'")
-
-            # need to set a base condition if no filters were applied
-            if conditions == []:
-                df_kanji = self.srs_app.discover_new_kanji()
-
-            else:
-                condition = " AND ".join(conditions)
-                df_kanji = self.srs_app.discover_new_kanji(condition = condition)
-
-            if not df_kanji.empty:
-                display_df_kanji = df_kanji[["Character", "OnYomi", "KunYomi", "Nanori", "Meaning", "JlptLevel", "WkLevel", "MostUsedRank", "NewspaperRank"]].copy()
-                display_df_kanji.columns = ["Kanji", "Onyomi", "Kunyomi", "Nanori", "Meanings", "JLPT", "Wanikani", "Frequency Rank", "Wiki Rank"]
-
-                # combine all onyomi, kunyomi, nanori, and meanings into one line
-                display_df_kanji = display_df_kanji.groupby(["Kanji"]).agg({
-                    "Onyomi": lambda x: ";".join(dict.fromkeys(x)),
-                    "Kunyomi": lambda x: ";".join(dict.fromkeys(x)),
-                    "Nanori": lambda x: ";".join(dict.fromkeys(x)),
-                    "Meanings": lambda x: ";".join(dict.fromkeys(x)),
-                    "JLPT": "min",
-                    "Wanikani": "min",
-                    "Frequency Rank": "min",
-                    "Wiki Rank": "min",
-                }).reset_index()
-
-                # add a few more columns
-                display_df_kanji["IsCommon"] = ((display_df_kanji["Frequency Rank"].notna() | display_df_kanji["Wiki Rank"].notna()))
-                display_df_kanji["Readings"] = display_df_kanji[["Onyomi", "Kunyomi", "Nanori"]].apply(first_valid, axis = 1)
-                display_df_kanji["Type"] = "kanji"
-
-                list_dfs.append(display_df_kanji)
+            condition = in_list("k.JlptLevel", jlpt_levels)
+            sources["kanji"] = partial(self.async_srs_app.discover_new_kanji, condition, search, search_mode)
+            counts.append(partial(self.async_srs_app.count_new_kanji, condition, search, search_mode))
 
         # handle vocab
         if "vocab" in self.item_type.value:
-            conditions = []
-
-            if len(jlpt_condition) == 0:
-                conditions.append("v.JlptLevel IN (1, 2, 3, 4, 5)")
-
-            else:
-                conditions.append(f"v.JlptLevel IN ({jlpt_condition})")
-
-            if kanji_condition not in ["", None]:
-                conditions.append(f"v.KanjiWriting = '{kanji_condition}'")
-
-            if kana_condition not in ["", None]:
-                conditions.append(f"',' || v.KanaWriting || ',' LIKE '%,{kana_condition},%'")
-
-            # need to set a base condition if no filters were applied
-            if conditions == []:
-                df_vocab = self.srs_app.discover_new_vocab()
-
-            else:
-                condition = " AND ".join(conditions)
-                df_vocab = self.srs_app.discover_new_vocab(condition = condition)
-
-            if not df_vocab.empty:
-                display_df_vocab = df_vocab[["KanjiWriting", "KanaWriting", "Meaning", "IsCommon", "JlptLevel", "WkLevel", "FrequencyRank", "WikiRank", "ShortName"]].copy()
-                display_df_vocab.columns = ["Kanji", "Readings", "Meanings", "IsCommon", "JLPT", "Wanikani", "Frequency Rank", "Wiki Rank", "Tags"]
-
-                # combine all meanings and tags into one line
-                display_df_vocab = display_df_vocab.groupby(["Kanji", "Readings"]).agg({
-                    "Meanings": lambda x: ";".join(dict.fromkeys(x)),
-                    "IsCommon": "min",
-                    "JLPT": "min",
-                    "Wanikani": "min",
-                    "Frequency Rank": "min",
-                    "Wiki Rank": "min",
-                    "Tags": lambda x: ";".join(x),
-                }).reset_index()
-
-                # add type column
-                display_df_vocab["Type"] = "vocab"
-
-                list_dfs.append(display_df_vocab)
+            condition = in_list("v.JlptLevel", jlpt_levels)
+            sources["vocab"] = partial(self.async_srs_app.discover_new_vocab, condition, search, search_mode)
+            counts.append(partial(self.async_srs_app.count_new_vocab, condition, search, search_mode))
 
         # only show if something is selected
-        if list_dfs:
-
-            # combine both tables so we can display it
-            display_df = pd.concat(list_dfs, ignore_index = True)
-            display_df = display_df.sort_values(by = ["Wiki Rank"])
+        if sources:
+
+            # define columns to display
+            # only columns with an index to page through can be sorted
+            columns = [
+                {"name": "kanji", "label": "Kanji", "field": "Kanji", "required": True},
+                {"name": "readings", "label": "Readings", "field": "Readings", "required": True},
+                {"name": "meanings", "label": "Meanings", "field": "Meanings", "required": True},
+                {"name": "iscommon", "label": "Common", "field": "IsCommon"},
+                {"name": "jlpt", "label": "JLPT", "field": "JLPT", "sortable": True},
+                {"name": "wanikani", "label": "Wanikani", "field": "Wanikani", "sortable": True},
+                {"name": "freq", "label": "Freq. Rank", "field": "Frequency Rank", "sortable": True},
+                {"name": "wiki", "label": "Wiki Rank", "field": "Wiki Rank", "sortable": True},
+                {"name": "tags", "label": "Tags", "field": "Tags"},
+            ]
+
+            async def count() -> int:
+                return sum([await f() for f in counts])
 
             with self.table_container:
-                ui.label(f"Found {len(display_df)} items").classes("text-h6")
-
-                with ui.element("div").classes("table-container w-full"):
-                    rows = [
-                        {
-                            "Kanji": row["Kanji"],
-                            "Readings": row["Readings"],
-                            "Meanings": ",".join([meaning.strip() for meaning in row["Meanings"].split(";")]),
-                            "IsCommon": "✅" if row["IsCommon"] else "❌",
-                            "JLPT": f"N{row['JLPT']}" if not pd.isna(row["JLPT"]) else "",
-                            "Wanikani": row.get("Wanikani", None),
-                            "Frequency Rank": row.get("Frequency Rank", None),
-                            "Wiki Rank": row.get("Wiki Rank", None),
-                            "Tags": row.get("Tags", None),
-
-                            # hidden tags to use for rows
-                            "id": i,
-                            "type": row["Type"],
-                            "onyomi": row.get("Onyomi", None),
-                            "kunyomi": row.get("Kunyomi", None),
-                            "nanori": row.get("Nanori", None),
-                        }
-                        for i, row in display_df.iterrows()
-                    ]
-
-                    # define columns to display
-                    columns = [
-                        {"name": "kanji", "label": "Kanji", "field": "Kanji", "required": True},
-                        {"name": "readings", "label": "Readings", "field": "Readings", "required": True},
-                        {"name": "meanings", "label": "Meanings", "field": "Meanings", "required": True},
-                        {"name": "iscommon", "label": "Common", "field": "IsCommon", "sortable": True},
-                        {"name": "jlpt", "label": "JLPT", "field": "JLPT", "sortable": True},
-                        {"name": "wanikani", "label": "Wanikani", "field": "Wanikani", "sortable": True},
-                        {"name": "freq", "label": "Freq. Rank", "field": "Frequency Rank", "sortable": True},
-                        {"name": "wiki", "label": "Wiki Rank", "field": "Wiki Rank", "sortable": True},
-                        {"name": "tags", "label": "Tags", "field": "Tags"},
-                    ]
-
-                    table = ui.table(
-                        rows = rows,
-                        columns = columns,
-                        column_defaults = {
-                            "align": "left",
-                            "headerClasses": "uppercase text-primary",
-                        },
-                        row_key = "id",
-                        selection = "multiple",
-                        on_select = lambda e: self.render_inputs(e.selection),
-                        pagination = 100, # # of items to show on a page
-                    ).classes("w-full vocab-table")
+                table = PagedTable(
+                    columns,
+                    sources,
+                    count,
+                    self.to_table_row,
+                    sort = "wiki",
+                    on_select = lambda e: self.render_inputs(e.selection),
+                )
+
+            await table.load()
 
         return None
 
+    # a row from SrsApp.discover_new_* as shown in the table
+    def to_table_row(self, row: dict) -> dict:
+        return {
+            "Kanji": row["Kanji"],
+            "Readings": row["Readings"],
+            "Meanings": row["Meanings"],
+            "IsCommon": "✅" if row["IsCommon"] else "❌",
+            "JLPT": f"N{row['JlptLevel']}" if row["JlptLevel"] is not None else "",
+            "Wanikani": row["WkLevel"],
+            "Frequency Rank": row["FrequencyRank"],
+            "Wiki Rank": row["WikiRank"],
+            "Tags": row.get("Tags", None),
+
+            # hidden tags to use for rows
+            "key": f"{row['Type']}-{row['ID']}",
+            "type": row["Type"],
+            "onyomi": row.get("OnYomi", None),
+            "kunyomi": row.get("KunYomi", None),
+            "nanori": row.get("Nanori", None),
+        }
+
     # function to show selected rows as individual rows below table
     def render_inputs(self, selected: list) -> bool:
         self.input_container.clear()
@@ -295,14 +225,23 @@ class AddTab(ui.element):
         return True
 
     # function to send item information to the app
-    def add_selected_items(self) -> None:
+    async def add_selected_items(self) -> None:
         self.add_spinner.visible = True
 
-        for key in self.selected_items:
-            self.srs_app.add_review_item(self.selected_items[key])
+        # every selected item is added in one go
+        items = list(self.selected_items.values())
+        results = await self.async_srs_app.add_review_items(items)
 
         self.add_spinner.visible = False
-        self.update_search_results()
-        ui.notify("Successfully Added Items!")
+        await self.update_search_results()
+
+        for item, result in zip(items, results):
+            if not result.ok:
+                ui.notify(f"Could not add {item['kanji'].value}: {result.error}", type = "warning")
+
+        n_added = sum(result.ok for result in results)
+
+        if n_added > 0:
+            ui.notify(f"Successfully Added {n_added} Items!")
 
         return None
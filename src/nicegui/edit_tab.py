@@ -1,8 +1,11 @@
-import pandas as pd
+import asyncio
 
+from functools import partial
 from nicegui import ui
 
 from src.dataclasses import AppConfig
+from src.nicegui.paged_table import PagedTable
+from src.predicates import all_of, in_list
 
 
 class EditTab(ui.element):
@@ -10,6 +13,7 @@ class EditTab(ui.element):
         super().__init__()
 
         self.srs_app = config.srs_app
+        self.async_srs_app = config.async_srs_app
 
         # dictionary to store selected item information
         # this is important for sending information back to the app
@@ -36,15 +40,16 @@ class EditTab(ui.element):
 
                 self.meaning_search = ui.input("Meaning").classes("w-64").props("clearable")
                 self.reading_search = ui.input("Reading").classes("w-64").props("clearable")
+                self.any_search = ui.input("Anything (notes, kanji...)").classes("w-64").props("clearable")
 
-                search_button = ui.button("Search", color = "primary", on_click = lambda: self.update_search_results())
+                search_button = ui.button("Search", color = "primary", on_click = self.update_search_results)
 
             # define containers to display items
             self.table_container = ui.element("div").classes("japanese-text w-full")
             self.items_separator = ui.separator()
             self.input_container = ui.column()
 
-            self.add_button = ui.button("Edit Selected Items", color = "green", on_click = lambda: self.edit_selected_items())
+            self.add_button = ui.button("Edit Selected Items", color = "green", on_click = self.edit_selected_items)
             self.add_spinner = ui.spinner(size = "lg")
 
             self.add_button.visible = False
@@ -52,111 +57,97 @@ class EditTab(ui.element):
 
     # updates the selection page every call
     # also resets the containers
-    def update_search_results(self) -> None:
+    async def update_search_results(self) -> None:
+        try:
+            await self.show_search_results()
+
+        except asyncio.TimeoutError:
+            ui.notify("Search timed out. Try narrowing it down!")
+
+        return None
+
+    async def show_search_results(self) -> None:
         self.table_container.clear()
         self.input_container.clear()
         self.selected_items.clear()
         self.add_button.visible = False
 
-        # sql query conditions to filter results
-        srs_condition = ",".join([str(val) for val in self.srs_levels.value])
-        meaning_condition = self.meaning_search.value
-        reading_condition = self.reading_search.value
+        # text searches go through the srs db's full-text index, and match the start of words too
+        search = {
+            "meaning": self.meaning_search.value,
+            "reading": self.reading_search.value,
+            "any": self.any_search.value,
+        }
 
-        # empty list to store dfs from kanji and vocab
-        list_dfs = []
-        display_df_columns = ["Item_ID", "Kanji", "Readings", "Reading Notes", "Meanings", "Meaning Notes", "Current SRS Grade", "Next Answer Date"]
+        # best matches first when searching, lowest grades first otherwise
+        sort = "rank" if any(search.values()) else "srsgrade"
 
+        # filter results by srs grade (the options are the interval keys, which are strings)
         conditions = []
 
-        if len(srs_condition) != 0:
-            conditions.append(f"{self.srs_app.col_dict['current_grade_col']} IN ({srs_condition})")
-
-        if meaning_condition not in ["", None]:
-            conditions.append(f"',' || Meanings || ',' LIKE '%,{meaning_condition},%'")
-
-        if reading_condition not in ["", None]:
-            conditions.append(f"',' || Readings || ',' LIKE '%,{reading_condition},%'")
-
-        # need to set a base condition if no filters were applied
-        if conditions == []:
-            condition = "1=1"
-
-        else:
-            condition = " AND ".join(conditions)
-
-        # handle kanji
-        if "kanji" in self.item_type.value:
-            df_kanji = self.srs_app.filter_study_items(item_type = "kanji", condition = condition)
+        if self.srs_levels.value:
+            conditions.append(in_list(self.srs_app.col_dict["current_grade_col"], [int(val) for val in self.srs_levels.value]))
 
-            if not df_kanji.empty:
-                display_df_kanji = df_kanji[["ID", "AssociatedKanji", "Readings", "ReadingNote", "Meanings", "MeaningNote", "CurrentGrade", "NextAnswerDateISO"]].copy()
-                display_df_kanji.columns = display_df_columns
-                display_df_kanji["Type"] = "kanji"
+        condition = all_of(*conditions)
 
-                list_dfs.append(display_df_kanji)
+        # pages of kanji and vocab are fetched as the table asks for them
+        sources = dict()
+        counts = []
 
-        # handle vocab
-        if "vocab" in self.item_type.value:
-
-            df_vocab = self.srs_app.filter_study_items(item_type = "vocab", condition = condition)
-
-            if not df_vocab.empty:
-                display_df_vocab = df_vocab[["ID", "AssociatedVocab", "Readings", "ReadingNote", "Meanings", "MeaningNote", "CurrentGrade", "NextAnswerDateISO"]].copy()
-                display_df_vocab.columns = display_df_columns
-                display_df_vocab["Type"] = "vocab"
-
-                list_dfs.append(display_df_vocab)
+        for item_type in ["kanji", "vocab"]:
+            if item_type in self.item_type.value:
+                sources[item_type] = partial(self.async_srs_app.filter_study_items, item_type, condition, search)
+                counts.append(partial(self.async_srs_app.count_study_items, item_type, condition, search))
 
         # only show if something is selected
-        if list_dfs:
-
-            # combine both tables so we can display it
-            display_df = pd.concat(list_dfs, ignore_index = True)
-            display_df = display_df.sort_values(by = ["Current SRS Grade"])
+        if sources:
+
+            # define columns to display
+            columns = [
+                {"name": "kanji", "label": "Kanji", "field": "Kanji", "required": True},
+                {"name": "readings", "label": "Readings", "field": "Readings", "required": True},
+                {"name": "readingnotes", "label": "Reading Notes", "field": "Reading Notes", "required": True},
+                {"name": "meanings", "label": "Meanings", "field": "Meanings", "required": True},
+                {"name": "meaningnotes", "label": "Meaning Notes", "field": "Meaning Notes", "required": True},
+                {"name": "srsgrade", "label": "Current SRS Grade", "field": "Current SRS Grade", "sortable": True},
+                {"name": "nextanswer", "label": "Next Answer Date", "field": "Next Answer Date", "sortable": True},
+            ]
+
+            async def count() -> int:
+                return sum([await f() for f in counts])
 
             with self.table_container:
-                ui.label(f"Found {len(display_df)} items").classes("text-h6")
-
-                with ui.element("div").classes("table-container w-full"):
-                    rows = [
-                        {
-                            **{col: row[col] for col in display_df_columns},
-
-                            # hidden tags to use for rows
-                            "id": i,
-                            "type": row["Type"],
-                            # Item_ID also exists and will be hidden
-                        }
-                        for i, row in display_df.iterrows()
-                    ]
-
-                    # define columns to display
-                    columns = [
-                        {"name": "kanji", "label": "Kanji", "field": "Kanji", "required": True},
-                        {"name": "readings", "label": "Readings", "field": "Readings", "required": True},
-                        {"name": "readingnotes", "label": "Reading Notes", "field": "Reading Notes", "required": True},
-                        {"name": "meanings", "label": "Meanings", "field": "Meanings", "required": True},
-                        {"name": "meaningnotes", "label": "Meaning Notes", "field": "Meaning Notes", "required": True},
-                        {"name": "srsgrade", "label": "Current SRS Grade", "field": "Current SRS Grade", "sortable": True},
-                        {"name": "nextanswer", "label": "Next Answer Date", "field": "Next Answer Date", "sortable": True},
-                    ]
-
-                    table = ui.table(
-                        rows = rows,
-                        columns = columns,
-                        column_defaults = {
-                            "align": "left",
-                            "headerClasses": "uppercase text-primary",
-                        },
-                        row_key = "id",
-                        selection = "multiple",
-                        on_select = lambda e: self.render_inputs(e.selection),
-                        pagination = 100, # # of items to show on a page
-                    ).classes("w-full vocab-table")
+                table = PagedTable(
+                    columns,
+                    sources,
+                    count,
+                    self.to_table_row,
+                    sort = sort,
+                    on_select = lambda e: self.render_inputs(e.selection),
+                )
+
+            await table.load()
 
         return None
 
+    # a row from SrsApp.filter_study_items as shown in the table
+    def to_table_row(self, row: dict) -> dict:
+        return {
+            "Item_ID": row["ID"],
+            "Kanji": row[self.srs_app.get_item_col(row["Type"])],
+            "Readings": row["Readings"],
+            "Reading Notes": row["ReadingNote"],
+            "Meanings": row["Meanings"],
+            "Meaning Notes": row["MeaningNote"],
+            "Current SRS Grade": row["CurrentGrade"],
+            "Next Answer Date": row["NextAnswerDateISO"],
+
+            # hidden tags to use for rows
+            # Item_ID is also hidden
+            "key": f"{row['Type']}-{row['ID']}",
+            "type": row["Type"],
+        }
+
     # function to show selected rows as individual rows below table
     def render_inputs(self, selected: list) -> bool:
         self.input_container.clear()
@@ -209,14 +200,23 @@ class EditTab(ui.element):
         return True
 
     # function to send item information to the app
-    def edit_selected_items(self) -> None:
+    async def edit_selected_items(self) -> None:
         self.add_spinner.visible = True
 
-        for key in self.selected_items:
-            self.srs_app.edit_review_item(self.selected_items[key])
+        # every selected item is written in one go
+        items = list(self.selected_items.values())
+        results = await self.async_srs_app.edit_review_items(items)
 
         self.add_spinner.visible = False
-        self.update_search_results()
-        ui.notify("Successfully Edited Items!")
+        await self.update_search_results()
+
+        for item, result in zip(items, results):
+            if not result.ok:
+                ui.notify(f"Could not edit {item['kanji'].value}: {result.error}", type = "warning")
+
+        n_edited = sum(result.ok for result in results)
+
+        if n_edited > 0:
+            ui.notify(f"Successfully Edited {n_edited} Items!")
 
         return None
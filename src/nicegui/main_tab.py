@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 from nicegui import ui
 
 from src.dataclasses import AppConfig
@@ -9,39 +11,38 @@ class MainTab(ui.element):
 
         self.srs_app = config.srs_app
 
+        # the timer also loads the stats right away
         self.main_page_grid = ui.grid(columns = 2).classes("gap-4")
-        self.refresh_timer = ui.timer(interval = 60.0, callback = lambda: self.load_stats())
-        self.refresh_button = ui.button("Refresh Stats", color = "primary", on_click = lambda: self.load_stats())
-
-        with self.main_page_grid:
-            self.load_stats()
+        self.refresh_timer = ui.timer(interval = 60.0, callback = self.load_stats)
+        self.refresh_button = ui.button("Refresh Stats", color = "primary", on_click = self.load_stats)
 
     # load stats accordingly for the main page
+    # the stats are kept in memory by the app, so this is cheap enough to run directly
     def load_stats(self) -> bool:
         self.main_page_grid.clear()
 
-        res = self.srs_app.get_review_stats()
+        stats = self.srs_app.get_review_stats()
 
-        if res:
-            df_grade_counts, df_today_counts, df_ratio = res
-
-        else:
+        if stats is None:
             ui.notify("DB not connected.")
 
             return False
 
-        df_reviews = self.srs_app.get_due_reviews()
-        grade_values = df_grade_counts.iloc[:, -1].tolist()
+        next_review_date = self.srs_app.get_next_review_date()
+        grade_values = stats["grade_counts"]
 
         # i will use the houhou definitions (similar to wanikani)
         with self.main_page_grid:
-            if grade_values == []:
+            if sum(grade_values) == 0:
                 ui.notify("Start adding items and reviewing to see stats!")
 
                 return False
 
             ui.label("# of Reviews Due")
-            ui.label(f"{len(df_reviews)} / {df_today_counts.values[0][0]}")
+            ui.label(f"{stats['due_now']} / {stats['due_today']}")
+
+            ui.label("Next Review")
+            ui.label(self.format_next_review(stats["due_now"], next_review_date))
 
             ui.label("Discovering")
             ui.label(grade_values[0] + grade_values[1])
@@ -60,6 +61,29 @@ class MainTab(ui.element):
 
             # additional correct %
             ui.label("Correct %")
-            ui.label(df_ratio.values[0] * 100)
+            ui.label(f"{stats['success_ratio'] * 100:.1f}")
 
         return True
+
+    # "now" if something is due, otherwise how long until the next item is due
+    def format_next_review(self, due_count: int, next_review_date: str | None) -> str:
+        if due_count > 0:
+            return "Now"
+
+        if next_review_date is None:
+            return "-"
+
+        # dates edited by hand might not parse
+        try:
+            next_datetime = datetime.strptime(next_review_date, "%Y-%m-%d %H:%M:%S").replace(tzinfo = timezone.utc)
+
+        except ValueError:
+            return next_review_date
+
+        minutes = max(0, int((next_datetime - datetime.now(timezone.utc)).total_seconds() // 60))
+        hours, minutes = divmod(minutes, 60)
+
+        if hours >= 24:
+            return f"in {hours // 24}d {hours % 24}h"
+
+        return f"in {hours}h {minutes}m"
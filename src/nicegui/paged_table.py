@@ -0,0 +1,106 @@
+from nicegui import ui
+
+from src.keyset import merge_pages, row_cursor
+
+
+# a selectable ui.table that only ever holds one page of rows
+# quasar's server-side pagination asks for a page (and a sort) through the "request" event, and that page is fetched then
+# rows can come from several sources that are sorted the same way (like kanji and vocab), and are merged into one list
+# sources is type -> async fetch(sort, descending, after, limit), returning rows with SortKey and ID like SrsApp.discover_new_*
+# count is an async callable returning the total number of rows; it runs after the first page is shown
+# to_table_row turns a fetched row (with a "Type" key added) into a table row
+class PagedTable:
+    def __init__(self, columns: list, sources: dict, count, to_table_row, sort: str, rows_per_page: int = 100, on_select = None):
+        self.sources = sources
+        self.count = count
+        self.to_table_row = to_table_row
+        self.default_sort = sort
+        self.rows_per_page = rows_per_page
+
+        self.n_rows = None # total, once count has returned
+        self.sort = sort
+        self.descending = False
+        self.cursors = {1: None} # page -> per-source cursors that start it
+
+        self.label = ui.label("Searching...").classes("text-h6")
+
+        with ui.element("div").classes("table-container w-full"):
+            self.table = ui.table(
+                rows = [],
+                columns = columns,
+                column_defaults = {
+                    "align": "left",
+                    "headerClasses": "uppercase text-primary",
+                },
+                row_key = "key",
+                selection = "multiple",
+                on_select = on_select,
+                pagination = {"rowsPerPage": rows_per_page, "page": 1, "sortBy": sort, "descending": False, "rowsNumber": 0},
+            ).classes("w-full vocab-table").props(f":rows-per-page-options=[{rows_per_page}]")
+
+        self.table.on("request", self.on_request, ["pagination"])
+
+    # shows the first page, then the total
+    async def load(self) -> None:
+        await self.show_page(1)
+
+        self.n_rows = await self.count()
+        self.label.text = f"Found {self.n_rows} items"
+        self.table.pagination = {**self.table.pagination, "rowsNumber": self.n_rows}
+
+        return None
+
+    async def on_request(self, e) -> None:
+        pagination = e.args["pagination"]
+        sort = pagination.get("sortBy") or self.default_sort
+        descending = bool(pagination.get("descending")) and pagination.get("sortBy") is not None
+
+        # cursors only make sense for the order they were made in
+        if (sort, descending) != (self.sort, self.descending):
+            self.sort = sort
+            self.descending = descending
+            self.cursors = {1: None}
+
+        await self.show_page(pagination["page"])
+
+        return None
+
+    # fetches one page from every source and keeps the first rows_per_page of them, in order
+    # returns the rows and the cursors that start the next page
+    async def fetch_page(self, cursors: dict | None) -> tuple:
+        cursors = cursors or {source: None for source in self.sources}
+        pages = dict()
+
+        for source, fetch in self.sources.items():
+            rows = await fetch(sort = self.sort, descending = self.descending, after = cursors[source], limit = self.rows_per_page)
+            pages[source] = [{**row, "Type": source} for row in rows]
+
+        rows, last_rows = merge_pages(pages, self.descending, self.rows_per_page)
+        next_cursors = {**cursors, **{source: row_cursor(row) for source, row in last_rows.items()}}
+
+        return rows, next_cursors
+
+    async def show_page(self, page: int) -> None:
+
+        # a page can only be found from the one before it, so jumping ahead walks through the pages in between
+        start = max(known for known in self.cursors if known <= page)
+
+        for i in range(start, page + 1):
+            rows, self.cursors[i + 1] = await self.fetch_page(self.cursors[i])
+
+        # until the count comes back, only promise a next page if this one was full
+        n_rows = self.n_rows
+
+        if n_rows is None:
+            n_rows = (page - 1) * self.rows_per_page + len(rows) + (1 if len(rows) == self.rows_per_page else 0)
+
+        self.table.rows = [self.to_table_row(row) for row in rows]
+        self.table.pagination = {
+            **self.table.pagination,
+            "page": page,
+            "sortBy": self.sort,
+            "descending": self.descending,
+            "rowsNumber": n_rows,
+        }
+
+        return None
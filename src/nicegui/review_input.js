@@ -0,0 +1,301 @@
+// the review card's answer box, typed into without a round trip to the server per key (see review_input.py)
+// RomajiConverter is src/romaji.py's converter, fed the same table by the server
+
+const KANA = "";
+const SOKUON_CONSONANTS = new Set("bcdfghjklmpqrstvwxyz");
+const IGNORE_FOCUS = ["input", "select", "button", "textarea"];
+
+// how long keys wait on a reply from the server before they're let through anyway
+const WAIT_TIMEOUT_MS = 10000;
+
+function buildTrie(table) {
+  const trie = new Map();
+
+  for (const [romaji, kana] of Object.entries(table)) {
+    let node = trie;
+
+    for (const ch of romaji) {
+      if (!node.has(ch)) node.set(ch, new Map());
+      node = node.get(ch);
+    }
+
+    node.set(KANA, kana);
+  }
+
+  return trie;
+}
+
+export class RomajiConverter {
+  constructor(table) {
+    this.trie = buildTrie(table);
+    this.clear();
+  }
+
+  clear() {
+    // [kana, the romaji typed for it, whether it's final], oldest first
+    this.pieces = [];
+    this.committed = "";
+    this.pending = "";
+    this.node = this.trie;
+  }
+
+  // the longest romaji at the start of letters, as [kana, how many letters it took], or null
+  matchPrefix(letters) {
+    let node = this.trie;
+    let best = null;
+
+    for (let i = 0; i < letters.length; i++) {
+      node = node.get(letters[i]);
+      if (node === undefined) break;
+      if (node.has(KANA)) best = [node.get(KANA), i + 1];
+    }
+
+    return best;
+  }
+
+  // the kana so far, with the pending letters read as if nothing else is coming
+  get text() {
+    if (!this.pending) return this.committed;
+
+    let letters = this.pending;
+    let kana = "";
+
+    while (letters) {
+      const match = this.matchPrefix(letters);
+
+      if (match !== null) {
+        kana += match[0];
+        letters = letters.slice(match[1]);
+      } else if (letters.length > 1 && letters[0] === letters[1] && SOKUON_CONSONANTS.has(letters[0])) {
+        kana += "っ";
+        letters = letters.slice(1);
+      } else {
+        kana += letters[0];
+        letters = letters.slice(1);
+      }
+    }
+
+    return this.committed + kana;
+  }
+
+  commit(kana, romaji, final) {
+    this.pieces.push([kana, romaji, final]);
+    this.committed += kana;
+  }
+
+  push(ch) {
+    const child = this.node.get(ch);
+
+    if (child !== undefined) {
+      this.pending += ch;
+      this.node = child;
+
+      if (child.size === 1 && child.has(KANA)) {
+        this.commit(child.get(KANA), this.pending, true);
+        this.pending = "";
+        this.node = this.trie;
+      }
+
+      return;
+    }
+
+    const pending = this.pending;
+    this.pending = "";
+    this.node = this.trie;
+
+    if (!pending) {
+      this.commit(ch, ch, true);
+      return;
+    }
+
+    if (pending === ch && SOKUON_CONSONANTS.has(ch)) {
+      this.commit("っ", ch, false);
+      this.push(ch);
+      return;
+    }
+
+    const match = this.matchPrefix(pending);
+    const [kana, nLetters] = match !== null ? match : [pending[0], 1];
+
+    this.commit(kana, pending.slice(0, nLetters), false);
+    this.extend(pending.slice(nLetters) + ch);
+  }
+
+  extend(letters) {
+    for (const ch of letters) this.push(ch);
+  }
+
+  // deletes the last kana (or pending letter), and returns the romaji that was typed for it
+  pop() {
+    let removed;
+    let letters;
+
+    if (this.pending) {
+      removed = this.pending.slice(-1);
+      letters = this.pending.slice(0, -1);
+    } else if (this.pieces.length > 0) {
+      const [kana, romaji] = this.pieces.pop();
+      this.committed = this.committed.slice(0, this.committed.length - kana.length);
+      removed = romaji;
+      letters = "";
+    } else {
+      return "";
+    }
+
+    while (this.pieces.length > 0 && !this.pieces[this.pieces.length - 1][2]) {
+      const [kana, romaji] = this.pieces.pop();
+      this.committed = this.committed.slice(0, this.committed.length - kana.length);
+      letters = romaji + letters;
+    }
+
+    this.pending = "";
+    this.node = this.trie;
+    this.extend(letters);
+
+    return removed;
+  }
+}
+
+export default {
+  template: `
+    <div>
+      <div v-if="showRomaji" class="text-white">{{ buffer }}</div>
+      <div class="japanese-main-text text-white">{{ answer }}</div>
+    </div>
+  `,
+  props: {
+    table: Object,
+    alphabet: String,
+    ignoreKey: String,
+    addKey: String,
+    quitKey: String,
+    showRomaji: Boolean,
+    cardType: String,
+    card: Number,
+    incorrect: Boolean,
+    ack: Number,
+  },
+  data() {
+    return {
+      buffer: "",
+      answer: "",
+
+      // between sending an answer and the server's verdict, keys wait in queued
+      waiting: false,
+      queued: [],
+    };
+  },
+  created() {
+    this.converter = new RomajiConverter(this.table);
+  },
+  mounted() {
+    this.onKeydown = (evt) => {
+      if (!(evt instanceof KeyboardEvent)) return;
+
+      const focus = document.activeElement;
+      if (focus && IGNORE_FOCUS.includes(focus.tagName.toLowerCase())) return;
+
+      this.press(evt.key, evt.ctrlKey);
+    };
+    document.addEventListener("keydown", this.onKeydown);
+  },
+  unmounted() {
+    document.removeEventListener("keydown", this.onKeydown);
+    clearTimeout(this.waitTimer);
+  },
+  watch: {
+    // the next card is up; keys typed while waiting for it go to it
+    card() {
+      const queued = this.stopWaiting();
+
+      this.buffer = "";
+      this.answer = "";
+      this.converter.clear();
+
+      for (const [key, ctrl] of queued) this.press(key, ctrl);
+    },
+
+    // the answer was wrong; the server ignores letters until it's acknowledged, so the queued ones are dropped
+    incorrect(value) {
+      if (value) this.stopWaiting();
+    },
+
+    // the server handled what was sent without changing the card (like an answer it had no card for)
+    ack() {
+      this.release();
+    },
+  },
+  methods: {
+    send(event) {
+      this.waiting = true;
+      this.$emit(event, { answer: this.answer });
+
+      // a reply that never comes (like a dropped connection) mustn't hold every key after it
+      clearTimeout(this.waitTimer);
+      this.waitTimer = setTimeout(() => this.release(), WAIT_TIMEOUT_MS);
+    },
+
+    // lets the keys that came in while waiting through, onto the same card
+    release() {
+      if (!this.waiting) return;
+
+      for (const [key, ctrl] of this.stopWaiting()) this.press(key, ctrl);
+    },
+
+    // stops waiting on the server, and returns the keys that came in meanwhile
+    stopWaiting() {
+      const queued = this.queued;
+
+      clearTimeout(this.waitTimer);
+      this.waiting = false;
+      this.queued = [];
+
+      return queued;
+    },
+
+    press(key, ctrl) {
+      if (!this.cardType) return;
+
+      if (this.waiting) {
+        this.queued.push([key, ctrl]);
+        return;
+      }
+
+      const isReading = this.cardType === "reading";
+
+      if (key === "Enter" && this.incorrect) {
+        this.send("acknowledge");
+      } else if (key === "Enter" && this.buffer.length > 0) {
+        this.send("submit");
+      } else if (key === this.ignoreKey && this.incorrect) {
+        this.send("ignore");
+      } else if (key === this.addKey && this.buffer.length > 0 && this.incorrect) {
+        this.send("add_valid_response");
+      } else if (key === this.quitKey && ctrl) {
+        this.$emit("quit");
+      } else if (key === "Backspace") {
+        if (ctrl) {
+          this.buffer = this.buffer.split(" ").slice(0, -1).join(" ");
+
+          if (isReading) {
+            this.converter.clear();
+            this.converter.extend(this.buffer);
+          }
+        } else if (isReading) {
+          const removed = this.converter.pop();
+          this.buffer = this.buffer.slice(0, this.buffer.length - removed.length);
+        } else {
+          this.buffer = this.buffer.slice(0, -1);
+        }
+      } else if (key.length === 1 && this.alphabet.includes(key) && !this.incorrect) {
+        this.buffer += key.toLowerCase();
+
+        if (isReading) this.converter.push(key.toLowerCase());
+      } else {
+        return;
+      }
+
+      this.answer = isReading ? this.converter.text : this.buffer;
+    },
+  },
+};
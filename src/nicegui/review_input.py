@@ -0,0 +1,64 @@
+from nicegui import ui
+
+from src.romaji import ROMAJI
+
+
+# the review card's answer box, typed into in the browser (review_input.js)
+# letters, backspace and the romaji -> kana conversion never leave the browser, so typing doesn't wait on the server;
+# the server only hears "submit", "acknowledge", "ignore", "add_valid_response" (each with the typed answer) and "quit"
+# the keys are the same as ReviewTab.handle_key's, which is still used when review_input = "server"
+# after sending one of those the box holds keys until the server replies with a new card, an incorrect mark or an ack (see reply)
+class ReviewInput(ui.element, component = "review_input.js"):
+    def __init__(self, keybinds: dict, alphabet: str, show_romaji: bool = False):
+        super().__init__()
+
+        self._props["table"] = ROMAJI
+        self._props["alphabet"] = alphabet
+        self._props["ignoreKey"] = keybinds["ignore_answer"]
+        self._props["addKey"] = keybinds["add_as_valid_response"]
+        self._props["quitKey"] = keybinds["quit_after_current_set"][-1]
+        self._props["showRomaji"] = show_romaji
+
+        # no card means keys are ignored
+        self._props["cardType"] = None
+        self._props["card"] = 0
+        self._props["incorrect"] = False
+        self._props["ack"] = 0
+
+    # clears the answer box for the next card (or for none, once the review is over)
+    def show_card(self, card_type: str | None) -> None:
+        self._props["cardType"] = card_type
+        self._props["card"] += 1
+        self._props["incorrect"] = False
+        self.update()
+
+        return None
+
+    # the submitted answer was wrong; the box waits for it to be acknowledged, ignored or added
+    def mark_incorrect(self) -> None:
+        self._props["incorrect"] = True
+        self.update()
+
+        return None
+
+    # tells the box the server is done with what it sent, without changing the card
+    def acknowledge(self) -> None:
+        self._props["ack"] += 1
+        self.update()
+
+        return None
+
+    # awaits the server's handling of an event from the box, and makes sure the box hears back
+    # handlers that return early, or raise, don't show a card or mark the answer, so those get an ack
+    async def reply(self, handling) -> None:
+        card = self._props["card"]
+        incorrect = self._props["incorrect"]
+
+        try:
+            await handling
+
+        finally:
+            if self._props["card"] == card and self._props["incorrect"] == incorrect:
+                self.acknowledge()
+
+        return None
@@ -1,17 +1,25 @@
-import re
-
-from nicegui import ui
+from nicegui import background_tasks, ui
 from nicegui.events import KeyEventArguments
-from pyokaka import okaka
-from rapidfuzz import process, fuzz
 
 from src.dataclasses import AppConfig
+from src.nicegui.review_input import ReviewInput
+from src.review_queue import ReviewQueue
+from src.review_session import ReviewSession
+from src.romaji import RomajiConverter
 
 class ReviewTab(ui.element):
     def __init__(self, config: AppConfig):
         super().__init__()
 
         self.srs_app = config.srs_app
+        self.async_srs_app = config.async_srs_app
+
+        # every browser tab reviews in its own session, dropped once the tab is gone for good (see _handle_delete)
+        # a tab that only lost its connection for a moment keeps its session
+        self.session_key = ui.context.client.id
+        self.session = None
+        self.current_item = None
+        self.answering = False # an answer is being saved
         self.key_ignore_answer = config.keybinds["ignore_answer"]
         self.key_add_as_valid_response = config.keybinds["add_as_valid_response"]
         self.key_quit_after_current_set = config.keybinds["quit_after_current_set"][-1]
@@ -23,12 +31,17 @@ class ReviewTab(ui.element):
         self.correct_message = "✅"
         self.incorrect_message = "❌"
 
-        # buffer for review text entry
+        # buffer for review text entry, and its kana for reading cards
         self.text_buffer = ""
-        self.kana_output = ""
+        self.romaji_converter = RomajiConverter()
+
+        # "client": answers are typed into a ReviewInput, in the browser
+        # "server": every key goes to handle_key
+        self.review_input = config.review_input
 
         # keyboard to allow typing using our specified keys/keybinds
-        self.keyboard = ui.keyboard(on_key = self.handle_key)
+        if self.review_input == "server":
+            self.keyboard = ui.keyboard(on_key = self.handle_key)
 
         # contents
         self.review_card = ui.card().classes("card-container")
@@ -37,24 +50,35 @@ class ReviewTab(ui.element):
 
             # set up how the review card looks
             self.review_header = ui.label("Deck").classes("text-white")
-            self.start_button = ui.button("Start Review", color = "primary", on_click = lambda: self.start_review())
+            self.start_button = ui.button("Start Review", color = "primary", on_click = self.start_review)
             self.review_progress = ui.label("").classes("text-white")
             self.reading_display = ui.label("").classes("japanese-main-text text-center q-py-xl text-white")
 
             self.review_separator = ui.separator()
 
-            # bind the keyboard to whenever user romaji is visible
-            self.user_romaji = ui.label("").classes("text-white") #.bind_visibility_to(self.keyboard, "active")
-            self.user_hiragana = ui.label("").classes("japanese-main-text text-white")
+            match self.review_input:
+                case "client":
+                    self.answer_input = ReviewInput(config.keybinds, self.alphabet, show_romaji = config.debug_mode)
+                    self.answer_input.on("submit", lambda e: self.answer_input.reply(self.submit_answer(e.args["answer"])))
+                    self.answer_input.on("acknowledge", lambda e: self.answer_input.reply(self.acknowledge_answer(e.args["answer"])))
+                    self.answer_input.on("ignore", lambda e: self.answer_input.reply(self.ignore_answer()))
+                    self.answer_input.on("add_valid_response", lambda e: self.answer_input.reply(self.add_as_valid_response(e.args["answer"])))
+                    self.answer_input.on("quit", lambda e: self.quit_after_current_set())
+
+                case "server":
+
+                    # bind the keyboard to whenever user romaji is visible
+                    self.user_romaji = ui.label("").classes("text-white") #.bind_visibility_to(self.keyboard, "active")
+                    self.user_hiragana = ui.label("").classes("japanese-main-text text-white")
+
+                    if config.debug_mode == False:
+                        self.user_romaji.visible = False
 
             self.res_display = ui.label("").classes("japanese-main-text text-white")
 
             self.correct_reading_display = ui.label("").classes("japanese-main-text text-white")
             self.correct_meaning_display = ui.label("").classes("main-text text-white")
 
-            if config.debug_mode == False:
-                self.user_romaji.visible = False
-                
             self.review_progress.visible = False
             self.reading_display.visible = False
             self.review_separator.visible = False
@@ -65,20 +89,26 @@ class ReviewTab(ui.element):
     functions for the review card
     """
 
-    # start review
-    def start_review(self) -> bool:
-        reviews = self.srs_app.start_review_session()
+    # nicegui deletes the client's elements once it hasn't reconnected within its reconnect timeout
+    # sessions of tabs that never get there are evicted once they've been idle for review_session_timeout
+    def _handle_delete(self) -> None:
+        self.srs_app.review_sessions.remove(self.session_key)
+        self.session = None
+        self.current_item = None
 
-        # initialize empty vars
-        self.item_dict = dict()
+        return None
+
+    # start review
+    async def start_review(self) -> bool:
+        self.session = await self.async_srs_app.start_review_session(self.session_key)
 
-        match reviews:
+        match self.session:
             case None:
                 ui.notify("DB not connected.")
 
                 return False
 
-            case []:
+            case ReviewSession(review_queue = ReviewQueue(cards = [])):
                 self.review_header.text = "No reviews! 😋"
 
                 return False
@@ -90,6 +120,7 @@ class ReviewTab(ui.element):
                 self.review_separator.visible = True
 
                 self.update_review_display()
+                background_tasks.create(self.refill_session(), name = "refill review session")
 
         return True
 
@@ -97,7 +128,7 @@ class ReviewTab(ui.element):
     def update_review_display(self) -> None:
 
         # find the current item
-        self.current_item = self.srs_app.get_current_item()
+        self.current_item = self.session.get_current_item()
 
         # if none, then we're done!
         if not self.current_item:
@@ -112,20 +143,23 @@ class ReviewTab(ui.element):
             self.correct_meaning_display.visible = False
             self.review_card.style("background-color: #26c826")
 
+            if self.review_input == "client":
+                self.answer_input.show_card(None)
+
             return None
 
         # otherwise, we have an item, so we should find what kind of item it is
-        review_type = self.current_item["review_type"]
-        card_type = self.current_item["card_type"]
+        review_type = self.current_item.item.review_type
+        card_type = self.current_item.card_type
 
         # style the cards differently based on what the item is
         match review_type:
             case "kanji":
-                self.reading_display.text = self.current_item["AssociatedKanji"]
+                self.reading_display.text = self.current_item.item.prompt
                 self.review_card.style("background-color: #2e67ff")
 
             case "vocab":
-                self.reading_display.text = self.current_item["AssociatedVocab"]
+                self.reading_display.text = self.current_item.item.prompt
                 self.review_card.style("background-color: #aa2eff")
 
         match card_type:
@@ -136,34 +170,62 @@ class ReviewTab(ui.element):
                 self.review_separator.style("border-top: 0.5rem solid #e4e4e4; margin: 0.75rem 0;")
 
         # progress is defined as how many vocab has been completed over how many vocabs are due
-        self.review_progress.text = f"{self.srs_app.current_completed} / {self.srs_app.len_review_ids}"
+        self.review_progress.text = f"{self.session.current_completed} / {self.session.len_review_ids}"
         self.review_progress.visible = True
 
+        if self.review_input == "client":
+            self.answer_input.show_card(card_type)
+
         return None
 
-    def clean_card(self) -> None:
-        self.text_buffer = ""
-        self.kana_output = ""
-        self.user_romaji.text = ""
-        self.user_hiragana.text = ""
+    # tops the session's buffer up off the event loop, then deals what came in
+    # wait is for when the table ran dry and the next card can't be shown without it
+    async def refill_session(self, wait: bool = False) -> None:
+        session = self.session
+
+        if session is None or not (session.needs_refill() or wait):
+            return None
+
+        await self.async_srs_app.run(session.refill, wait)
+        session.update()
+
+        return None
+
+    async def clean_card(self) -> None:
+        if self.review_input == "server":
+            self.text_buffer = ""
+            self.romaji_converter.clear()
+            self.user_romaji.text = ""
+            self.user_hiragana.text = ""
+
+        self.session.review_queue.advance()
+
+        # answers don't wait on the refill, unless it's behind and every card on the table is done
+        if not self.session.review_queue and (self.session.due_review_ids or self.session.refill_lock.locked()):
+            await self.refill_session(wait = True)
+
+        else:
+            background_tasks.create(self.refill_session(), name = "refill review session")
 
-        self.srs_app.current_index += 1
         self.update_review_display()
 
         return None
 
     # "helper" function for keypresses
-    def handle_key(self, e: KeyEventArguments) -> str | None:
+    async def handle_key(self, e: KeyEventArguments) -> str | None:
         key = e.key
         key_str = str(key)
 
+        # keys that come in while an answer is being saved would act on a card that's already answered
+        if self.answering:
+            return None
+
         if not self.current_item:
             ui.notify("No current item!")
 
             return None
 
-        card_type = self.current_item["card_type"]
-        item_id = self.current_item["ID"]
+        card_type = self.current_item.card_type
 
         # use "keydown"; otherwise we get 2 keys per press
         if e.action.keydown:
@@ -172,72 +234,35 @@ class ReviewTab(ui.element):
                 # if the user clicks the enter button after the incorrect message is shown:
                 # they acknowledge they got the card incorrect
                 case "Enter" if self.res_display.text == self.incorrect_message:
-                    self.process_answer(self.user_hiragana.text, will_submit = True)
-
-                    self.res_display.text = ""
-                    self.correct_reading_display.visible = False
-                    self.correct_meaning_display.visible = False
-
-                    self.clean_card()
+                    await self.acknowledge_answer(self.user_hiragana.text)
 
                     return "acknowledged error"
 
                 # if the user clicks the enter button while the text butter has something in it:
                 # the user is trying to submit their answer for checking
                 case "Enter" if len(self.text_buffer) > 0:
-                    self.process_answer(self.user_hiragana.text, will_submit = False)
-
-                    if self.res_display.text != self.incorrect_message:
-                        self.clean_card()
+                    await self.submit_answer(self.user_hiragana.text)
 
                     return "submit"
 
                 # if the user clicks the "ignore answer key" after the incorrect message is shown:
                 # they acknowledge they made a mistake and would like to try again
                 case self.key_ignore_answer if self.res_display.text == self.incorrect_message:
-
-                    self.res_display.text = ""
-                    self.correct_reading_display.visible = False
-                    self.correct_meaning_display.visible = False
-
-                    self.clean_card()
+                    await self.ignore_answer()
 
                     return "ignore result"
 
                 # if the user clicks the "add as valid response" key after the incorrect message is shown:
                 # the user wants to add what they typed as an additional meaning and acknowledges they got the card correct
                 case self.key_add_as_valid_response if len(self.text_buffer) > 0 and self.res_display.text == self.incorrect_message:
-                    self.srs_app.add_valid_response(self.user_hiragana.text, self.current_item)
-                    self.srs_app.current_reviews.pop(self.srs_app.current_index)
-                    self.item_dict[item_id].append(1)
-
-                    # there has to be a better way of doing this
-                    # i can't call a function since i dont think it would be able to delete the dictionary key?
-                    # more testing is needed
-                    if sum(self.item_dict[item_id]) == 2:
-                        if len(self.item_dict[item_id]) == 2:
-                            self.srs_app.update_review_item(item_id, True)
-
-                        else:
-                            self.srs_app.update_review_item(item_id, False)
-
-                        del self.item_dict[item_id]
-                        self.srs_app.update_review_session()
-
-                    self.res_display.text = f"Added '{self.user_hiragana.text}' to {card_type}."
-
-                    self.correct_reading_display.visible = False
-                    self.correct_meaning_display.visible = False
-
-                    self.clean_card()
+                    await self.add_as_valid_response(self.user_hiragana.text)
 
                     return "add answer"
 
                 # if the user clicks the "quit after current set" key (with ctrl):
                 # the user wants to stop reviewing after the current set is completed
                 case self.key_quit_after_current_set if e.modifiers.ctrl:
-                    ui.notify("Will quit after the remaining items are completed.")
-                    self.srs_app.stop_updating_review = True
+                    self.quit_after_current_set()
 
                     res = "quit"
 
@@ -248,40 +273,33 @@ class ReviewTab(ui.element):
                     if e.modifiers.ctrl:
                         self.text_buffer = " ".join(self.text_buffer.split(" ")[:-1])
 
+                        if card_type == "reading":
+                            self.romaji_converter.clear()
+                            self.romaji_converter.extend(self.text_buffer)
+
                         res = "delete word"
 
                     else:
                         match card_type:
-                            case "reading":
-                                current_length = len(self.kana_output)
 
-                                while len(okaka.convert(self.text_buffer)) == current_length and current_length > 0:
-                                    self.text_buffer = self.text_buffer[:-1]
+                            # removes the last kana, however many letters it took to type
+                            case "reading":
+                                removed = self.romaji_converter.pop()
+                                self.text_buffer = self.text_buffer[:len(self.text_buffer) - len(removed)]
 
                             case "meaning":
                                 self.text_buffer = self.text_buffer[:-1]
 
                         res = "delete letter"
 
-                # pyokaka's greedy algoirthm requires this roundabout
-                case _ if key in ["n", "N"] and self.text_buffer.endswith("n") and (self.res_display.text != self.incorrect_message):
-                    match card_type:
-                        case "reading":
-
-                            # n' -> ん
-                            # nn -> っん
-                            self.text_buffer += "'"
-
-                        case "meaning":
-                            self.text_buffer += key_str.lower()
-
-                    res = "append kana n"                    
-
                 # if the user has clicked a character in our defined alphabet:
                 # add that character to the text buffer
                 case _ if (key_str in self.alphabet) and (self.res_display.text != self.incorrect_message):
                     self.text_buffer += key_str.lower()
 
+                    if card_type == "reading":
+                        self.romaji_converter.push(key_str.lower())
+
                     res = f"insert {key_str}"
 
                 case _:
@@ -291,13 +309,11 @@ class ReviewTab(ui.element):
             # if the card type is meaning, then we should show the text buffer
             match card_type:
                 case "reading":
-                    self.kana_output = okaka.convert(self.text_buffer)
-                    self.user_hiragana.text = self.kana_output
+                    self.user_hiragana.text = self.romaji_converter.text
 
                 case "meaning":
                     self.user_hiragana.text = self.text_buffer
 
-            self.kana_output = okaka.convert(self.text_buffer)
             self.user_romaji.text = self.text_buffer
 
             # in the event of bugfixing/logging, printing res might be useful
@@ -305,60 +321,118 @@ class ReviewTab(ui.element):
 
         return None
 
-    # function to process an answer and calls the app to save the information
-    def process_answer(self, answer, will_submit) -> None:
-        item_id = self.current_item["ID"]
-        card_type = self.current_item["card_type"]
+    """
+    what the keys do, for both handle_key and the browser's ReviewInput
+    """
+
+    # the browser's ReviewInput can send these before a review is started, after it's done, or while an answer is being saved
+    def can_answer(self) -> bool:
+        return self.session is not None and self.current_item is not None and not self.answering
 
-        answer_stripped = answer.strip()
-        answer_lower = answer_stripped.lower()
-        lookup_readings = dict()
+    # the user is trying to submit their answer for checking
+    async def submit_answer(self, answer: str) -> None:
+        if not self.can_answer():
+            return None
 
-        # keep track of progress for all items using a dictionary
-        if item_id not in self.item_dict:
-            self.item_dict[item_id] = []
+        await self.process_answer(answer, will_submit = False)
+
+        if self.res_display.text != self.incorrect_message:
+            await self.clean_card()
+
+        elif self.review_input == "client":
+            self.answer_input.mark_incorrect()
+
+        return None
+
+    # the user acknowledges they got the card incorrect
+    async def acknowledge_answer(self, answer: str) -> None:
+        if not self.can_answer():
+            return None
+
+        await self.process_answer(answer, will_submit = True)
+
+        self.res_display.text = ""
+        self.correct_reading_display.visible = False
+        self.correct_meaning_display.visible = False
+
+        await self.clean_card()
+
+        return None
+
+    # the user acknowledges they made a mistake and would like to try again
+    async def ignore_answer(self) -> None:
+        if not self.can_answer():
+            return None
+
+        self.res_display.text = ""
+        self.correct_reading_display.visible = False
+        self.correct_meaning_display.visible = False
+
+        await self.clean_card()
+
+        return None
+
+    # the user wants to add what they typed as an additional meaning and acknowledges they got the card correct
+    async def add_as_valid_response(self, answer: str) -> None:
+        if not self.can_answer():
+            return None
+
+        item_id = self.current_item.item.item_id
+        card_type = self.current_item.card_type
+
+        self.answering = True
+
+        try:
+            await self.async_srs_app.add_valid_response(answer, self.current_item)
+            self.session.review_queue.remove_current()
+            await self.async_srs_app.run(self.session.record_answer, item_id, 1)
+
+        finally:
+            self.answering = False
+
+        self.res_display.text = f"Added '{answer}' to {card_type}."
+
+        self.correct_reading_display.visible = False
+        self.correct_meaning_display.visible = False
+
+        await self.clean_card()
+
+        return None
+
+    # the user wants to stop reviewing after the current set is completed
+    def quit_after_current_set(self) -> None:
+        if self.session is None:
+            return None
+
+        ui.notify("Will quit after the remaining items are completed.")
+        self.session.stop()
+
+        return None
+
+    # function to process an answer and calls the app to save the information
+    async def process_answer(self, answer, will_submit) -> None:
+        item_id = self.current_item.item.item_id
+        card_type = self.current_item.card_type
+
+        # the card's valid answers were prepared when it was added to the review (see AnswerMatcher)
+        matcher = self.current_item.matcher
+        valid_readings = matcher.valid_answers
 
-        # retrieve all valid readings and compare the typed answer to the valid readings
         match card_type:
 
             # reading cards should be strict, since a mistype of kana usually means a different word
             case "reading":
-                valid_readings = self.current_item["Readings"].split(",")
                 self.correct_reading_display.text = str(valid_readings)
                 self.correct_reading_display.visible = True
                 self.correct_meaning_display.visible = False
 
-                for reading in valid_readings:
-                    reading_stripped = reading.strip()
-                    lookup_readings[reading_stripped] = reading
-
-                all_valid_readings = list(lookup_readings.keys())
-
-                if answer_stripped in all_valid_readings:
-                    matching_score = 100
-                    matching_reading = answer_stripped
-
-                else:
-                    matching_score = 0
-
             # use fuzzy matching to score meanings
             case "meaning":
-                valid_readings = self.current_item["Meanings"].split(",")
                 self.correct_meaning_display.text = str(valid_readings)
                 self.correct_meaning_display.visible = True
                 self.correct_reading_display.visible = False
 
-                for reading in valid_readings:
-                    reading_stripped = reading.strip()
-                    reading_lower = reading_stripped.lower()
-                    remove_all_in_parentheses = re.sub(r"\s*\([^)]*\)\s*", "", reading_lower)
-                    strip_parentheses = re.sub(r"[()]", "", reading_lower)
-
-                    lookup_readings[strip_parentheses] = reading
-                    lookup_readings[remove_all_in_parentheses] = reading
-
-                all_valid_readings = list(lookup_readings.keys())
-                matching_reading, matching_score, _ = process.extractOne(answer_lower, all_valid_readings, scorer = fuzz.QRatio)
+        matching_score = matcher.match(answer, score_cutoff = self.srs_app.match_score_threshold)
 
         self.correct_reading_display.text = str(valid_readings)
         self.correct_reading_display.visible = True
@@ -370,29 +444,19 @@ class ReviewTab(ui.element):
         if matching_score > self.srs_app.match_score_threshold:
             to_append = 1
             self.res_display.text = self.correct_message
-            self.srs_app.current_reviews.pop(self.srs_app.current_index)
+            self.session.review_queue.remove_current()
 
         else:
             self.res_display.text = self.incorrect_message
 
+        # the session grades the item once both of its cards are right
         if self.res_display.text == self.correct_message or will_submit:
-            self.item_dict[item_id].append(to_append)
-            
-            # my way of marking if both the reading and meaning cards are marked as correct
-            # if so, then we should update the review item
-            # if the user gets both correct on the first try, the list would look like [1, 1]
-            # if they can't something wrong: [..., 1, ..., 1], where ... may be any length of 0s
-            # a faster solution is storing a tuple (a, b)
-            # if a = 2, then the user has completed both reviews
-            # b is a counter for how many tries the user has taken
-            if sum(self.item_dict[item_id]) == 2:
-                if len(self.item_dict[item_id]) == 2:
-                    self.srs_app.update_review_item(item_id, True)
-    
-                else:
-                    self.srs_app.update_review_item(item_id, False)
-    
-                del self.item_dict[item_id]
-                self.srs_app.update_review_session()
+            self.answering = True
+
+            try:
+                await self.async_srs_app.run(self.session.record_answer, item_id, to_append)
+
+            finally:
+                self.answering = False
 
         return None
@@ -1,15 +1,16 @@
 import asyncio
 import base64
-import cairosvg
 import io
 import os
 
 from nicegui import ui, events
 from nicegui.events import KeyEventArguments, MouseEventArguments
-from PIL import Image
 
 from src.dataclasses import AppConfig
 
+# shared google vision client, made on first use
+vision_client = None
+
 # idea from https://www.reddit.com/r/nicegui/comments/1g21jtp/uiinteractive_creating_a_drawing_canvas_that/
 # i only use mouse anyways, so this shouldnt be an issue
 class SearchTab(ui.element):
@@ -18,13 +19,10 @@ class SearchTab(ui.element):
 
         self.srs_app = config.srs_app
 
+        # google-cloud-vision (and grpc with it) is heavy, so the client is only made when predict is first pressed
         self.vision_client = None
 
         if "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
-            from google.cloud import vision
-
-            self.vision_client = vision.ImageAnnotatorClient()
-
             self.draw_area = ui.interactive_image(
                 size = (100, 100),
                 on_mouse = self.handle_mouse,
@@ -52,6 +50,18 @@ class SearchTab(ui.element):
         else:
             ui.notify("Google API not found. Did you remember to set the environment variable: 'GOOGLE_APPLICATION_CREDENTIALS'?")
 
+    # the vision client is shared by every page, since making one is slow
+    @staticmethod
+    def get_vision_client():
+        global vision_client
+
+        if vision_client is None:
+            from google.cloud import vision
+
+            vision_client = vision.ImageAnnotatorClient()
+
+        return vision_client
+
     async def predict(self):
         res = []
         image = await ui.run_javascript(f"""
@@ -81,8 +91,14 @@ class SearchTab(ui.element):
         image_base64 = image.split(",")[1]
         image_bytes = base64.b64decode(image_base64)
 
+        if self.vision_client is None:
+            self.vision_client = await asyncio.to_thread(self.get_vision_client)
+
+        # already imported by get_vision_client
+        from google.cloud import vision
+
         vision_image = vision.Image(content = image_bytes)
-        text_response = self.vision_client.text_detection(image = vision_image)
+        text_response = await asyncio.to_thread(self.vision_client.text_detection, image = vision_image)
 
         if text_response.text_annotations:
             detected_text = text_response.text_annotations[0].description.strip()
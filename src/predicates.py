@@ -0,0 +1,28 @@
+import json
+
+from typing import NamedTuple
+
+
+# WHERE clause fragments with their values bound as parameters instead of pasted into the sql
+# sqlite (and the sqlite3 module's statement cache) keys prepared statements by their sql text,
+# so a query only gets compiled once per connection if its text doesn't change with the values in it
+
+# sql to put in a WHERE clause, and the parameters for its ?s, in order
+class Predicate(NamedTuple):
+    sql: str
+    params: tuple = ()
+
+# column is one of values
+# the list is bound as one json array, so the sql is the same however many values there are
+def in_list(column: str, values) -> Predicate:
+    return Predicate(f"{column} IN (SELECT value FROM json_each(?))", (json.dumps(list(values)),))
+
+# every predicate has to hold; with none, every row does
+def all_of(*predicates: Predicate) -> Predicate:
+    if not predicates:
+        return Predicate("1=1")
+
+    sql = " AND ".join(f"({predicate.sql})" for predicate in predicates)
+    params = tuple(param for predicate in predicates for param in predicate.params)
+
+    return Predicate(sql, params)
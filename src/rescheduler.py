@@ -0,0 +1,193 @@
+import sqlite3
+import sys
+import time
+import tomllib
+
+import numpy as np
+
+from src.dataclasses import ReschedulePolicy, RescheduleReport
+
+
+# bulk rescheduling of a backlog of overdue reviews, like the one left after some time away
+# the grade and due date of every item that's still being reviewed are loaded into arrays, new due dates are worked out
+# for all of the overdue ones at once under a ReschedulePolicy, and the ones that moved are written back in one transaction
+# the app keeps due dates in memory, so while it's running use SrsApp.reschedule_backlog instead of the command line
+#     python -m src.rescheduler [path_to_srs_db] [--apply]
+
+SECONDS_PER_DAY = 86400
+UNIT_SECONDS = {"hours": 3600, "days": SECONDS_PER_DAY}
+
+# (ids, grades, due dates as unix seconds) of every item with a next answer date
+# dates that don't parse are left out, and so are never moved
+def load_schedule(conn: sqlite3.Connection, schema: str = "main", table: str = "SrsEntrySet") -> tuple:
+    q = f"""
+        SELECT ID, COALESCE(CAST(CurrentGrade AS INTEGER), 0), CAST(strftime('%s', NextAnswerDateISO) AS INTEGER)
+        FROM {schema}.{table}
+        WHERE strftime('%s', NextAnswerDateISO) IS NOT NULL;
+        """
+
+    rows = np.array(conn.execute(q).fetchall(), dtype = np.int64).reshape(-1, 3)
+
+    return rows[:, 0], rows[:, 1], rows[:, 2]
+
+# each grade's interval in seconds, indexed by grade; nan for grades that aren't reviewed anymore
+# srs_interval is config.toml's [srs_interval] table
+def interval_seconds(srs_interval: dict) -> np.ndarray:
+    seconds = np.full(max(int(grade) for grade in srs_interval) + 1, np.nan)
+
+    for grade, interval in srs_interval.items():
+        if interval["value"] != -1:
+            seconds[int(grade)] = interval["value"] * UNIT_SECONDS[interval["unit"]]
+
+    return seconds
+
+# utc "YYYY-MM-DD HH:MM:SS" strings, the way dates are stored in the db
+def to_dates(seconds: np.ndarray) -> list:
+    return np.strings.replace(np.datetime_as_string(seconds.astype("datetime64[s]")), "T", " ").tolist()
+
+# spreads the backlog over the next `days` days, today included
+# lower grades go first, since they're the easiest to forget, and the longest overdue first within a grade
+# every day gets an even share, but no more than daily_cap reviews counting what's already due that day;
+# what doesn't fit goes to the days after, under the same cap
+# items that stay today keep their date, the others are spread evenly over their utc day
+def spread(grades: np.ndarray, due: np.ndarray, backlog: np.ndarray, now: int, days: int, daily_cap: int) -> tuple:
+    n = len(backlog)
+    days = max(1, days)
+    today = now // SECONDS_PER_DAY
+
+    order = backlog[np.lexsort((due[backlog], grades[backlog]))]
+    cap = daily_cap if daily_cap > 0 else n
+    share = -(-n // days)
+
+    # reviews already due on each day from today on, not counting the backlog
+    upcoming = due[due >= now] // SECONDS_PER_DAY - today
+
+    # enough days for the backlog to fit; days that are already full don't take any
+    horizon = days
+
+    while True:
+        load = np.bincount(upcoming, minlength = horizon)[:horizon]
+        quota = np.maximum(0, cap - load)
+        quota[:days] = np.minimum(quota[:days], share)
+        filled = np.cumsum(quota)
+
+        if n == 0 or filled[-1] >= n:
+            break
+
+        horizon *= 2
+
+    ranks = np.arange(n)
+    day = np.searchsorted(filled, ranks, side = "right")
+    rank_in_day = ranks - (filled[day] - quota[day])
+    new_due = (today + day) * SECONDS_PER_DAY + rank_in_day * SECONDS_PER_DAY // np.maximum(quota[day], 1)
+
+    moved = day > 0
+
+    return order[moved], new_due[moved]
+
+# puts every overdue item off by a fraction of its grade's interval, counted from now
+# grades without an interval (or outside of srs_interval) are left where they are
+def postpone(grades: np.ndarray, backlog: np.ndarray, now: int, fraction: float, srs_interval: dict) -> tuple:
+    seconds = interval_seconds(srs_interval)
+
+    backlog = backlog[(grades[backlog] >= 0) & (grades[backlog] < len(seconds))]
+    delay = seconds[grades[backlog]] * fraction
+    known = ~np.isnan(delay)
+
+    return backlog[known], now + delay[known].astype(np.int64)
+
+# the items that move (as indices into grades and due), and their new due dates as unix seconds
+def plan_reschedule(grades: np.ndarray, due: np.ndarray, now: int, policy: ReschedulePolicy, srs_interval: dict) -> tuple:
+    backlog = np.flatnonzero(due < now)
+
+    match policy.policy:
+        case "spread":
+            return spread(grades, due, backlog, now, policy.days, policy.daily_cap)
+
+        case "postpone":
+            return postpone(grades, backlog, now, policy.postpone_fraction, srs_interval)
+
+        case _:
+            raise ValueError(f"Unknown reschedule policy: {policy.policy}")
+
+# reviews due on each utc day, from today until last_day; overdue ones count as due today
+def due_by_day(due: np.ndarray, today: int, last_day: int) -> dict:
+    days = np.maximum(due // SECONDS_PER_DAY, today) - today
+    counts = np.bincount(days[days <= last_day - today], minlength = last_day - today + 1)
+    dates = to_dates(np.arange(today, last_day + 1) * SECONDS_PER_DAY)
+
+    return {date[:10]: int(count) for date, count in zip(dates, counts)}
+
+# reschedules the overdue items of an srs table under a policy, in one transaction
+# a dry run only reports what would change; now (unix seconds) defaults to the current time
+def reschedule(conn: sqlite3.Connection, policy: ReschedulePolicy, srs_interval: dict, dry_run: bool = True, schema: str = "main", table: str = "SrsEntrySet", now: int | None = None) -> RescheduleReport:
+    start = time.perf_counter()
+
+    if now is None:
+        now = int(time.time())
+
+    ids, grades, due = load_schedule(conn, schema, table)
+    moved, new_due = plan_reschedule(grades, due, now, policy, srs_interval)
+
+    new_schedule = due.copy()
+    new_schedule[moved] = new_due
+
+    today = now // SECONDS_PER_DAY
+    last_day = max(today, int(new_due.max()) // SECONDS_PER_DAY) if len(new_due) else today
+
+    report = RescheduleReport(
+        dry_run = dry_run,
+        backlog = int(np.count_nonzero(due < now)),
+        moves = list(zip(ids[moved].tolist(), to_dates(due[moved]), to_dates(new_due))),
+        due_before = due_by_day(due, today, last_day),
+        due_after = due_by_day(new_schedule, today, last_day),
+    )
+
+    if not dry_run and report.moves:
+        q = f"""
+            UPDATE {schema}.{table}
+            SET NextAnswerDateISO = ?
+            WHERE ID = ?;
+            """
+
+        with conn:
+            conn.executemany(q, [(new_date, item_id) for item_id, _, new_date in report.moves])
+
+    report.seconds = time.perf_counter() - start
+
+    return report
+
+def print_report(report: RescheduleReport) -> None:
+    print(f"{'day':>10} | {'before':>6} | {'after':>6}")
+
+    for day, count in report.due_after.items():
+        print(f"{day:>10} | {report.due_before[day]:>6} | {count:>6}")
+
+    print(f"{len(report.moves)} of {report.backlog} overdue items {'would be ' if report.dry_run else ''}moved ({report.seconds:.2f}s)")
+
+    return None
+
+# previews a reschedule of the srs db in config.toml, or the given one, under config.toml's [reschedule] policy
+# nothing is written without --apply
+# usage: python -m src.rescheduler [path_to_srs_db] [--apply]
+def main() -> None:
+    args = [arg for arg in sys.argv[1:] if arg != "--apply"]
+
+    with open("config.toml", "rb") as f:
+        config = tomllib.load(f)
+
+    path_to_srs_db = args[0] if args else config["path_to_srs_db"]
+
+    conn = sqlite3.connect(path_to_srs_db)
+    report = reschedule(conn, ReschedulePolicy(**config["reschedule"]), config["srs_interval"], dry_run = "--apply" not in sys.argv)
+    conn.close()
+
+    print_report(report)
+
+    if report.dry_run:
+        print("Nothing was written, run again with --apply to reschedule.")
+
+    return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import traceback
+
+
+# append-only journal of graded reviews that have not been written to the srs db yet
+# every line is the full new state of one item, so replaying a line twice is harmless
+# answers only have to reach the journal file; a background thread writes them to the db in batches
+# every answer is fsynced before append returns, so it survives an os crash or power loss too, not just the app crashing;
+# answers appended at the same time share one fsync (a group commit)
+class ReviewJournal:
+    def __init__(self, path: str, write_entries, flush_interval: float = 5.0, flush_threshold: int = 10):
+        self.path = path
+        self.write_entries = write_entries # callable that writes a list of entries to the db in one transaction
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self.file = None
+        self.pending = []
+        self.lock = threading.Lock() # guards the file, pending and written
+        self.sync_lock = threading.Lock() # only one fsync at a time
+        self.written = 0 # entries written to the file so far
+        self.synced = 0 # of those, how many are known to be on disk
+        self.flush_lock = threading.Lock() # only one flush at a time
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.flusher = None
+
+    # entries left behind by a crash, oldest first
+    def read_unflushed(self) -> list:
+        if not os.path.exists(self.path):
+            return []
+
+        entries = []
+
+        with open(self.path, "r", encoding = "utf-8") as f:
+            for line in f:
+
+                # a crash in the middle of a write can leave half a line at the end
+                try:
+                    entries.append(tuple(json.loads(line)))
+
+                except json.JSONDecodeError:
+                    break
+
+        return entries
+
+    # replays anything left over from last time, then starts the background flusher
+    def open(self) -> int:
+        self.pending = self.read_unflushed()
+        replayed = len(self.pending)
+
+        self.file = open(self.path, "a", encoding = "utf-8")
+        self.flush()
+
+        self.stop.clear()
+        self.flusher = threading.Thread(target = self.run_flusher, name = "review-journal-flusher", daemon = True)
+        self.flusher.start()
+
+        return replayed
+
+    # stops the flusher and writes out everything that is left
+    def close(self) -> None:
+        if self.file is None:
+            return None
+
+        self.stop.set()
+        self.wake.set()
+        self.flusher.join()
+        self.flush()
+
+        self.file.close()
+        self.file = None
+
+        return None
+
+    # records an entry, and returns once it's on disk
+    def append(self, entry: tuple) -> None:
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            self.pending.append(entry)
+            self.written += 1
+            written = self.written
+
+            if len(self.pending) >= self.flush_threshold:
+                self.wake.set()
+
+        self.sync(written)
+
+        return None
+
+    # fsyncs the journal, unless an fsync that started after entry number `written` already did
+    # whoever gets the sync lock syncs everything written so far, so appends waiting on it find their entry already synced
+    def sync(self, written: int) -> None:
+        with self.sync_lock:
+            if self.synced >= written:
+                return None
+
+            with self.lock:
+                target = self.written
+                fd = self.file.fileno()
+
+            os.fsync(fd)
+            self.synced = target
+
+        return None
+
+    # fsyncs the journal's directory, so a rename of the journal is on disk too
+    # only posix can open a directory for this; windows makes renames durable on its own
+    def sync_dir(self) -> None:
+        if os.name != "posix":
+            return None
+
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+
+        try:
+            os.fsync(fd)
+
+        finally:
+            os.close(fd)
+
+        return None
+
+    # writes all pending entries to the db
+    # on failure the entries stay pending and are retried on the next flush
+    def flush(self) -> bool:
+        with self.flush_lock:
+            with self.lock:
+                entries = self.pending
+                self.pending = []
+
+            if not entries:
+                return True
+
+            # whatever went wrong, the entries have to go back, or they'd only be in the journal file
+            try:
+                self.write_entries(entries)
+
+            except Exception as e:
+                print(f"Review journal flush failed, will retry: {e!r}")
+
+                with self.lock:
+                    self.pending = entries + self.pending
+
+                return False
+
+            # only keep what was appended while we were writing
+            # those are already reported as saved, so they go to a new file that takes the journal's place once it's on disk;
+            # cutting the journal down in place would lose them to a crash before the rewrite is synced
+            # the sync lock keeps appends from fsyncing the old file while it's being swapped out
+            with self.sync_lock, self.lock:
+                tmp_path = self.path + ".tmp"
+
+                with open(tmp_path, "w", encoding = "utf-8") as f:
+                    for entry in self.pending:
+                        f.write(json.dumps(entry) + "\n")
+
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                os.replace(tmp_path, self.path)
+                self.sync_dir()
+
+                old_file = self.file
+                self.file = open(self.path, "a", encoding = "utf-8")
+                old_file.close()
+
+                self.synced = self.written
+
+        return True
+
+    # an error here must not end the thread, or nothing would be written to the db again and the journal would keep growing
+    def run_flusher(self) -> None:
+        while not self.stop.is_set():
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+
+            try:
+                self.flush()
+
+            except Exception:
+                print("Review journal flusher failed, will retry:")
+                traceback.print_exc()
+
+        return None
@@ -0,0 +1,112 @@
+import random
+
+from src.cards import Card
+
+
+# the rotating set of cards a review session shows
+# the cards sit in an array that the cursor walks through, wrapping around at the end
+# a card goes in at a random spot (the card that was there moves to the end), and comes out by moving the last card into its spot,
+# so adding and removing cost the same however many cards there are, and the set never has to be reshuffled
+# an item's reading and meaning cards are kept from sitting next to each other, so one doesn't follow right after the other
+
+# how many random spots a card tries before it's left where it is
+PLACEMENT_ATTEMPTS = 8
+
+class ReviewQueue:
+    def __init__(self):
+        self.cards = []
+        self.cursor = 0 # index of the current card
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    # the cards in the order they'll be shown, starting with the current one
+    # it's a snapshot, so the queue can change while it's being iterated
+    def __iter__(self):
+        cursor = self.cursor if self.cursor < len(self.cards) else 0
+
+        return iter(self.cards[cursor:] + self.cards[:cursor])
+
+    def clear(self) -> None:
+        self.cards = []
+        self.cursor = 0
+
+        return None
+
+    # the card being shown, or None if there are none left
+    def current(self) -> Card | None:
+        if not self.cards:
+            return None
+
+        if self.cursor >= len(self.cards):
+            self.cursor = 0
+
+        return self.cards[self.cursor]
+
+    # moves on to the next card
+    def advance(self) -> None:
+        self.cursor += 1
+
+        if self.cursor >= len(self.cards):
+            self.cursor = 0
+
+        return None
+
+    def add(self, card: Card) -> None:
+        self.cards.append(card)
+        self.scatter(len(self.cards) - 1)
+
+        return None
+
+    # takes the current card out and returns it
+    # the last card takes its place, and is only shown once the cursor comes around again
+    def remove_current(self) -> Card | None:
+        card = self.current()
+
+        if card is None:
+            return None
+
+        last = self.cards.pop()
+
+        if self.cursor < len(self.cards):
+            self.cards[self.cursor] = last
+
+            if not self.apart(self.cursor):
+                self.scatter(self.cursor)
+
+        return card
+
+    # whether the card at i has no card of its own item on either side
+    # the array wraps around, so the first and last cards are next to each other too
+    def apart(self, i: int) -> bool:
+        cards = self.cards
+        n = len(cards)
+
+        # two cards are always next to each other
+        if n < 3:
+            return True
+
+        item_id = cards[i].item.item_id
+
+        return cards[i - 1].item.item_id != item_id and cards[(i + 1) % n].item.item_id != item_id
+
+    # swaps the card at i with one at a random spot (which may be its own), until neither is next to a card of its item
+    # the current card isn't swapped out of its spot, unless it's the one being placed
+    def scatter(self, i: int) -> None:
+        cards = self.cards
+        n = len(cards)
+
+        for _ in range(PLACEMENT_ATTEMPTS):
+            j = random.randrange(n)
+
+            if j == self.cursor and j != i:
+                continue
+
+            cards[i], cards[j] = cards[j], cards[i]
+
+            if self.apart(i) and self.apart(j):
+                return None
+
+            cards[i], cards[j] = cards[j], cards[i]
+
+        return None
@@ -0,0 +1,286 @@
+import threading
+import time
+
+from collections import deque
+
+from src.cards import REVIEW_COLUMNS, Card, ReviewItem
+from src.predicates import in_list
+from src.review_queue import ReviewQueue
+from src.rows import ReviewCounts
+
+
+# review sessions, one per browser tab, so several devices can review at the same time
+# each session has its own cards, queue and progress; what sessions share is the srs db, the due queue,
+# and a lease table: a due item is served by one session at a time, from when it's loaded until it's graded
+# sessions that haven't been used for idle_timeout seconds are evicted, and their leases go back to the others
+
+class ReviewSession:
+    def __init__(self, srs_app, sessions, key):
+        self.srs_app = srs_app
+        self.sessions = sessions
+        self.key = key
+        self.last_used = time.monotonic()
+        self.leased = set() # ids this session holds leases on
+        self.lock = threading.Lock() # guards review_buffer and due_review_ids, which refill() changes from a worker thread
+        self.refill_lock = threading.Lock() # held while the buffer is being refilled
+        self.removed = False # dropped from ReviewSessions, so it can't lease anything anymore
+        self.reset()
+
+    # reset a few variables
+    def reset(self) -> None:
+        self.current_completed = 0
+        self.stop_updating_review = False
+        self.review_queue = ReviewQueue() # the cards on the table
+        self.review_buffer = deque() # ReviewItems waiting to enter review_queue
+        self.on_table = 0 # items with cards in review_queue
+        self.due_review_ids = []
+        self.len_review_ids = 0
+
+        # id -> the results of its cards so far (1 right, 0 wrong), until both are right
+        self.item_dict = dict()
+
+        return None
+
+    # fills the session with the items that are due and not being reviewed somewhere else
+    # this one does wait on the db, since there's nothing to show until the first items are loaded
+    def start(self) -> None:
+
+        # a refill from before would put its items into the new buffer
+        with self.refill_lock:
+            self.sessions.release(self, list(self.leased))
+            self.reset()
+
+            # due ids come out of the queue earliest first
+            # reverse them so popping from the end gives the user the earliest ones first
+            due_ids = self.srs_app.due_queue.due_ids(self.srs_app.get_timestamp())
+            self.due_review_ids = self.sessions.available(self, due_ids)[::-1]
+            self.len_review_ids = len(self.due_review_ids)
+
+            while self.due_review_ids and len(self.review_buffer) < self.srs_app.max_reviews_at_once:
+                self.fill_review_buffer()
+
+        self.update()
+
+        return None
+
+    # returns info on current item
+    def get_current_item(self) -> Card | None:
+        self.last_used = time.monotonic()
+
+        return self.review_queue.current()
+
+    # if the user has not designated to stop reviewing, deals items from the buffer until max_reviews_at_once are on the table
+    # this never touches the db, so answers don't wait on it; refill() keeps the buffer topped up in the background
+    def update(self) -> None:
+        items = []
+
+        with self.lock:
+
+            # we have already added all review items into our list, so we can stop updating review
+            if not self.review_buffer and not self.due_review_ids and not self.refill_lock.locked():
+                self.stop_updating_review = True
+
+            while not self.stop_updating_review and self.review_buffer and self.on_table + len(items) < self.srs_app.max_reviews_at_once:
+                items.append(self.review_buffer.popleft())
+
+            self.add_to_review(items)
+
+        return None
+
+    # whether the buffer is low enough that it should be refilled
+    def needs_refill(self) -> bool:
+        return not self.stop_updating_review and bool(self.due_review_ids) and len(self.review_buffer) <= self.srs_app.review_prefetch_size // 2
+
+    # tops the buffer up from the db; meant to run off the event loop (see ReviewTab.refill_session)
+    # only one refill runs at a time, a call while another is running returns right away unless it's told to wait
+    def refill(self, wait: bool = False) -> None:
+        if not self.refill_lock.acquire(blocking = wait):
+            return None
+
+        try:
+            self.fill_review_buffer()
+
+            # other sessions may have taken every item of a chunk
+            while not self.review_buffer and self.due_review_ids and not self.stop_updating_review:
+                self.fill_review_buffer()
+
+        finally:
+            self.refill_lock.release()
+
+        return None
+
+    # no new items after the ones already on the table
+    # the ones waiting in the buffer go back to the other sessions
+    def stop(self) -> None:
+        with self.lock:
+            self.stop_updating_review = True
+            self.sessions.release(self, [item.item_id for item in self.review_buffer])
+            self.review_buffer.clear()
+
+        return None
+
+    # leases the next chunk of due ids, and hydrates them with a single query
+    # rows keep the order of due_review_ids, so the earliest items still come first
+    def fill_review_buffer(self) -> None:
+        chunk_ids = []
+
+        with self.lock:
+            while self.due_review_ids and len(chunk_ids) < self.srs_app.review_prefetch_size:
+                chunk_ids.append(self.due_review_ids.pop())
+
+        # since this one started, other sessions may have taken some, or graded them so they aren't due anymore
+        now = self.srs_app.get_timestamp()
+        due_queue = self.srs_app.due_queue
+        chunk_ids = self.sessions.lease(self, [item_id for item_id in chunk_ids if due_queue.get_date(item_id, now) < now])
+
+        if not chunk_ids:
+            return None
+
+        # the same statement for every chunk size, so it's only compiled once
+        ids = in_list(self.srs_app.col_dict["id_col"], chunk_ids)
+        q = f"""
+            SELECT {", ".join(REVIEW_COLUMNS)} FROM {self.srs_app.name_srs_table}
+            WHERE {ids.sql};
+            """
+
+        with self.srs_app.pool.reader() as conn:
+            rows = {row[0]: row for row in conn.execute(q, ids.params)}
+
+        # items deleted since the session started are skipped
+        self.sessions.release(self, [item_id for item_id in chunk_ids if item_id not in rows])
+
+        with self.lock:
+
+            # the session may have been stopped or removed while the rows were loading
+            if self.stop_updating_review:
+                self.sessions.release(self, list(rows))
+
+                return None
+
+            for item_id in chunk_ids:
+                if item_id not in rows:
+                    continue
+
+                row = rows[item_id]
+
+                # grading reads the counts from here instead of going back to the db
+                # counts graded earlier, but not flushed yet, are newer than the row
+                with self.srs_app.review_lock:
+                    self.srs_app.review_rows.setdefault(item_id, ReviewCounts(*(int(x or 0) for x in row[5:8])))
+
+                self.review_buffer.append(ReviewItem.from_row(row))
+
+        return None
+
+    # makes an item's two cards, reading and meaning, and deals them into the review queue
+    def add_to_review(self, items: list) -> None:
+        for item in items:
+            self.review_queue.add(Card(item, "reading"))
+            self.review_queue.add(Card(item, "meaning"))
+            self.on_table += 1
+
+        return None
+
+    # records one card's result (1 right, 0 wrong)
+    # once both of an item's cards are right, the item is graded, its lease released, and another item comes in from the buffer
+    def record_answer(self, item_id: int, result: int) -> None:
+        self.last_used = time.monotonic()
+        self.item_dict.setdefault(item_id, []).append(result)
+
+        # if the user gets both correct on the first try, the list would look like [1, 1]
+        # if they can't something wrong: [..., 1, ..., 1], where ... may be any length of 0s
+        if sum(self.item_dict[item_id]) == 2:
+            self.srs_app.update_review_item(item_id, len(self.item_dict[item_id]) == 2)
+            self.current_completed += 1 # increment counter for frontend
+
+            del self.item_dict[item_id]
+            self.sessions.release(self, [item_id])
+
+            with self.lock:
+                self.on_table -= 1
+
+            self.update()
+
+        return None
+
+# the sessions of every client, and the lease table they share
+# sessions are keyed by whatever identifies a client (like a nicegui client id)
+class ReviewSessions:
+    def __init__(self, srs_app, idle_timeout: float = 1800.0):
+        self.srs_app = srs_app
+        self.idle_timeout = idle_timeout
+        self.sessions = dict() # key -> ReviewSession
+        self.leases = dict() # item id -> the session serving it
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    # the session for a key, made if there isn't one yet
+    # idle sessions are evicted first
+    def get(self, key) -> ReviewSession:
+        with self.lock:
+            self.evict_idle()
+
+            if key not in self.sessions:
+                self.sessions[key] = ReviewSession(self.srs_app, self, key)
+
+            session = self.sessions[key]
+            session.last_used = time.monotonic()
+
+        return session
+
+    # drops a session, and releases its leases
+    # a tab that still shows it sees no current item, and has to start again
+    # this doesn't wait on a refill that's still running: refills take this lock to lease, so waiting here could deadlock
+    def remove(self, key) -> None:
+        with self.lock:
+            session = self.sessions.pop(key, None)
+
+            if session is None:
+                return None
+
+            # lease() turns a removed session down, so a refill still running can't take any more items for it
+            session.removed = True
+            self.release(session, list(session.leased))
+
+        with session.lock:
+            session.reset()
+            session.stop_updating_review = True
+
+        return None
+
+    def evict_idle(self) -> None:
+        now = time.monotonic()
+
+        with self.lock:
+            for key in [key for key, session in self.sessions.items() if now - session.last_used > self.idle_timeout]:
+                self.remove(key)
+
+        return None
+
+    # the item ids no other session holds a lease on, in order
+    def available(self, session: ReviewSession, item_ids: list) -> list:
+        with self.lock:
+            return [item_id for item_id in item_ids if self.leases.get(item_id, session) is session]
+
+    # leases whichever of item_ids are still free to a session, and returns those, in order
+    def lease(self, session: ReviewSession, item_ids: list) -> list:
+        with self.lock:
+            if session.removed:
+                return []
+
+            leased = [item_id for item_id in item_ids if self.leases.setdefault(item_id, session) is session]
+            session.leased.update(leased)
+
+        return leased
+
+    def release(self, session: ReviewSession, item_ids: list) -> None:
+        with self.lock:
+            for item_id in item_ids:
+                if self.leases.get(item_id) is session:
+                    del self.leases[item_id]
+
+                session.leased.discard(item_id)
+
+        return None
@@ -0,0 +1,104 @@
+import threading
+
+from collections import Counter
+
+
+# running totals for the main page, so reading them never has to scan the srs table
+# every write to the srs db reports the row it replaced and the row it wrote
+# a row is (current grade, failure count, success count, next answer date)
+class ReviewStats:
+    def __init__(self, max_grade: int):
+        self.max_grade = max_grade
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.grade_counts = Counter()
+        self.failure_total = 0
+        self.success_total = 0
+        self.due_by_day = Counter() # utc "YYYY-MM-DD" -> # of items due that day
+
+        return None
+
+    # replaces all totals with the given rows
+    def build(self, rows) -> None:
+        with self.lock:
+            self.clear()
+
+            for row in rows:
+                self.apply(row, 1)
+
+        return None
+
+    # adds (sign = 1) or removes (sign = -1) a row from the totals
+    # grades are stored as whatever the user typed in the editor, so they are normalized here
+    def apply(self, row: tuple, sign: int) -> None:
+        grade, failure, success, next_answer = row
+
+        try:
+            grade = int(grade)
+
+        except (TypeError, ValueError):
+            grade = None
+
+        self.grade_counts[grade] += sign
+        self.failure_total += sign * (failure or 0)
+        self.success_total += sign * (success or 0)
+
+        if next_answer is not None:
+            self.due_by_day[next_answer[:10]] += sign
+
+        return None
+
+    # old_row is None for new items, new_row is None for deleted ones
+    def update(self, old_row: tuple | None, new_row: tuple | None) -> None:
+        with self.lock:
+            if old_row is not None:
+                self.apply(old_row, -1)
+
+            if new_row is not None:
+                self.apply(new_row, 1)
+
+        return None
+
+    # moves items from one due day to another, for writes that only change next answer dates
+    # moves are (old date, new date)
+    def move_due(self, moves) -> None:
+        with self.lock:
+            for old_date, new_date in moves:
+                if old_date is not None:
+                    self.due_by_day[old_date[:10]] -= 1
+
+                if new_date is not None:
+                    self.due_by_day[new_date[:10]] += 1
+
+        return None
+
+    # counts for grades 0 through max_grade
+    def get_grade_counts(self) -> list:
+        with self.lock:
+            return [self.grade_counts[i] for i in range(self.max_grade + 1)]
+
+    def get_success_ratio(self) -> float:
+        with self.lock:
+            total = self.failure_total + self.success_total
+
+            if total == 0:
+                return 0.0
+
+            return self.success_total / total
+
+    # buckets with items in them, by day
+    def get_due_by_day(self) -> dict:
+        with self.lock:
+            return {day: count for day, count in sorted(self.due_by_day.items()) if count > 0}
+
+    # for checking the running totals against a fresh build
+    def as_tuple(self) -> tuple:
+        with self.lock:
+            return (
+                {grade: count for grade, count in self.grade_counts.items() if count != 0},
+                self.failure_total,
+                self.success_total,
+                {day: count for day, count in self.due_by_day.items() if count != 0},
+            )
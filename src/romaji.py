@@ -0,0 +1,225 @@
+# romaji to hiragana, converted as it's typed
+# the romaji table is a trie; a RomajiConverter keeps the kana that can't change anymore (committed)
+# and the few letters that could still become something longer (pending, always shorter than the longest romaji),
+# so typing or deleting a letter only ever looks at the pending letters
+# spelling follows what japanese IMEs do:
+#     "nn" and "n'" are ん, and so is "n" before anything that can't follow it ("kanji" -> かんじ, "konnnichiha" -> こんにちは)
+#     a doubled consonant is っ ("kitte" -> きって)
+#     letters that aren't romaji are kept as they are
+
+ROMAJI = {
+    "a": "あ", "i": "い", "u": "う", "e": "え", "o": "お",
+    "ka": "か", "ki": "き", "ku": "く", "ke": "け", "ko": "こ",
+    "sa": "さ", "si": "し", "shi": "し", "su": "す", "se": "せ", "so": "そ",
+    "ta": "た", "ti": "ち", "chi": "ち", "tu": "つ", "tsu": "つ", "te": "て", "to": "と",
+    "na": "な", "ni": "に", "nu": "ぬ", "ne": "ね", "no": "の",
+    "ha": "は", "hi": "ひ", "hu": "ふ", "fu": "ふ", "he": "へ", "ho": "ほ",
+    "ma": "ま", "mi": "み", "mu": "む", "me": "め", "mo": "も",
+    "ya": "や", "yu": "ゆ", "yo": "よ",
+    "ra": "ら", "ri": "り", "ru": "る", "re": "れ", "ro": "ろ",
+    "wa": "わ", "wo": "を",
+    "n": "ん", "nn": "ん", "n'": "ん",
+    "ga": "が", "gi": "ぎ", "gu": "ぐ", "ge": "げ", "go": "ご",
+    "za": "ざ", "zi": "じ", "ji": "じ", "zu": "ず", "ze": "ぜ", "zo": "ぞ",
+    "da": "だ", "di": "ぢ", "du": "づ", "de": "で", "do": "ど",
+    "ba": "ば", "bi": "び", "bu": "ぶ", "be": "べ", "bo": "ぼ",
+    "pa": "ぱ", "pi": "ぴ", "pu": "ぷ", "pe": "ぺ", "po": "ぽ",
+    "kya": "きゃ", "kyu": "きゅ", "kyo": "きょ",
+    "sya": "しゃ", "sha": "しゃ", "syu": "しゅ", "shu": "しゅ", "syo": "しょ", "sho": "しょ",
+    "tya": "ちゃ", "cha": "ちゃ", "tyu": "ちゅ", "chu": "ちゅ", "tyo": "ちょ", "cho": "ちょ",
+    "nya": "にゃ", "nyu": "にゅ", "nyo": "にょ",
+    "hya": "ひゃ", "hyu": "ひゅ", "hyo": "ひょ",
+    "mya": "みゃ", "myu": "みゅ", "myo": "みょ",
+    "rya": "りゃ", "ryu": "りゅ", "ryo": "りょ",
+    "gya": "ぎゃ", "gyu": "ぎゅ", "gyo": "ぎょ",
+    "zya": "じゃ", "ja": "じゃ", "zyu": "じゅ", "ju": "じゅ", "zyo": "じょ", "jo": "じょ",
+    "dya": "ぢゃ", "dyu": "ぢゅ", "dyo": "ぢょ",
+    "bya": "びゃ", "byu": "びゅ", "byo": "びょ",
+    "pya": "ぴゃ", "pyu": "ぴゅ", "pyo": "ぴょ",
+    "kwa": "くゎ", "gwa": "ぐゎ",
+    "wi": "うぃ", "we": "うぇ",
+    "qa": "くぁ", "qi": "くぃ", "qe": "くぇ", "qo": "くぉ",
+    "fa": "ふぁ", "fi": "ふぃ", "fe": "ふぇ", "fo": "ふぉ",
+    "va": "ヴぁ",
+    "tchi": "っち",
+    "xa": "ぁ", "xi": "ぃ", "xu": "ぅ", "xe": "ぇ", "xo": "ぉ",
+    "la": "ぁ", "li": "ぃ", "lu": "ぅ", "le": "ぇ", "lo": "ぉ",
+    "xya": "ゃ", "xyu": "ゅ", "xyo": "ょ", "lya": "ゃ", "lyu": "ゅ", "lyo": "ょ",
+    "xtu": "っ", "xtsu": "っ", "ltu": "っ", "ltsu": "っ",
+    "-": "ー",
+}
+
+# a node's kana is stored under this key, next to the letters that continue it
+KANA = ""
+
+# letters that are doubled into っ
+SOKUON_CONSONANTS = set("bcdfghjklmpqrstvwxyz")
+
+def build_trie(table: dict) -> dict:
+    trie = dict()
+
+    for romaji, kana in table.items():
+        node = trie
+
+        for ch in romaji:
+            node = node.setdefault(ch, dict())
+
+        node[KANA] = kana
+
+    return trie
+
+TRIE = build_trie(ROMAJI)
+
+# the longest romaji at the start of letters, as (kana, how many letters it took), or None
+def match_prefix(letters: str) -> tuple | None:
+    node = TRIE
+    best = None
+
+    for i, ch in enumerate(letters):
+        node = node.get(ch)
+
+        if node is None:
+            break
+
+        if KANA in node:
+            best = (node[KANA], i + 1)
+
+    return best
+
+class RomajiConverter:
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        # (kana, the romaji typed for it, whether it's final), oldest first
+        # pieces that aren't final were only settled by the letter after them, so they're typed again if that one is deleted
+        self.pieces = []
+        self.committed = ""
+        self.pending = ""
+        self.node = TRIE
+
+        return None
+
+    # the kana so far, with the pending letters read as if nothing else is coming
+    @property
+    def text(self) -> str:
+        if not self.pending:
+            return self.committed
+
+        return self.committed + self.pending_kana()
+
+    def pending_kana(self) -> str:
+        letters = self.pending
+        kana = []
+
+        while letters:
+            match = match_prefix(letters)
+
+            if match is not None:
+                kana.append(match[0])
+                letters = letters[match[1]:]
+
+            elif len(letters) > 1 and letters[0] == letters[1] and letters[0] in SOKUON_CONSONANTS:
+                kana.append("っ")
+                letters = letters[1:]
+
+            else:
+                kana.append(letters[0])
+                letters = letters[1:]
+
+        return "".join(kana)
+
+    def commit(self, kana: str, romaji: str, final: bool) -> None:
+        self.pieces.append((kana, romaji, final))
+        self.committed += kana
+
+        return None
+
+    # types a letter
+    def push(self, ch: str) -> None:
+        child = self.node.get(ch)
+
+        # still on the way to some romaji
+        if child is not None:
+            self.pending += ch
+            self.node = child
+
+            # nothing longer starts like this, so it's final
+            if len(child) == 1 and KANA in child:
+                self.commit(child[KANA], self.pending, True)
+                self.pending = ""
+                self.node = TRIE
+
+            return None
+
+        pending = self.pending
+        self.pending = ""
+        self.node = TRIE
+
+        if not pending:
+            self.commit(ch, ch, True)
+
+            return None
+
+        # "kk" -> っk
+        if pending == ch and ch in SOKUON_CONSONANTS:
+            self.commit("っ", ch, False)
+            self.push(ch)
+
+            return None
+
+        # the pending letters can't go on, so they become the longest romaji they start with (or stay letters),
+        # and whatever is left over is typed again, followed by ch
+        match = match_prefix(pending)
+
+        if match is not None:
+            kana, n_letters = match
+
+        else:
+            kana, n_letters = pending[0], 1
+
+        self.commit(kana, pending[:n_letters], False)
+
+        for left_over in pending[n_letters:] + ch:
+            self.push(left_over)
+
+        return None
+
+    def extend(self, letters: str) -> None:
+        for ch in letters:
+            self.push(ch)
+
+        return None
+
+    # deletes the last kana (or pending letter), and returns the romaji that was typed for it
+    def pop(self) -> str:
+        if self.pending:
+            removed = self.pending[-1]
+            letters = self.pending[:-1]
+
+        elif self.pieces:
+            kana, removed, _ = self.pieces.pop()
+            self.committed = self.committed[:len(self.committed) - len(kana)]
+            letters = ""
+
+        else:
+            return ""
+
+        # everything after the last final piece is typed again
+        while self.pieces and not self.pieces[-1][2]:
+            kana, romaji, _ = self.pieces.pop()
+            self.committed = self.committed[:len(self.committed) - len(kana)]
+            letters = romaji + letters
+
+        self.pending = ""
+        self.node = TRIE
+        self.extend(letters)
+
+        return removed
+
+# a whole string at once
+def to_kana(romaji: str) -> str:
+    converter = RomajiConverter()
+    converter.extend(romaji.lower())
+
+    return converter.text
@@ -0,0 +1,28 @@
+import sqlite3
+
+from typing import NamedTuple
+
+
+# lightweight row access on plain cursors, for the paths that don't need a DataFrame
+# building a DataFrame for a handful of rows costs far more than the query itself
+
+# the three counters grading reads and writes
+class ReviewCounts(NamedTuple):
+    current_grade: int
+    failure_count: int
+    success_count: int
+
+# rows as dicts keyed by column name, the same shape DataFrame.to_dict("records") gives
+def fetch_dicts(conn: sqlite3.Connection, q: str, params = ()) -> list:
+    cursor = conn.execute(q, params)
+    columns = [description[0] for description in cursor.description]
+
+    return [dict(zip(columns, row)) for row in cursor]
+
+# the first column of every row
+def fetch_column(conn: sqlite3.Connection, q: str, params = ()) -> list:
+    return [row[0] for row in conn.execute(q, params)]
+
+# a single row as a tuple, or None
+def fetch_one(conn: sqlite3.Connection, q: str, params = ()) -> tuple | None:
+    return conn.execute(q, params).fetchone()
@@ -0,0 +1,220 @@
+import os
+import re
+import sqlite3
+import sys
+import time
+import tomllib
+
+from src.predicates import Predicate, all_of
+
+
+# full-text search sidecar for the dictionary db
+# the dictionary never changes, so the index is built once, offline, into its own file (path_to_search_db):
+#     python -m src.search_index
+# SrsApp attaches it when it exists; without it, searches fall back to LIKE scans of the dictionary
+# every table is contentless and keyed by the dictionary row's ID, so the index only ever answers "which rows match"
+# *_words (unicode61) answer exact and prefix searches of whole words and readings
+# *_trigram answer substring searches of 3 or more characters
+
+# bump when the tables change, so an old sidecar is ignored instead of queried
+SEARCH_INDEX_VERSION = 1
+
+# index column -> what it holds, per dictionary table (aliased as v and k)
+INDEX_COLUMNS = {
+    "vocab": {
+        "kanji": "v.KanjiWriting",
+        "kana": "v.KanaWriting",
+        "meanings": """(
+            SELECT group_concat(m.Meaning, ' ; ') FROM VocabEntityVocabMeaning AS l
+            JOIN VocabMeaningSet AS m ON l.Meanings_ID = m.ID
+            WHERE l.VocabEntity_ID = v.ID
+            )""",
+    },
+    "kanji": {
+        "kanji": "k.Character",
+        "onyomi": "k.OnYomi",
+        "kunyomi": "k.KunYomi",
+        "nanori": "k.Nanori",
+        "meanings": "(SELECT group_concat(m.Meaning, ' ; ') FROM KanjiMeaningSet AS m WHERE m.Kanji_ID = k.ID)",
+    },
+}
+
+# every row's meanings at once, for the build
+# the subqueries above would scan the link tables once per row on a dictionary without indexes
+MEANINGS = {
+    "vocab": """
+        SELECT l.VocabEntity_ID, group_concat(m.Meaning, ' ; ') FROM VocabEntityVocabMeaning AS l
+        JOIN VocabMeaningSet AS m ON l.Meanings_ID = m.ID
+        GROUP BY l.VocabEntity_ID
+        """,
+    "kanji": "SELECT m.Kanji_ID, group_concat(m.Meaning, ' ; ') FROM KanjiMeaningSet AS m GROUP BY m.Kanji_ID",
+}
+
+SOURCE_TABLES = {"vocab": "VocabSet AS v", "kanji": "KanjiSet AS k"}
+ID_COLUMNS = {"vocab": "v.ID", "kanji": "k.ID"}
+
+# search field -> the index columns it looks in
+SEARCH_FIELDS = {
+    "vocab": {"kanji": ["kanji"], "kana": ["kana"], "meaning": ["meanings"]},
+    "kanji": {"kanji": ["kanji"], "kana": ["onyomi", "kunyomi", "nanori"], "meaning": ["meanings"]},
+}
+
+# comma separated lists (writings, readings) are matched element by element when there's no index
+LIST_COLUMNS = {"kanji", "kana", "onyomi", "kunyomi", "nanori"}
+
+# what the fallback splits meanings into words on, like unicode61 does, so exact and prefix searches match the same words
+# with and without the sidecar (the fallback doesn't fold diacritics, so "cafe" still won't find "café" without it)
+WORD_SEPARATORS = ";,.:()[]/!?\"'-_"
+
+TOKENIZERS = {
+    "words": "unicode61 remove_diacritics 2",
+    "trigram": "trigram",
+}
+
+# (re)builds the sidecar from the dictionary db
+def build_search_index(path_to_full_db: str, path_to_search_db: str) -> None:
+    tmp_path = path_to_search_db + ".tmp"
+
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    # build next to the old index and swap it in at the end, so the app never sees half an index
+    # the dictionary's table names don't clash with the index's, so they can be used unqualified
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("ATTACH DATABASE ? AS dictionary;", (path_to_full_db,))
+
+    for table, columns in INDEX_COLUMNS.items():
+        conn.execute(f"CREATE TEMP TABLE {table}_meanings (ID INTEGER PRIMARY KEY, Meanings TEXT);")
+        conn.execute(f"INSERT INTO temp.{table}_meanings {MEANINGS[table]};")
+
+        exprs = ", ".join(f"{table}_meanings.Meanings" if column == "meanings" else expr for column, expr in columns.items())
+
+        for kind, tokenizer in TOKENIZERS.items():
+            start = time.perf_counter()
+
+            conn.execute(f"CREATE VIRTUAL TABLE {table}_{kind} USING fts5({', '.join(columns)}, content = '', tokenize = '{tokenizer}');")
+            conn.execute(f"""
+                INSERT INTO {table}_{kind} (rowid, {', '.join(columns)})
+                SELECT {ID_COLUMNS[table]}, {exprs} FROM {SOURCE_TABLES[table]}
+                LEFT JOIN temp.{table}_meanings ON {table}_meanings.ID = {ID_COLUMNS[table]};
+                """)
+            conn.execute(f"INSERT INTO {table}_{kind} ({table}_{kind}) VALUES ('optimize');")
+            conn.commit()
+
+            print(f"Indexed {table} ({kind}) in {time.perf_counter() - start:.1f}s")
+
+    conn.execute(f"PRAGMA user_version = {SEARCH_INDEX_VERSION};")
+    conn.commit()
+    conn.execute("DETACH DATABASE dictionary;")
+    conn.execute("VACUUM;")
+    conn.close()
+
+    os.replace(tmp_path, path_to_search_db)
+
+    return None
+
+# a term as a quoted fts5 string, so user input is never parsed as query syntax
+def fts_string(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+# fts5 query for text in any of the columns; prefix = True also matches words that start with its last word
+def fts_query(columns: list, text: str, prefix: bool = False) -> str:
+    return "{" + " ".join(columns) + "} : " + fts_string(text) + ("*" if prefix else "")
+
+# a term as a LIKE pattern body, with the wildcards in it escaped (use with ESCAPE '\')
+def like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# a term's words, one space apart, the way they're compared with words_expr
+def words(text: str) -> str:
+    return " ".join(re.findall(r"[^\W_]+", text))
+
+# a text column as its words, one space apart and with a space at either end, for matching whole words with LIKE
+def words_expr(expr: str) -> str:
+    for separator in WORD_SEPARATORS:
+        literal = "'" + separator.replace("'", "''") + "'"
+        expr = f"replace({expr}, {literal}, ' ')"
+
+    # separators next to each other, like the ' ; ' between meanings, leave runs of spaces; three passes fold up to 8
+    for _ in range(3):
+        expr = f"replace({expr}, '  ', ' ')"
+
+    return f"' ' || {expr} || ' '"
+
+# keeps the rows of a dictionary table that match one search term
+# mode is "exact" (a whole word or reading), "prefix" or "substring"
+# schema is what the sidecar is attached as, or None to search the dictionary itself
+def term_condition(table: str, field: str, text: str, mode: str, schema: str | None) -> Predicate:
+    columns = SEARCH_FIELDS[table][field]
+    id_col = ID_COLUMNS[table]
+
+    # trigrams can't find anything shorter than a trigram
+    if schema is not None and not (mode == "substring" and len(text) < 3):
+        kind = "trigram" if mode == "substring" else "words"
+        query = fts_query(columns, text, prefix = mode == "prefix")
+
+        return Predicate(f"{id_col} IN (SELECT rowid FROM {schema}.{table}_{kind} WHERE {table}_{kind} MATCH ?)", (query,))
+
+    conditions = []
+    params = []
+
+    for column in columns:
+        expr = INDEX_COLUMNS[table][column]
+
+        match mode:
+            case "exact" if column in LIST_COLUMNS:
+                conditions.append(f"',' || {expr} || ',' LIKE '%,' || ? || ',%' ESCAPE '\\'")
+                params.append(like_escape(text))
+
+            case "prefix" if column in LIST_COLUMNS:
+                conditions.append(f"',' || {expr} LIKE '%,' || ? || '%' ESCAPE '\\'")
+                params.append(like_escape(text))
+
+            # free text (meanings) is matched by whole words, like the index does
+            case "exact":
+                conditions.append(f"{words_expr(expr)} LIKE '% ' || ? || ' %' ESCAPE '\\'")
+                params.append(like_escape(words(text)))
+
+            case "prefix":
+                conditions.append(f"{words_expr(expr)} LIKE '% ' || ? || '%' ESCAPE '\\'")
+                params.append(like_escape(words(text)))
+
+            case _:
+                conditions.append(f"{expr} LIKE '%' || ? || '%' ESCAPE '\\'")
+                params.append(like_escape(text))
+
+    return Predicate(" OR ".join(conditions), tuple(params))
+
+# keeps the rows matching every term
+# terms is search field ("kanji", "kana" or "meaning") -> text; empty terms are ignored
+def search_condition(table: str, terms: dict | None, mode: str = "exact", schema: str | None = None) -> Predicate:
+    conditions = []
+
+    for field, text in (terms or dict()).items():
+        text = (text or "").strip()
+
+        if text != "":
+            conditions.append(term_condition(table, field, text, mode, schema))
+
+    return all_of(*conditions)
+
+# builds the index for the dbs in config.toml, or the given paths
+# usage: python -m src.search_index [path_to_full_db path_to_search_db]
+def main() -> None:
+    if len(sys.argv) == 3:
+        path_to_full_db, path_to_search_db = sys.argv[1:]
+
+    else:
+        with open("config.toml", "rb") as f:
+            config = tomllib.load(f)
+
+        path_to_full_db = config["path_to_full_db"]
+        path_to_search_db = config["path_to_search_db"]
+
+    build_search_index(path_to_full_db, path_to_search_db)
+    print(f"Wrote {path_to_search_db}")
+
+    return None
+
+if __name__ == "__main__":
+    main()
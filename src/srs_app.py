@@ -1,12 +1,27 @@
-import pandas as pd
 import sqlite3
-import random
+import threading
 
 from datetime import datetime, timedelta, timezone
 from functools import wraps
-
-from pandas.core.frame import DataFrame
-from src.dataclasses import SrsConfig
+from itertools import islice
+
+from src.dataclasses import ConversionReport, ImportReport, ItemResult, ReschedulePolicy, RescheduleReport, SrsConfig
+from src.answer_matcher import AnswerMatcher
+from src.cards import Card
+from src.db_pool import ConnectionPool
+from src.due_queue import DueQueue
+from src.houhou import CONVERSIONS, convert_houhou_dates, pending_conversion, print_progress
+from src.importer import MAX_ERRORS, fill_from_dictionary, read_entries
+from src.keyset import fetch_page, keyset_order
+from src.migrations import DICTIONARY_MIGRATIONS, get_schema_version, migrate
+from src.predicates import Predicate, all_of, in_list
+from src.review_journal import ReviewJournal
+from src.review_session import ReviewSession, ReviewSessions
+from src.review_stats import ReviewStats
+from src.search_index import SEARCH_INDEX_VERSION, fts_query, search_condition
+from src.rows import ReviewCounts, fetch_dicts, fetch_column, fetch_one
+
+JLPT_LEVELS = [1, 2, 3, 4, 5]
 
 # decorator to handle if db connection is not established
 # returns None if no connection
@@ -25,6 +40,15 @@ def check_conn(f):
 
     return wrapper
 
+# user input stripped, or None if there's nothing in it
+def clean_text(value) -> str | None:
+    if value is None:
+        return None
+
+    text = str(value).strip()
+
+    return text if text != "" else None
+
 class SrsApp:
     def __init__(self, config: SrsConfig):
 
@@ -37,46 +61,57 @@ class SrsApp:
             "vocab_col": "AssociatedVocab",
             "kanji_col": "AssociatedKanji",
             "id_col": "ID",
-            "houhou_last_update_col": "LastUpdateDate",
-            "houhou_creation_col": "CreationDate",
-            "houhou_next_answer_col": "NextAnswerDate",
-            "houhou_suspension_col": "SuspensionDate",
+        }
+
+        # columns the add and edit tables can be sorted by, keyed by the table's column name
+        self.vocab_sort_cols = {"wiki": "v.WikiRank", "freq": "v.FrequencyRank", "jlpt": "v.JlptLevel", "wanikani": "v.WkLevel"}
+        self.kanji_sort_cols = {"wiki": "k.NewspaperRank", "freq": "k.MostUsedRank", "jlpt": "k.JlptLevel", "wanikani": "k.WkLevel"}
+        self.study_sort_cols = {"rank": "Rank", "srsgrade": self.col_dict["current_grade_col"], "nextanswer": self.col_dict["date_col"]}
+
+        # fields the editor can search, and the columns of the srs_search index (see migrations.py) each looks in
+        self.study_search_fields = {
+            "meaning": ["Meanings"],
+            "reading": ["Readings"],
+            "any": ["Meanings", "Readings", "MeaningNote", "ReadingNote", "AssociatedVocab", "AssociatedKanji"],
         }
 
         # set initial definitions from dataclass
         self.max_reviews_at_once = config.max_reviews_at_once
         self.entries_before_commit = config.entries_before_commit
+        self.review_prefetch_size = config.review_prefetch_size
+        self.journal_flush_interval = config.journal_flush_interval
+        self.db_readers = config.db_readers
+        self.db_cached_statements = config.db_cached_statements
         self.match_score_threshold = config.match_score_threshold
         self.srs_interval = config.srs_interval
+        self.reschedule_policy = config.reschedule_policy
         self.path_to_srs_db = config.path_to_srs_db
         self.path_to_full_db = config.path_to_full_db
+        self.path_to_search_db = config.path_to_search_db
 
         # variables shared between app and ui
         self.id_srs_db = "srs_db"
         self.name_srs_table = self.id_srs_db + ".SrsEntrySet"
-        self.conn = None
+        self.id_search_db = None # set once the dictionary's search index is attached
+        self.pool = None
+        self.conn = None # the pool's writer connection
         self.cursor = None
         self.entries_without_commit = 0
-        self.due_review_ids = []
-        self.len_review_ids = 0
-        self.reset_review_variables()
-
-    # reset a few variables
-    def reset_review_variables(self) -> None:
-        self.current_index = 0
-        self.current_completed = 0
-        self.stop_updating_review = False
-        self.current_reviews = []
-
-        return None
+        self.due_queue = DueQueue()
+        self.review_stats = ReviewStats(max(int(x) for x in self.srs_interval.keys()))
+        self.review_journal = None
+        self.review_rows = dict() # id -> latest ReviewCounts, ahead of the db until flushed
+        self.review_lock = threading.RLock() # guards review_rows, which the event loop and the worker threads both change
+        self.review_sessions = ReviewSessions(self, idle_timeout = config.review_session_timeout)
 
     # initialize sql connection to db
     def init_db(self) -> bool:
 
-        # i have thought about having two connections, but there are a few cross database queries that need to be run
-        # i guess another solution can be retrieving 2 tables using pd and operating on them using pd
+        # every connection has both dbs, since there are a few cross database queries that need to be run
+        # reads (stats, searches) go to pooled read-only connections; writes go through self.conn only
         try:
-            self.conn = sqlite3.connect(self.path_to_full_db)
+            self.pool = ConnectionPool(self.path_to_full_db, self.path_to_srs_db, self.id_srs_db, path_to_search_db = self.path_to_search_db, max_readers = self.db_readers, cached_statements = self.db_cached_statements)
+            self.conn = self.pool.open()
 
         except sqlite3.Error as e:
             raise f"Conn failed: {e}"
@@ -89,97 +124,196 @@ class SrsApp:
             return False
 
         self.cursor = self.conn.cursor()
-        self.cursor.execute(f"ATTACH DATABASE '{self.path_to_srs_db}' AS {self.id_srs_db};")
+
+        # make sure the srs db has the latest indexes before anything queries it
+        with self.pool.writer() as conn:
+
+            # a houhou db has no ISO dates to index until it's converted
+            conversion = pending_conversion(conn, self.id_srs_db)
+
+            if conversion is not None:
+                print("Converting the houhou db, this only happens once...")
+                self.convert_from_houhou(with_epoch = CONVERSIONS[conversion], on_progress = print_progress)
+
+            migrate(conn, self.id_srs_db)
+
+            # the dictionary indexes only make paging faster, so a read-only dictionary db is fine without them
+            try:
+                migrate(conn, "main", DICTIONARY_MIGRATIONS)
+
+            except sqlite3.OperationalError as e:
+                print(f"Could not index the dictionary db, searches will be slower: {e}")
+
+            # an index from an older build has different tables, so it's searched around until rebuilt
+            if self.pool.path_to_search_db is not None:
+                if get_schema_version(conn, self.pool.id_search_db) == SEARCH_INDEX_VERSION:
+                    self.id_search_db = self.pool.id_search_db
+
+                else:
+                    print("The search index is out of date, rebuild it with `python -m src.search_index`.")
+
+        # replay answers that never made it to the db before the due queue is built from it
+        self.review_journal = ReviewJournal(
+            self.path_to_srs_db + ".journal",
+            self.write_review_entries,
+            flush_interval = self.journal_flush_interval,
+            flush_threshold = self.entries_before_commit
+        )
+        replayed = self.review_journal.open()
+
+        if replayed:
+            print(f"Replayed {replayed} reviews from the journal.")
+
+        self.load_due_queue()
+        self.rebuild_review_stats()
 
         return True
 
+    # current utc time, formatted the same way dates are stored in the db
+    def get_timestamp(self) -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    # (re)build the in-memory due queue from the db
+    # this is the only time the whole table is read for due dates; writes keep it in sync afterwards
+    @check_conn
+    def load_due_queue(self) -> None:
+        q = f"""
+            SELECT {self.col_dict["id_col"]}, {self.col_dict["date_col"]} FROM {self.name_srs_table}
+            WHERE {self.col_dict["date_col"]} IS NOT NULL;
+            """
+
+        with self.pool.reader() as conn:
+            self.due_queue.build(conn.execute(q).fetchall())
+
+        return None
+
+    # (grade, failure count, success count, next answer date) for every item, for the stats totals
+    def read_stats_rows(self) -> list:
+        q = f"""
+            SELECT
+                {self.col_dict["current_grade_col"]},
+                {self.col_dict["failure_col"]},
+                {self.col_dict["success_col"]},
+                {self.col_dict["date_col"]}
+            FROM {self.name_srs_table};
+            """
+
+        with self.pool.reader() as conn:
+            return conn.execute(q).fetchall()
+
+    # recompute the stats totals from scratch
+    @check_conn
+    def rebuild_review_stats(self) -> None:
+        self.review_stats.build(self.read_stats_rows())
+
+        return None
+
+    # check that the running stats totals still match the db
+    @check_conn
+    def verify_review_stats(self) -> bool:
+
+        # the readers only see what has been written and committed
+        self.flush_reviews()
+        self.force_commit()
+
+        fresh_stats = ReviewStats(self.review_stats.max_grade)
+        fresh_stats.build(self.read_stats_rows())
+
+        return fresh_stats.as_tuple() == self.review_stats.as_tuple()
+
     # buffer for committing
     # prevents many commits at the same time
     @check_conn
     def to_commit(self) -> None:
-        self.entries_without_commit += 1
+        with self.pool.writer() as conn:
+            self.entries_without_commit += 1
 
-        if self.entries_without_commit >= self.entries_before_commit:
-            self.conn.commit()
-            self.entries_without_commit = 0
+            if self.entries_without_commit >= self.entries_before_commit:
+                conn.commit()
+                self.entries_without_commit = 0
 
         return None
 
     # reset # of entries without commit, and then commit
     @check_conn
     def force_commit(self) -> None:
+        with self.pool.writer() as conn:
+            self.entries_without_commit = 0
+            conn.commit()
+
+        return None
+
+    # commits the writes still waiting on the writer, for methods that run a batch in its own transaction
+    # a failed batch rolls back everything uncommitted, so without this it would take those writes with it
+    # called with the writer held
+    def commit_pending(self, conn) -> None:
+        conn.commit()
         self.entries_without_commit = 0
-        self.conn.commit()
 
         return None
 
+    # writes graded reviews from the journal to the db in one transaction
+    # runs on the journal's flusher thread; anything else waiting to be committed goes out with it
+    def write_review_entries(self, entries: list) -> None:
+        q = f"""
+            UPDATE {self.name_srs_table}
+            SET
+                CurrentGrade = ?,
+                FailureCount = ?,
+                SuccessCount = ?,
+                LastUpdateDateISO = ?,
+                NextAnswerDateISO = ?
+            WHERE {self.col_dict["id_col"]} = ?;
+            """
+
+        with self.pool.writer() as conn:
+            with conn:
+                conn.executemany(q, [(grade, failure, success, last_update, next_answer, item_id) for item_id, grade, failure, success, last_update, next_answer in entries])
+
+            self.entries_without_commit = 0
+
+        return None
+
+    # write any journaled reviews to the db right away
+    @check_conn
+    def flush_reviews(self) -> bool:
+        return self.review_journal.flush()
+
     # close db by commiting all changes then closing the connection
     @check_conn
     def close_db(self) -> None:
         self.force_commit()
-        self.conn.close()
+        self.review_journal.close()
+        self.pool.close()
 
         self.conn = None
         self.cursor = None
 
         return None
 
-    # retrieve counts and ratio from db
+    # retrieve counts and ratio from the running totals
+    # none of this touches the db, so it costs the same no matter how big the deck is
     @check_conn
-    def get_review_stats(self) -> tuple[DataFrame, DataFrame, DataFrame]:
-        max_srs_grade = max(int(x) for x in self.srs_interval.keys())
-
-        expected_values = "\n".join([f"SELECT {i} UNION ALL" for i in range(max_srs_grade)])
-
-        q_current_grade_count = f"""
-                                WITH expected(val) AS (
-                                    {expected_values}
-                                    SELECT {max_srs_grade}
-                                )
-                                SELECT expected.val AS val,
-                                    COUNT(srs.{self.col_dict["current_grade_col"]})
-                                FROM expected
-                                LEFT JOIN {self.name_srs_table} AS srs ON srs.{self.col_dict["current_grade_col"]} = expected.val
-                                GROUP BY expected.val
-                                ORDER BY expected.val;
-                                """
+    def get_review_stats(self) -> dict:
 
         # get the end of day today, but in utc! (items are stored using now -> utc time)
-        q_today_review_count = f"""
-                               SELECT COUNT(*) FROM {self.name_srs_table}
-                               WHERE {self.col_dict["date_col"]} < datetime('now', 'localtime', 'start of day', '+1 day', '-1 second', 'utc');
-                               """
-
-        q_sucess_ratio = f"""
-                         SELECT 
-                             CASE
-                             WHEN (SUM({self.col_dict["failure_col"]}) + SUM({self.col_dict["success_col"]})) = 0 THEN 0
-                             ELSE SUM({self.col_dict["success_col"]}) * 1.0 / (SUM({self.col_dict["failure_col"]}) + SUM({self.col_dict["success_col"]}))
-                             END AS ratio
-                         FROM srs_db.SrsEntrySet
-                         """
-
-        df_grade_counts = pd.read_sql_query(q_current_grade_count, self.conn)
-        df_today_counts = pd.read_sql_query(q_today_review_count, self.conn)
-        df_ratio = pd.read_sql_query(q_sucess_ratio, self.conn)
-
-        return df_grade_counts, df_today_counts, df_ratio
-
-    # returns info on current item
-    @check_conn
-    def get_current_item(self) -> dict:
-        if len(self.current_reviews) == 0:
-            return None
-
-        if self.current_index >= len(self.current_reviews):
-            self.current_index = 0
+        end_of_today = datetime.now().astimezone().replace(hour = 0, minute = 0, second = 0, microsecond = 0) + timedelta(days = 1, seconds = -1)
+        end_of_today_utc = end_of_today.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+        stats = {
+            "grade_counts": self.review_stats.get_grade_counts(),
+            "due_now": self.count_due_reviews(),
+            "due_today": self.due_queue.count_due(end_of_today_utc),
+            "success_ratio": self.review_stats.get_success_ratio(),
+            "due_by_day": self.review_stats.get_due_by_day(),
+        }
 
-        return self.current_reviews[self.current_index]
+        return stats
 
-    # returns df on review items that have their next review date timestamp less than the current time
+    # returns rows of review items that have their next review date timestamp less than the current time
     # that means that item is ready for review
     @check_conn
-    def get_due_reviews(self) -> DataFrame:
+    def get_due_reviews(self) -> list:
 
         # this will get all items that have their reviews BEFORE the current time in **UTC**
         q = f"""
@@ -187,8 +321,21 @@ class SrsApp:
             WHERE {self.col_dict["date_col"]} < current_timestamp;
             """
 
-        df = pd.read_sql_query(q, self.conn)
-        return df
+        with self.pool.reader() as conn:
+            rows = fetch_dicts(conn, q)
+
+        return rows
+
+    # number of items that are due right now
+    @check_conn
+    def count_due_reviews(self) -> int:
+        return self.due_queue.count_due(self.get_timestamp())
+
+    # when the next item becomes due, as a utc timestamp string
+    # None if nothing is scheduled
+    @check_conn
+    def get_next_review_date(self) -> str | None:
+        return self.due_queue.next_due()
 
     # returns df of all vocabs present in the user's srs review
     @check_conn
@@ -197,9 +344,10 @@ class SrsApp:
             SELECT {self.col_dict["vocab_col"]} FROM {self.name_srs_table};
             """
 
-        df = pd.read_sql_query(q, self.conn)
+        with self.pool.reader() as conn:
+            all_vocabs = set(fetch_column(conn, q))
 
-        all_vocabs = set(df[self.col_dict["vocab_col"]].dropna())
+        all_vocabs.discard(None)
 
         return all_vocabs
 
@@ -214,174 +362,257 @@ class SrsApp:
             OR LENGTH({self.col_dict["kanji_col"]}) = 1;
             """
 
-        df = pd.read_sql_query(q, self.conn)
+        with self.pool.reader() as conn:
+            rows = conn.execute(q).fetchall()
 
-        vocab_kanjis = set(df[self.col_dict["vocab_col"]].dropna())
-        kanji_kanjis = set(df[kanji_col].dropna())
+        vocab_kanjis = {vocab for vocab, _ in rows if vocab is not None}
+        kanji_kanjis = {kanji for _, kanji in rows if kanji is not None}
 
         all_kanjis = vocab_kanjis.union(kanji_kanjis)
 
         return all_kanjis
 
-    @check_conn
-    def filter_study_items(self, item_type: str, condition: str = "1=1") -> DataFrame:
+    # which column study items of a type are linked by
+    def get_item_col(self, item_type: str) -> str:
         match item_type:
             case "vocab":
-                item_col = self.col_dict["vocab_col"]
+                return self.col_dict["vocab_col"]
 
             case "kanji":
-                item_col = self.col_dict["kanji_col"]
+                return self.col_dict["kanji_col"]
 
             case _:
                 raise Exception
 
-        q = f"""
-            SELECT * FROM {self.name_srs_table}
-            WHERE {item_col} IS NOT NULL
-            AND {condition};
-            """
+    # the srs table as a subquery, with each item's bm25 rank for the search as Rank (lower is better)
+    # search is field (one of study_search_fields) -> text; every field has to match, and the last word of each also
+    # matches words it's the start of
+    # with nothing to search for, that's every item, with a null rank
+    def get_study_source(self, search: dict | None) -> tuple:
+        terms = []
 
-        df = pd.read_sql_query(q, self.conn)
-        return df
+        for field, text in (search or dict()).items():
+            text = (text or "").strip()
 
-    # returns df of vocab that isn't present in our reviews given conditions
-    # sort after using pd.sort_values to put nans at the end
-    @check_conn
-    def discover_new_vocab(self, condition: str = "v.JlptLevel IN (1, 2, 3, 4, 5)") -> DataFrame:
-        q = f"""
-            WITH v_except AS (
-                SELECT * FROM VocabSet AS v
-                WHERE {condition}
-                AND NOT EXISTS (
-                    SELECT 1 FROM {self.name_srs_table} AS srs
-                    WHERE srs.{self.col_dict["vocab_col"]} = v.KanjiWriting
-                    )
-                )
-            SELECT * FROM v_except
-            JOIN VocabEntityVocabMeaning AS v_link ON v_link.VocabEntity_ID = v_except.ID
-            JOIN VocabMeaningSet AS v_meaning ON v_link.Meanings_ID = v_meaning.ID
-            JOIN VocabMeaningVocabCategory as v_cat_link ON v_cat_link.VocabMeaningVocabCategory_VocabCategory_ID = v_meaning.ID
-            JOIN VocabCategorySet as v_cat ON v_cat.ID = v_cat_link.Categories_ID;
-            """
+            if text != "":
+                terms.append(fts_query(self.study_search_fields[field], text, prefix = True))
 
-        df = pd.read_sql_query(q, self.conn)
-        return df
+        if not terms:
+            return f"(SELECT *, NULL AS Rank FROM {self.name_srs_table})", ()
 
-    # returns df of kanji that isn't present in our reviews given conditions
-    # sort after using pd.sort_values to put nans at the end
+        # notes count for less than the item itself
+        q = f"""(
+            SELECT srs.*, bm25(srs_search, 1.0, 1.0, 0.5, 0.5, 1.0, 1.0) AS Rank
+            FROM {self.id_srs_db}.srs_search
+            JOIN {self.name_srs_table} AS srs ON srs.ID = srs_search.rowid
+            WHERE srs_search MATCH ?
+            )"""
+
+        return q, (" AND ".join(terms),)
+
+    # one page of study items of a type, sorted by one of study_sort_cols ("rank" puts the best search matches first)
+    # condition is any other filter on the srs table, and search works like in get_study_source
+    # after is the (sort key, id) of the last row of the previous page, or None for the first page
     @check_conn
-    def discover_new_kanji(self, condition: str = "k.JpltLevel IN (1, 2, 3, 4, 5)") -> DataFrame:
-        q = f"""
-            WITH k_except AS (
-                SELECT * FROM KanjiSet AS k
-                WHERE {condition}
-                AND NOT EXISTS (
-                    SELECT 1 FROM {self.name_srs_table} AS srs
-                    WHERE srs.{self.col_dict["kanji_col"]} = k.Character
-                    )
-                )
-            SELECT * FROM k_except as k
-            JOIN KanjiMeaningSet AS k_meanings ON k_meanings.Kanji_ID = k.ID;
-            """
+    def filter_study_items(self, item_type: str, condition: Predicate = all_of(), search: dict | None = None, sort: str = "srsgrade", descending: bool = False, after: tuple | None = None, limit: int = 100) -> list:
+
+        # the editor should show the latest grades and responses
+        self.flush_reviews()
+        self.force_commit()
 
-        df = pd.read_sql_query(q, self.conn)
-        return df
+        item_col = self.get_item_col(item_type)
+        sort_col = self.study_sort_cols[sort]
+        source, source_params = self.get_study_source(search)
+
+        def run(keyset: str, params: tuple, limit: int) -> list:
+            q = f"""
+                SELECT *, {sort_col} AS SortKey FROM {source}
+                WHERE {item_col} IS NOT NULL
+                AND {condition.sql}
+                AND {keyset}
+                ORDER BY {keyset_order(sort_col, "ID", descending)}
+                LIMIT ?;
+                """
+
+            with self.pool.reader() as conn:
+                return fetch_dicts(conn, q, (*source_params, *condition.params, *params, limit))
+
+        return fetch_page(run, sort_col, "ID", descending, after, limit)
 
-    # initialize the review session
     @check_conn
-    def start_review_session(self) -> list:
-        self.reset_review_variables()
+    def count_study_items(self, item_type: str, condition: Predicate = all_of(), search: dict | None = None) -> int:
+        source, source_params = self.get_study_source(search)
 
-        # get due reviews
-        df = self.get_due_reviews()
+        q = f"""
+            SELECT COUNT(*) FROM {source}
+            WHERE {self.get_item_col(item_type)} IS NOT NULL
+            AND {condition.sql};
+            """
 
-        if df.empty:
-            return []
+        with self.pool.reader() as conn:
+            (count,) = fetch_one(conn, q, (*source_params, *condition.params))
 
-        # sort them by when they were due, so the user can complete the earliest ones first
-        sorted_df = df.sort_values(self.col_dict["date_col"], ascending = False)
-        self.due_review_ids = sorted_df["ID"].tolist()
-        self.len_review_ids = len(self.due_review_ids)
+        return count
 
-        current_ids = set()
+    # returns one page of vocab that isn't present in our reviews given condition, one row per dictionary entry
+    # meanings (and their tags) are collapsed in sql for just the rows on the page
+    # search is field ("kanji", "kana" or "meaning") -> text, matched per search_mode (see search_condition)
+    # sorted by one of vocab_sort_cols, with rows missing it at the end; after works like in filter_study_items
+    @check_conn
+    def discover_new_vocab(self, condition: Predicate = in_list("v.JlptLevel", JLPT_LEVELS), search: dict | None = None, search_mode: str = "exact", sort: str = "wiki", descending: bool = False, after: tuple | None = None, limit: int = 100) -> list:
+        sort_col = self.vocab_sort_cols[sort]
+        where = all_of(condition, search_condition("vocab", search, search_mode, self.id_search_db))
 
-        # makes sure that we add as many items to the review list without exceeding the max reviews defined
-        while len(current_ids) < len(sorted_df) and len(current_ids) < self.max_reviews_at_once:
-            current_id = self.due_review_ids.pop()
-            current_ids.add(current_id)
+        def run(keyset: str, params: tuple, limit: int) -> list:
+            q = f"""
+                WITH v_page AS (
+                    SELECT v.*, {sort_col} AS SortKey FROM VocabSet AS v
+                    WHERE {where.sql}
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {self.name_srs_table} AS srs
+                        WHERE srs.{self.col_dict["vocab_col"]} = v.KanjiWriting
+                        )
+                    AND {keyset}
+                    ORDER BY {keyset_order(sort_col, "v.ID", descending)}
+                    LIMIT ?
+                    ),
+                v_per_meaning AS (
+                    SELECT
+                        v_page.ID,
+                        TRIM(v_meaning.Meaning) AS Meaning,
+                        group_concat(v_cat.ShortName, ';') AS Tags
+                    FROM v_page
+                    LEFT JOIN VocabEntityVocabMeaning AS v_link ON v_link.VocabEntity_ID = v_page.ID
+                    LEFT JOIN VocabMeaningSet AS v_meaning ON v_link.Meanings_ID = v_meaning.ID
+                    LEFT JOIN VocabMeaningVocabCategory as v_cat_link ON v_cat_link.VocabMeaningVocabCategory_VocabCategory_ID = v_meaning.ID
+                    LEFT JOIN VocabCategorySet as v_cat ON v_cat.ID = v_cat_link.Categories_ID
+                    GROUP BY v_page.ID, TRIM(v_meaning.Meaning)
+                    )
+                SELECT
+                    v_page.ID AS ID,
+                    v_page.SortKey AS SortKey,
+                    v_page.KanjiWriting AS Kanji,
+                    v_page.KanaWriting AS Readings,
+                    group_concat(v_per_meaning.Meaning, ',') AS Meanings,
+                    v_page.IsCommon AS IsCommon,
+                    v_page.JlptLevel AS JlptLevel,
+                    v_page.WkLevel AS WkLevel,
+                    v_page.FrequencyRank AS FrequencyRank,
+                    v_page.WikiRank AS WikiRank,
+                    group_concat(v_per_meaning.Tags, ';') AS Tags
+                FROM v_page
+                JOIN v_per_meaning ON v_per_meaning.ID = v_page.ID
+                GROUP BY v_page.ID
+                ORDER BY {keyset_order("v_page.SortKey", "v_page.ID", descending)};
+                """
 
-        current_df = sorted_df[sorted_df["ID"].isin(current_ids)]
-        items = current_df.to_dict("records")
-        self.add_to_review(items)
+            with self.pool.reader() as conn:
+                return fetch_dicts(conn, q, (*where.params, *params, limit))
 
-        return self.current_reviews
+        return fetch_page(run, sort_col, "v.ID", descending, after, limit)
 
-    # if the user has not designated to stop reviewing, get another item and add it to the review list
     @check_conn
-    def update_review_session(self) -> None:
+    def count_new_vocab(self, condition: Predicate = in_list("v.JlptLevel", JLPT_LEVELS), search: dict | None = None, search_mode: str = "exact") -> int:
+        where = all_of(condition, search_condition("vocab", search, search_mode, self.id_search_db))
+        q = f"""
+            SELECT COUNT(*) FROM VocabSet AS v
+            WHERE {where.sql}
+            AND NOT EXISTS (
+                SELECT 1 FROM {self.name_srs_table} AS srs
+                WHERE srs.{self.col_dict["vocab_col"]} = v.KanjiWriting
+                );
+            """
 
-        # stop we have already added all review items into our list, so we can stop updating review
-        if len(self.due_review_ids) == 0:
-            self.stop_updating_review = True
+        with self.pool.reader() as conn:
+            (count,) = fetch_one(conn, q, where.params)
 
-        if not self.stop_updating_review:
+        return count
 
-            # adds one id
-            current_id = self.due_review_ids.pop()
+    # returns one page of kanji that isn't present in our reviews given condition, one row per kanji
+    # readings are the first non-empty of onyomi, kunyomi and nanori
+    # search works like in discover_new_vocab; kana searches look in all three readings
+    # sorted by one of kanji_sort_cols (newspaper rank is shown as the wiki rank); after works like in filter_study_items
+    @check_conn
+    def discover_new_kanji(self, condition: Predicate = in_list("k.JlptLevel", JLPT_LEVELS), search: dict | None = None, search_mode: str = "exact", sort: str = "wiki", descending: bool = False, after: tuple | None = None, limit: int = 100) -> list:
+        sort_col = self.kanji_sort_cols[sort]
+        where = all_of(condition, search_condition("kanji", search, search_mode, self.id_search_db))
+
+        def run(keyset: str, params: tuple, limit: int) -> list:
             q = f"""
-                SELECT * FROM {self.name_srs_table}
-                WHERE {self.col_dict["id_col"]} = {current_id};
+                WITH k_page AS (
+                    SELECT k.*, {sort_col} AS SortKey FROM KanjiSet AS k
+                    WHERE {where.sql}
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {self.name_srs_table} AS srs
+                        WHERE srs.{self.col_dict["kanji_col"]} = k.Character
+                        )
+                    AND {keyset}
+                    ORDER BY {keyset_order(sort_col, "k.ID", descending)}
+                    LIMIT ?
+                    )
+                SELECT
+                    k.ID AS ID,
+                    k.SortKey AS SortKey,
+                    k.Character AS Kanji,
+                    CASE
+                        WHEN TRIM(k.OnYomi) != '' THEN k.OnYomi
+                        WHEN TRIM(k.KunYomi) != '' THEN k.KunYomi
+                        WHEN TRIM(k.Nanori) != '' THEN k.Nanori
+                    END AS Readings,
+                    group_concat(DISTINCT TRIM(k_meanings.Meaning)) AS Meanings,
+                    k.MostUsedRank IS NOT NULL OR k.NewspaperRank IS NOT NULL AS IsCommon,
+                    k.JlptLevel AS JlptLevel,
+                    k.WkLevel AS WkLevel,
+                    k.MostUsedRank AS FrequencyRank,
+                    k.NewspaperRank AS WikiRank,
+                    k.OnYomi AS OnYomi,
+                    k.KunYomi AS KunYomi,
+                    k.Nanori AS Nanori
+                FROM k_page as k
+                LEFT JOIN KanjiMeaningSet AS k_meanings ON k_meanings.Kanji_ID = k.ID
+                GROUP BY k.ID
+                ORDER BY {keyset_order("k.SortKey", "k.ID", descending)};
                 """
- 
-            df = pd.read_sql_query(q, self.conn)
-            item = df.to_dict("records")
-            self.add_to_review(item)
 
-        return None
+            with self.pool.reader() as conn:
+                return fetch_dicts(conn, q, (*where.params, *params, limit))
+
+        return fetch_page(run, sort_col, "k.ID", descending, after, limit)
+
+    @check_conn
+    def count_new_kanji(self, condition: Predicate = in_list("k.JlptLevel", JLPT_LEVELS), search: dict | None = None, search_mode: str = "exact") -> int:
+        where = all_of(condition, search_condition("kanji", search, search_mode, self.id_search_db))
+        q = f"""
+            SELECT COUNT(*) FROM KanjiSet AS k
+            WHERE {where.sql}
+            AND NOT EXISTS (
+                SELECT 1 FROM {self.name_srs_table} AS srs
+                WHERE srs.{self.col_dict["kanji_col"]} = k.Character
+                );
+            """
+
+        with self.pool.reader() as conn:
+            (count,) = fetch_one(conn, q, where.params)
+
+        return count
 
-    # defines an item and adds it to the review list
+    # starts (or restarts) the review session of a client, with the items that are due and not reviewed elsewhere
+    # key is whatever identifies the client, like a nicegui client id
     @check_conn
-    def add_to_review(self, items: list) -> None:
-        for item in items:
-            review_type = None
-            current_item = None
-
-            kanji_item = item.get(self.col_dict["kanji_col"])
-            vocab_item = item.get(self.col_dict["vocab_col"])
-
-            if kanji_item:
-                review_type = "kanji"
-                current_item = kanji_item
-
-            elif vocab_item:
-                review_type = "vocab"
-                current_item = vocab_item
-
-            # we need to make two cards: reading and meaning
-            # they are defined as such
-            reading_card = item.copy()
-            reading_card["review_type"] = review_type
-            reading_card["card_type"] = "reading"
-            reading_card["prompt"] = current_item
-            reading_card["expected_answer"] = reading_card["Readings"]
-            self.current_reviews.append(reading_card)
-
-            meaning_card = item.copy()
-            meaning_card["review_type"] = review_type
-            meaning_card["card_type"] = "meaning"
-            meaning_card["prompt"] = current_item
-            meaning_card["expected_answer"] = meaning_card["Meanings"]
-            self.current_reviews.append(meaning_card)
-
-        random.shuffle(self.current_reviews)
+    def start_review_session(self, key = None) -> ReviewSession:
+        session = self.review_sessions.get(key)
 
-        return None
+        # rows hydrated below must not be older than the journal
+        self.flush_reviews()
+        session.start()
+
+        return session
 
     # adds another valid meaning to the item in the db
     @check_conn
-    def add_valid_response(self, user_input: str, item: dict) -> None:
-        card_type = item["card_type"]
-        item_id = item["ID"]
+    def add_valid_response(self, user_input: str, card: Card) -> None:
+        card_type = card.card_type
+        item_id = card.item.item_id
 
         match card_type:
             case "reading":
@@ -394,20 +625,43 @@ class SrsApp:
             UPDATE {self.name_srs_table}
             SET
                 {response_col} = ?
-            WHERE {self.col_dict["id_col"]} = {item_id};
+            WHERE {self.col_dict["id_col"]} = ?;
             """
 
-        valid_responses = item[response_col]
+        valid_responses = card.matcher.answers
         valid_responses += f",{user_input}"
 
-        self.conn.execute(q, (valid_responses,))
-        self.to_commit()
+        with self.pool.writer() as conn:
+            conn.execute(q, (valid_responses, item_id))
+            self.to_commit()
+
+        # the card's answers changed, so its matcher has to be rebuilt
+        card.matcher = AnswerMatcher(card_type, valid_responses)
 
         return None
 
-    # adds an item from the vocab/kanji db to the srs review db
+    # the text of one of an item's inputs, stripped; None if it's empty
+    def get_input_text(self, item: dict, key: str) -> str | None:
+        return clean_text(item[key].value)
+
+    # which of values are already in the srs db as items of a type
+    def get_existing_items(self, conn: sqlite3.Connection, item_type: str, values: list) -> set:
+        item_col = self.get_item_col(item_type)
+        existing = in_list(item_col, values)
+        q = f"""
+            SELECT {item_col} FROM {self.name_srs_table}
+            WHERE {existing.sql};
+            """
+
+        return set(fetch_column(conn, q, existing.params))
+
+    # adds entries to the srs review db, all in one transaction
+    # entries are dicts of type ("vocab" or "kanji"), kanji, readings, meanings, meaning_notes and reading_notes
+    # returns an ItemResult for each, in order
+    # entries that are missing something or are already being studied are skipped
+    # if the write fails, none of the entries are added
     @check_conn
-    def add_review_item(self, item: dict) -> None:
+    def add_review_entries(self, entries: list) -> list:
         q = f"""
             INSERT INTO {self.name_srs_table} (Meanings, Readings, CurrentGrade, FailureCount, SuccessCount, AssociatedVocab, AssociatedKanji, MeaningNote, ReadingNote, Tags, IsDeleted, LastUpdateDateISO, CreationDateISO, NextAnswerDateISO)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
@@ -419,100 +673,250 @@ class SrsApp:
 
         # default definitions
         # timestamp as such for both readability and debugging
-        meanings = item["meanings"].value
-        readings = item["readings"].value
         current_grade = 0
         failure_count = 0
         success_count = 0
-        associated_vocab = None
-        associated_kanji = None
-        meaning_notes = item["meaning_notes"].value
-        reading_notes = item["reading_notes"].value
         tags = None
         is_deleted = 0
         last_update_date = current_datetime.strftime("%Y-%m-%d %H:%M:%S")
         creation_date = current_datetime.strftime("%Y-%m-%d %H:%M:%S")
         next_answer_date = next_answer_datetime.strftime("%Y-%m-%d %H:%M:%S")
 
-        match item["type"]:
-            case "vocab":
-                associated_vocab = item["kanji"].value
+        results = [None] * len(entries)
+        rows = [] # (index into entries, row without its id)
+        seen = {"vocab": set(), "kanji": set()}
 
-            case "kanji":
-                associated_kanji = item["kanji"].value
+        with self.pool.writer() as conn:
+            self.commit_pending(conn)
 
-        # big tuple...
-        self.conn.execute(q, (meanings, readings, current_grade, failure_count, success_count, associated_vocab, associated_kanji, meaning_notes, reading_notes, tags, is_deleted, last_update_date, creation_date, next_answer_date))
-        self.conn.commit()
+            existing = dict()
 
-        return None
+            for item_type in seen:
+                values = [clean_text(entry["kanji"]) for entry in entries if entry["type"] == item_type]
+                existing[item_type] = self.get_existing_items(conn, item_type, values) if values else set()
+
+            for i, entry in enumerate(entries):
+                kanji = clean_text(entry["kanji"])
+                meanings = clean_text(entry["meanings"])
+                readings = clean_text(entry["readings"])
+                associated_vocab = None
+                associated_kanji = None
+
+                match entry["type"]:
+                    case "vocab":
+                        associated_vocab = kanji
+
+                    case "kanji":
+                        associated_kanji = kanji
+
+                    case _:
+                        results[i] = ItemResult(False, error = f"Unknown item type: {entry['type']}")
+
+                        continue
+
+                if kanji is None or meanings is None or readings is None:
+                    results[i] = ItemResult(False, error = "Kanji, readings and meanings can't be empty")
+
+                elif kanji in existing[entry["type"]] or kanji in seen[entry["type"]]:
+                    results[i] = ItemResult(False, error = f"{kanji} is already being studied")
+
+                else:
+                    seen[entry["type"]].add(kanji)
+                    rows.append((i, (meanings, readings, current_grade, failure_count, success_count, associated_vocab, associated_kanji, entry.get("meaning_notes"), entry.get("reading_notes"), tags, is_deleted, last_update_date, creation_date, next_answer_date)))
+
+            item_ids = []
+
+            # sqlite hands out the ids, one row at a time so each one's id is known, but all in one transaction
+            try:
+                with conn:
+                    for _, row in rows:
+                        item_ids.append(conn.execute(q, row).lastrowid)
+
+            except sqlite3.Error as e:
+                for i, _ in rows:
+                    results[i] = ItemResult(False, error = f"Could not add items: {e}")
+
+                return results
+
+            self.entries_without_commit = 0
+
+        for item_id, (i, _) in zip(item_ids, rows):
+            self.due_queue.update(item_id, next_answer_date)
+            self.review_stats.update(None, (current_grade, failure_count, success_count, next_answer_date))
+            results[i] = ItemResult(True, item_id = item_id)
+
+        return results
+
+    # adds items from the vocab/kanji db to the srs review db, all in one transaction (see add_review_entries)
+    # items are dicts of ui inputs like AddTab.selected_items
+    @check_conn
+    def add_review_items(self, items: list) -> list:
+        entries = [
+            {
+                "type": item["type"],
+                "kanji": item["kanji"].value,
+                "readings": item["readings"].value,
+                "meanings": item["meanings"].value,
+                "meaning_notes": item["meaning_notes"].value,
+                "reading_notes": item["reading_notes"].value,
+            }
+            for item in items
+        ]
+
+        return self.add_review_entries(entries)
+
+    # adds one item from the vocab/kanji db to the srs review db
+    @check_conn
+    def add_review_item(self, item: dict) -> ItemResult:
+        return self.add_review_items([item])[0]
+
+    # streams a word list into the srs db, batch_size rows at a time (see importer.py for the formats)
+    # every batch is filled in from the dictionary and added in its own transaction
+    # on_progress is called with the running ImportReport after every batch
+    @check_conn
+    def import_file(self, path: str, item_type: str = "vocab", batch_size: int = 1000, on_progress = None) -> ImportReport:
+        report = ImportReport()
+        entries = read_entries(path, item_type)
+
+        while batch := list(islice(entries, batch_size)):
+            with self.pool.reader() as conn:
+                fill_from_dictionary(conn, batch)
+
+            # words the dictionary doesn't know need their readings and meanings in the file
+            results = [None] * len(batch)
+            known = []
+
+            for i, entry in enumerate(batch):
+                if entry["readings"] is None or entry["meanings"] is None:
+                    results[i] = ItemResult(False, error = f"{entry['kanji']} isn't in the dictionary, and has no readings or meanings")
+
+                else:
+                    known.append(i)
+
+            for i, result in zip(known, self.add_review_entries([batch[i] for i in known])):
+                results[i] = result
+
+            report.lines += len(batch)
+
+            for entry, result in zip(batch, results):
+                if result.ok:
+                    report.added += 1
+
+                else:
+                    report.skipped += 1
+
+                    if len(report.errors) < MAX_ERRORS:
+                        report.errors.append(f"Row {entry['row']}: {result.error}")
+
+            if on_progress is not None:
+                on_progress(report)
+
+        return report
+
+    # the grading counters of one item, straight from the db
+    @check_conn
+    def get_review_counts(self, item_id: int) -> ReviewCounts:
+        q = f"""
+            SELECT
+                {self.col_dict["current_grade_col"]},
+                {self.col_dict["failure_col"]},
+                {self.col_dict["success_col"]}
+            FROM {self.name_srs_table}
+            WHERE {self.col_dict["id_col"]} = ?;
+            """
+
+        with self.pool.reader() as conn:
+            row = fetch_one(conn, q, (item_id,))
+
+        return ReviewCounts(*(int(x or 0) for x in row))
 
     # after an answer has been processed, edit the item's status in the db
     @check_conn
     def update_review_item(self, item_id: str, res: bool) -> None:
-        q_retrieve_item = f"""
-                          SELECT 
-                              CurrentGrade,
-                              FailureCount,
-                              SuccessCount
-                          FROM {self.name_srs_table}
-                          WHERE {self.col_dict["id_col"]} = {item_id};
-                          """
-        q_update_item = f"""
-                        UPDATE {self.name_srs_table}
-                        SET
-                            CurrentGrade = ?,
-                            FailureCount = ?,
-                            SuccessCount = ?,
-                            LastUpdateDateISO = current_timestamp,
-                            NextAnswerDateISO = ?
-                        WHERE {self.col_dict["id_col"]} = {item_id};
-                        """
-
-        df = pd.read_sql_query(q_retrieve_item, self.conn)
-        row = df.to_dict("records")[0]
 
-        # utc current timestamp
-        current_time = datetime.now(timezone.utc)
+        # the lock keeps an edit or another answer of the same item from landing in between reading its counts and writing them
+        with self.review_lock:
 
-        # if the user got the item correct, increase the grade and success count
-        # otherwise, opposite
-        if res:
-            row["CurrentGrade"] += 1
-            row["SuccessCount"] += 1
+            # items in a review session are always cached; anything else falls back to the db
+            counts = self.review_rows.get(item_id) or self.get_review_counts(item_id)
+            old_row = (*counts, self.due_queue.get_date(item_id))
 
-        else:
-            row["CurrentGrade"] = max(0, row["CurrentGrade"] - 1)
-            row["FailureCount"] += 1
+            # utc current timestamp
+            current_time = datetime.now(timezone.utc)
 
-        current_grade_key = str(row["CurrentGrade"])
-        current_grade_dict = self.srs_interval[current_grade_key]
+            # if the user got the item correct, increase the grade and success count
+            # otherwise, opposite
+            if res:
+                counts = ReviewCounts(counts.current_grade + 1, counts.failure_count, counts.success_count + 1)
 
-        # if -1, then the user has proved that they know this item well enough to stop reviewing
-        # otherwise, use the toml to determine when the next review date is
-        match current_grade_dict["value"]:
-            case -1:
-                review_time = None
+            else:
+                counts = ReviewCounts(max(0, counts.current_grade - 1), counts.failure_count + 1, counts.success_count)
 
-            case _:
-                match current_grade_dict["unit"]:
-                    case "hours":
-                        review_datetime = current_time + timedelta(hours = current_grade_dict["value"])
+            current_grade_key = str(counts.current_grade)
+            current_grade_dict = self.srs_interval[current_grade_key]
 
-                    case "days":
-                        review_datetime = current_time + timedelta(days = current_grade_dict["value"])
+            # if -1, then the user has proved that they know this item well enough to stop reviewing
+            # otherwise, use the toml to determine when the next review date is
+            match current_grade_dict["value"]:
+                case -1:
+                    review_time = None
 
-                review_time = review_datetime.strftime("%Y-%m-%d %H:%M:%S")
+                case _:
+                    match current_grade_dict["unit"]:
+                        case "hours":
+                            review_datetime = current_time + timedelta(hours = current_grade_dict["value"])
 
-        self.conn.execute(q_update_item, (row["CurrentGrade"], row["FailureCount"], row["SuccessCount"], review_time))
-        self.current_completed += 1 # increment counter for frontend
-        self.to_commit()
+                        case "days":
+                            review_datetime = current_time + timedelta(days = current_grade_dict["value"])
+
+                    review_time = review_datetime.strftime("%Y-%m-%d %H:%M:%S")
+
+            # the journal makes the answer durable; the db catches up on the next flush
+            self.review_rows[item_id] = counts
+            self.review_journal.append((int(item_id), *counts, current_time.strftime("%Y-%m-%d %H:%M:%S"), review_time))
+            self.due_queue.update(item_id, review_time)
+            self.review_stats.update(old_row, (*counts, review_time))
 
         return None
 
-    # after user edits an item, we should change its respective variables
+    # moves the overdue backlog to new due dates (see rescheduler.py), in one transaction
+    # uses the policy from config.toml unless given one; a dry run only reports what would change
     @check_conn
-    def edit_review_item(self, item: dict) -> None:
+    def reschedule_backlog(self, policy: ReschedulePolicy | None = None, dry_run: bool = True) -> RescheduleReport:
+
+        # numpy is only needed here, so it isn't loaded at startup
+        from src.rescheduler import reschedule
+
+        if policy is None:
+            policy = self.reschedule_policy
+
+        # a pending journal entry would otherwise overwrite the new date when it gets flushed
+        self.flush_reviews()
+
+        if dry_run:
+            with self.pool.reader() as conn:
+                return reschedule(conn, policy, self.srs_interval, dry_run = True, schema = self.id_srs_db)
+
+        with self.pool.writer() as conn:
+            self.commit_pending(conn)
+
+            report = reschedule(conn, policy, self.srs_interval, dry_run = False, schema = self.id_srs_db)
+
+        self.due_queue.update_many((item_id, new_date) for item_id, _, new_date in report.moves)
+        self.review_stats.move_due((old_date, new_date) for _, old_date, new_date in report.moves)
+
+        return report
+
+    # after the user edits items, write their new values to the db, all in one transaction
+    # items are dicts of ui inputs like EditTab.selected_items; returns an ItemResult for each, in order
+    # items with a missing field, an unknown grade, a bad date, or that were deleted in the meantime are skipped
+    # if the write fails, none of the items are changed
+    @check_conn
+    def edit_review_items(self, items: list) -> list:
+
+        # a pending journal entry would otherwise overwrite the edit when it gets flushed
+        self.flush_reviews()
+
         q = f"""
             UPDATE {self.name_srs_table}
             SET
@@ -525,73 +929,121 @@ class SrsApp:
                 ReadingNote = ?,
                 LastUpdateDateISO = current_timestamp,
                 NextAnswerDateISO = ?
-            WHERE {self.col_dict["id_col"]} = {item["item_id"]};
+            WHERE {self.col_dict["id_col"]} = ?;
             """
 
-        # default definitions
-        # timestamp as such for both readability and debugging
-        meanings = item["meanings"].value
-        readings = item["readings"].value
-        current_grade = item["current_grade"].value
-        associated_vocab = None
-        associated_kanji = None
-        meaning_notes = item["meaning_notes"].value
-        reading_notes = item["reading_notes"].value
-        next_answer_date = item["next_answer"].value
-
-        match item["type"]:
-            case "vocab":
-                associated_vocab = item["kanji"].value
+        results = [None] * len(items)
+        rows = [] # (index into items, item id, row)
 
-            case "kanji":
-                associated_kanji = item["kanji"].value
+        for i, item in enumerate(items):
+            kanji = self.get_input_text(item, "kanji")
+            meanings = self.get_input_text(item, "meanings")
+            readings = self.get_input_text(item, "readings")
+            current_grade = self.get_input_text(item, "current_grade")
+            next_answer_date = self.get_input_text(item, "next_answer")
+            associated_vocab = None
+            associated_kanji = None
 
-        # big tuple...
-        self.conn.execute(q, (meanings, readings, current_grade, associated_vocab, associated_kanji, meaning_notes, reading_notes, next_answer_date))
-        self.conn.commit()
+            match item["type"]:
+                case "vocab":
+                    associated_vocab = kanji
 
-        return None
+                case "kanji":
+                    associated_kanji = kanji
 
-    # function to convert db from houhou
-    # specifically, this just adds similar columns representing time but in iso format for readability
-    @check_conn
-    def convert_from_houhou(self) -> None:
-        names_date_col = [
-            self.col_dict["houhou_last_update_col"],
-            self.col_dict["houhou_creation_col"],
-            self.col_dict["houhou_next_answer_col"],
-            self.col_dict["houhou_suspension_col"],
-        ]
+                case _:
+                    results[i] = ItemResult(False, error = f"Unknown item type: {item['type']}")
+
+                    continue
 
-        for name_col in names_date_col:
-            name_iso_col = name_col + "ISO"
-            q_create_col = f"ALTER TABLE {self.name_srs_table} ADD COLUMN {name_iso_col} TEXT;"
-            q_update_col = f"""
-                           UPDATE {self.name_srs_table}
-                           SET {name_iso_col} = 
-                               CASE 
-                                   WHEN typeof({name_col}) = 'text' 
-                                   AND {name_col} GLOB '20[0-9][0-9]-*' THEN 
-                                       {name_col}
+            if kanji is None or meanings is None or readings is None:
+                results[i] = ItemResult(False, error = "Kanji, readings and meanings can't be empty")
 
-                                   WHEN typeof({name_col}) = 'integer' THEN
-                                       datetime(({name_col} / 10000000) - 62135596800, 'unixepoch')
+                continue
+
+            if current_grade not in self.srs_interval:
+                results[i] = ItemResult(False, error = f"SRS grade has to be one of {', '.join(self.srs_interval.keys())}")
+
+                continue
+
+            # no date means the item isn't reviewed anymore
+            # dates are stored in utc; ones with an offset are converted, ones without are taken as utc already
+            if next_answer_date is not None:
+                try:
+                    next_answer_datetime = datetime.fromisoformat(next_answer_date)
+
+                    if next_answer_datetime.tzinfo is not None:
+                        next_answer_datetime = next_answer_datetime.astimezone(timezone.utc)
+
+                    next_answer_date = next_answer_datetime.strftime("%Y-%m-%d %H:%M:%S")
+
+                except ValueError:
+                    results[i] = ItemResult(False, error = f"Next answer date isn't a date: {next_answer_date}")
+
+                    continue
+
+            rows.append((i, int(item["item_id"]), (meanings, readings, int(current_grade), associated_vocab, associated_kanji, item["meaning_notes"].value, item["reading_notes"].value, next_answer_date)))
+
+        ids = in_list(self.col_dict["id_col"], [item_id for _, item_id, _ in rows])
+        q_old_rows = f"""
+            SELECT
+                {self.col_dict["id_col"]},
+                {self.col_dict["current_grade_col"]},
+                {self.col_dict["failure_col"]},
+                {self.col_dict["success_col"]},
+                {self.col_dict["date_col"]}
+            FROM {self.name_srs_table}
+            WHERE {ids.sql};
+            """
+
+        with self.pool.writer() as conn:
+            self.commit_pending(conn)
+
+            old_rows = {row[0]: row[1:] for row in conn.execute(q_old_rows, ids.params)}
 
-                                   ELSE NULL
-                               END;
-                           """
+            for i, item_id, _ in rows:
+                if item_id not in old_rows:
+                    results[i] = ItemResult(False, item_id = item_id, error = "The item doesn't exist anymore")
+
+            rows = [(i, item_id, row) for i, item_id, row in rows if item_id in old_rows]
 
             try:
-                self.conn.execute(q_create_col)
-                self.conn.execute(q_update_col)
+                with conn:
+                    conn.executemany(q, [(*row, item_id) for _, item_id, row in rows])
 
-                self.conn.commit()
+            except sqlite3.Error as e:
+                for i, item_id, _ in rows:
+                    results[i] = ItemResult(False, item_id = item_id, error = f"Could not edit items: {e}")
 
-            # don't raise the error
-            # most likely it's just saying the column exists if you run this function multiple times
-            except Exception as e:
-                print(f"{name_col}: {e}")
+                return results
 
-                continue
+            self.entries_without_commit = 0
 
-        return None
+        with self.review_lock:
+            for i, item_id, row in rows:
+                old_row = old_rows[item_id]
+                current_grade = row[2]
+                next_answer_date = row[-1]
+
+                self.review_rows.pop(item_id, None)
+                self.due_queue.update(item_id, next_answer_date)
+                self.review_stats.update(old_row, (current_grade, old_row[1], old_row[2], next_answer_date))
+                results[i] = ItemResult(True, item_id = item_id)
+
+        return results
+
+    # after user edits an item, we should change its respective variables
+    @check_conn
+    def edit_review_item(self, item: dict) -> ItemResult:
+        return self.edit_review_items([item])[0]
+
+    # converts a houhou srs db's dates into the ISO columns srs.ly reads (see houhou.py)
+    # batched and resumable; returns a ConversionReport, which is empty if the conversion had already finished
+    @check_conn
+    def convert_from_houhou(self, batch_size: int = 10000, with_epoch: bool = False, on_progress = None) -> ConversionReport:
+        with self.pool.writer() as conn:
+
+            # every batch commits, so start from a clean slate
+            self.commit_pending(conn)
+
+            return convert_houhou_dates(conn, self.id_srs_db, "SrsEntrySet", batch_size = batch_size, with_epoch = with_epoch, on_progress = on_progress)